@@ -0,0 +1 @@
+"""Benchmarks for interposition_http_adapter."""
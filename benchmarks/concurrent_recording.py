@@ -0,0 +1,61 @@
+"""Measure recording throughput against the number of forwarding threads.
+
+Run with ``python benchmarks/concurrent_recording.py [upstream_latency_ms]``.
+"""
+
+import sys
+import threading
+import time
+
+from interposition import Cassette, InteractionRequest, ResponseChunk
+
+from interposition_http_adapter.recording import CassetteRecorder
+
+_RECORDINGS = 400
+_THREAD_COUNTS = (1, 2, 4, 8, 16)
+_DEFAULT_LATENCY_MS = 5.0
+
+
+def _measure(thread_count: int, latency: float) -> float:
+    """Return recordings per second with thread_count forwarding threads."""
+    recorder = CassetteRecorder(Cassette(interactions=()))
+
+    def forward(worker: int) -> None:
+        for index in range(worker, _RECORDINGS, thread_count):
+            request = InteractionRequest(
+                protocol="http", action="GET", target=f"/{index}", headers=(), body=b""
+            )
+            time.sleep(latency)  # the upstream call, outside the write lock
+            recorder.record(
+                request, (ResponseChunk(data=request.target.encode(), sequence=0),)
+            )
+
+    threads = [
+        threading.Thread(target=forward, args=(worker,))
+        for worker in range(thread_count)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if len(recorder.snapshot) != _RECORDINGS:
+        msg = f"lost recordings: {_RECORDINGS - len(recorder.snapshot)}"
+        raise RuntimeError(msg)
+    return _RECORDINGS / elapsed
+
+
+def main() -> None:
+    """Print recordings per second for each thread count."""
+    latency_ms = float(sys.argv[1]) if len(sys.argv) > 1 else _DEFAULT_LATENCY_MS
+    sys.stdout.write(f"upstream latency: {latency_ms} ms\n")
+    for thread_count in _THREAD_COUNTS:
+        throughput = _measure(thread_count, latency_ms / 1000)
+        sys.stdout.write(
+            f"threads: {thread_count:>2}  recordings/s: {throughput:.0f}\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
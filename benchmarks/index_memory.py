@@ -0,0 +1,111 @@
+"""Measure the memory retained per interaction while serving a cassette.
+
+In record and auto mode the adapter keeps the cassette models, which each
+recorded cassette is built from, alongside the serving index. In replay mode
+it keeps only the index, which shares the response chunks with the models,
+the miss filter and the compact miss diagnostics records if they are
+enabled. Both cases are
+measured.
+
+Run with ``python benchmarks/index_memory.py [interaction_count]``.
+"""
+
+import gc
+import json
+import sys
+import tracemalloc
+from typing import NamedTuple
+
+from interposition import Cassette, InteractionRequest
+
+from interposition_http_adapter.diagnostics import MissDiagnostics
+from interposition_http_adapter.index import ServingIndex
+from interposition_http_adapter.misses import MissFilter, NegativeCache
+
+_DEFAULT_COUNT = 100_000
+
+
+def _cassette_json(count: int) -> str:
+    """Build a cassette with realistic targets, headers and metadata."""
+    interactions = []
+    for position in range(count):
+        request = InteractionRequest(
+            protocol="http",
+            action="GET",
+            target=f"/api/v1/users/{position}?include=profile",
+            headers=(("accept", "application/json"), ("x-tenant", "acme")),
+            body=b"",
+        )
+        interactions.append(
+            {
+                "request": request.model_dump(mode="json"),
+                "fingerprint": {"value": request.fingerprint().value},
+                "response_chunks": [
+                    {
+                        "data": '{"status": "ok"}',
+                        "sequence": 0,
+                        "metadata": [["status_code", "200"], ["offset_ms", "1.250"]],
+                    }
+                ],
+            }
+        )
+    return json.dumps({"interactions": interactions})
+
+
+class _Footprint(NamedTuple):
+    """Bytes per interaction retained in each configuration."""
+
+    models: float
+    recording: float
+    replay: float
+    replay_with_diagnostics: float
+
+
+def _measure(count: int) -> _Footprint:
+    """Return the bytes per interaction retained while serving."""
+    cassette_json = _cassette_json(count)
+
+    tracemalloc.start()
+    cassette = Cassette.model_validate_json(cassette_json)
+    models = tracemalloc.get_traced_memory()[0]
+    index = ServingIndex(cassette)
+    recording = tracemalloc.get_traced_memory()[0]
+    miss_filter = MissFilter(NegativeCache(max_entries=0, ttl=0.0))
+    miss_filter.refresh(index)
+    diagnostics = MissDiagnostics()
+    diagnostics.refresh(cassette)
+    del cassette
+    gc.collect()
+    replay_with_diagnostics = tracemalloc.get_traced_memory()[0]
+    del diagnostics
+    gc.collect()
+    replay = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    if len(index) != count:
+        msg = f"expected {count} indexed interactions, got {len(index)}"
+        raise RuntimeError(msg)
+    return _Footprint(
+        models / count,
+        recording / count,
+        replay / count,
+        replay_with_diagnostics / count,
+    )
+
+
+def main() -> None:
+    """Print the per-interaction memory figures."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else _DEFAULT_COUNT
+    footprint = _measure(count)
+    sys.stdout.write(
+        f"interactions: {count}\n"
+        f"cassette models: {footprint.models:.0f} bytes/interaction\n"
+        f"record/auto (models + index): {footprint.recording:.0f} bytes/interaction\n"
+        f"replay (index and miss filter): {footprint.replay:.0f} bytes/interaction\n"
+        "replay with miss diagnostics: "
+        f"{footprint.replay_with_diagnostics:.0f} bytes/interaction\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,16 @@ This specification verifies that the HTTP adapter can be created from a Cassette
 * Verify that the response status code is "200"
 * Verify that the response body is "hello from cassette"
 
+## Loads a cassette file in the background and replays once ready
+
+* Create an adapter from cassette file "e2e/fixtures/simple_get.json" loading in the background
+* Start the adapter on port "19876"
+* Send a GET request to "http://localhost:19876/__health"
+* Verify that the response status code is "200"
+* Send a GET request to "http://localhost:19876/api/data"
+* Verify that the response status code is "200"
+* Verify that the response body is "hello from cassette"
+
 ## Raises an error when the cassette file does not exist
 
 * Verify that creating an adapter from cassette file "e2e/fixtures/nonexistent.json" raises an error
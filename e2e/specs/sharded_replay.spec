@@ -0,0 +1,24 @@
+# Sharded replay tests
+
+This specification verifies that a cassette split into shards is served by separate adapter processes behind a shard router.
+
+## Replays every route through the shard router
+
+* Split cassette file "e2e/fixtures/multi_route.json" into "2" shards
+* Start shard "0" as a process on port "19881"
+* Start shard "1" as a process on port "19882"
+* Start a shard router process on port "19880" for shard ports "19881,19882"
+* Send a GET request to "http://localhost:19880/api/users"
+* Verify that the response status code is "200"
+* Verify that the response body is "users from shard"
+* Send a GET request to "http://localhost:19880/api/orders"
+* Verify that the response body is "orders from shard"
+* Send a GET request to "http://localhost:19880/api/products"
+* Verify that the response body is "products from shard"
+* Send a GET request to "http://localhost:19880/api/invoices"
+* Verify that the response body is "invoices from shard"
+* Send a GET request to "http://localhost:19880/api/unknown"
+* Verify that the response status code is "500"
+
+___
+* Stop the shard processes
@@ -16,7 +16,7 @@ if TYPE_CHECKING:
 
     from interposition import BrokerMode
 
-from interposition_http_adapter import InterpositionHttpAdapter
+from interposition_http_adapter import AdapterConfig, InterpositionHttpAdapter
 
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 
@@ -29,6 +29,16 @@ def create_adapter_from_cassette_file(file_path: str) -> None:
     data_store.scenario["adapter"] = adapter
 
 
+@step("Create an adapter from cassette file <file_path> loading in the background")
+def create_adapter_loading_in_background(file_path: str) -> None:
+    """Create an adapter that loads its cassette file in a background thread."""
+    resolved_path = _PROJECT_ROOT / file_path
+    adapter = InterpositionHttpAdapter.from_cassette_file(
+        resolved_path, config=AdapterConfig(background_load=True)
+    )
+    data_store.scenario["adapter"] = adapter
+
+
 @step("Verify that creating an adapter from cassette file <file_path> raises an error")
 def verify_adapter_creation_raises_error(file_path: str) -> None:
     """Verify that creating an adapter from a cassette file raises an error."""
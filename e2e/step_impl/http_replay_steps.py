@@ -87,6 +87,19 @@ def start_adapter(port: str) -> None:
         server.should_exit = True
         thread.join(timeout=5.0)
     assert server.started
+    _wait_until_ready(int(port))
+
+
+def _wait_until_ready(port: int) -> None:
+    """Poll the readiness endpoint until the cassette is loaded."""
+    with httpx.Client() as client:
+        for _ in range(50):
+            response = client.get(f"http://127.0.0.1:{port}/__ready")
+            if response.status_code == httpx.codes.OK:
+                return
+            time.sleep(0.1)
+    msg = f"adapter on port {port} did not become ready: {response.text}"
+    raise AssertionError(msg)
 
 
 @step("Send a GET request to <url>")
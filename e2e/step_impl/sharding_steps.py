@@ -0,0 +1,97 @@
+"""Step implementations for sharded replay tests."""
+
+import json
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from getgauge.python import data_store, step
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+_CLI = "interposition_http_adapter"
+
+
+def _processes() -> list[subprocess.Popen[bytes]]:
+    """Return the processes started by the scenario."""
+    processes = data_store.scenario.setdefault("shard_processes", [])
+    assert isinstance(processes, list)
+    return processes
+
+
+def _start(port: int, *arguments: str) -> None:
+    """Start a CLI process and wait until it answers its readiness probe."""
+    process = subprocess.Popen(  # noqa: S603
+        [_CLI, *arguments, "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    _processes().append(process)
+    with httpx.Client() as client:
+        for _ in range(100):
+            try:
+                response = client.get(f"http://127.0.0.1:{port}/__ready")
+            except httpx.TransportError:
+                time.sleep(0.1)
+                continue
+            if response.status_code == httpx.codes.OK:
+                return
+            time.sleep(0.1)
+    msg = f"process on port {port} did not become ready"
+    raise AssertionError(msg)
+
+
+@step("Split cassette file <file_path> into <shards> shards")
+def split_cassette_file(file_path: str, shards: str) -> None:
+    """Split a cassette fixture into shard cassettes with the CLI."""
+    directory = Path(tempfile.mkdtemp())
+    result = subprocess.run(  # noqa: S603
+        [
+            _CLI,
+            "shard",
+            str(_PROJECT_ROOT / file_path),
+            "--shards",
+            shards,
+            "--output",
+            str(directory),
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 0, f"shard command failed: {result.stderr}"
+    total = sum(
+        len(json.loads(path.read_text())["interactions"])
+        for path in directory.glob("shard-*.json")
+    )
+    source = json.loads((_PROJECT_ROOT / file_path).read_text())
+    assert total == len(source["interactions"])
+    data_store.scenario["shard_directory"] = directory
+
+
+@step("Start shard <shard> as a process on port <port>")
+def start_shard_process(shard: str, port: str) -> None:
+    """Serve one shard cassette from a separate adapter process."""
+    directory = data_store.scenario["shard_directory"]
+    assert isinstance(directory, Path)
+    _start(int(port), "serve", str(directory / f"shard-{shard}.json"))
+
+
+@step("Start a shard router process on port <port> for shard ports <ports>")
+def start_shard_router_process(port: str, ports: str) -> None:
+    """Serve a shard router forwarding to the shard processes."""
+    urls = [f"http://127.0.0.1:{shard_port}" for shard_port in ports.split(",")]
+    _start(int(port), "route", *urls)
+
+
+@step("Stop the shard processes")
+def stop_shard_processes() -> None:
+    """Terminate the processes and remove the shard cassettes."""
+    for process in _processes():
+        process.terminate()
+        process.wait(timeout=5.0)
+    directory = data_store.scenario.get("shard_directory")
+    if isinstance(directory, Path):
+        shutil.rmtree(directory, ignore_errors=True)
@@ -1,6 +1,28 @@
 """HTTP adapter for Interposition."""
 
+import importlib
+from typing import TYPE_CHECKING
+
 from interposition_http_adapter._version import __version__
-from interposition_http_adapter.app import InterpositionHttpAdapter
 
-__all__ = ["InterpositionHttpAdapter", "__version__"]
+if TYPE_CHECKING:
+    from interposition_http_adapter.app import InterpositionHttpAdapter
+    from interposition_http_adapter.config import AdapterConfig
+
+__all__ = ["AdapterConfig", "InterpositionHttpAdapter", "__version__"]
+
+# Resolved on first access so that importing the package, for example to
+# run the CLI, does not import Starlette and pydantic.
+_LAZY_ATTRIBUTES = {
+    "AdapterConfig": "interposition_http_adapter.config",
+    "InterpositionHttpAdapter": "interposition_http_adapter.app",
+}
+
+
+def __getattr__(name: str) -> object:
+    """Import the public classes on first access."""
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    return getattr(importlib.import_module(module), name)
@@ -0,0 +1,136 @@
+"""Admission control for upstream calls."""
+
+import math
+from collections.abc import Callable
+
+import anyio
+
+Release = Callable[[], None]
+"""Returns an admitted upstream slot. Must be called exactly once."""
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when an upstream call cannot be admitted in time.
+
+    Attributes:
+        retry_after: Suggested number of seconds before retrying.
+    """
+
+    def __init__(self, retry_after: int) -> None:
+        """Initialize with the suggested retry delay.
+
+        Args:
+            retry_after: Suggested number of seconds before retrying.
+        """
+        self.retry_after = retry_after
+        super().__init__(f"Upstream busy, retry after {retry_after}s")
+
+
+class AdmissionController:
+    """Limits the number of concurrent upstream calls.
+
+    A call needs a slot from the limit of the longest configured target
+    prefix it matches, if any, and then a slot from the global limit. Calls
+    that cannot get their slots immediately wait in a bounded queue. A call
+    is rejected at once when the queue is full and after timeout seconds
+    when its slots do not free up in time.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        prefix_limits: tuple[tuple[str, int], ...],
+        max_waiting: int,
+        timeout: float,
+    ) -> None:
+        """Initialize the controller.
+
+        Args:
+            max_in_flight: Global limit of concurrent upstream calls. ``0``
+                means unlimited.
+            prefix_limits: Pairs of target prefix and limit of concurrent
+                upstream calls whose target starts with that prefix.
+            max_waiting: Maximum number of calls waiting for a slot.
+            timeout: Seconds a call waits for its slots before it is rejected.
+        """
+        self._global = anyio.Semaphore(max_in_flight) if max_in_flight > 0 else None
+        self._prefixes = sorted(
+            ((prefix, anyio.Semaphore(limit)) for prefix, limit in prefix_limits),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+        self._max_waiting = max_waiting
+        self._timeout = timeout
+        self._waiting = 0
+
+    @property
+    def waiting(self) -> int:
+        """Get the number of calls currently waiting for a slot."""
+        return self._waiting
+
+    def _semaphores(self, target: str) -> tuple[anyio.Semaphore, ...]:
+        """Return the semaphores a call to target acquires, in order."""
+        semaphores = [
+            next(
+                (
+                    semaphore
+                    for prefix, semaphore in self._prefixes
+                    if target.startswith(prefix)
+                ),
+                None,
+            ),
+            self._global,
+        ]
+        return tuple(semaphore for semaphore in semaphores if semaphore is not None)
+
+    async def admit(self, target: str) -> Release:
+        """Wait for the slots of an upstream call to target.
+
+        Args:
+            target: The request target.
+
+        Returns:
+            A callable returning the slots once the call is finished.
+
+        Raises:
+            AdmissionRejectedError: If the wait queue is full or the slots
+                did not free up within the timeout.
+        """
+        semaphores = self._semaphores(target)
+        acquired: list[anyio.Semaphore] = []
+
+        def release() -> None:
+            for semaphore in reversed(acquired):
+                semaphore.release()
+
+        try:
+            for semaphore in semaphores:
+                semaphore.acquire_nowait()
+                acquired.append(semaphore)
+        except anyio.WouldBlock:
+            pass
+        else:
+            return release
+
+        if self._waiting >= self._max_waiting:
+            release()
+            raise AdmissionRejectedError(self._retry_after())
+        self._waiting += 1
+        try:
+            with anyio.fail_after(self._timeout):
+                for semaphore in semaphores[len(acquired) :]:
+                    await semaphore.acquire()
+                    acquired.append(semaphore)
+        except TimeoutError as error:
+            release()
+            raise AdmissionRejectedError(self._retry_after()) from error
+        except BaseException:
+            release()
+            raise
+        finally:
+            self._waiting -= 1
+        return release
+
+    def _retry_after(self) -> int:
+        """Return the Retry-After delay suggested to rejected calls."""
+        return max(1, math.ceil(self._timeout))
@@ -0,0 +1,353 @@
+"""Offline analysis of cassette files."""
+
+import hashlib
+import json
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TextIO, TypedDict, cast
+
+from interposition_http_adapter.bodies import BODY_DIGEST_KEY, BODY_FILE_KEY
+
+_READ_SIZE = 1 << 16
+
+# Measured by benchmarks/index_memory.py, see docs/architecture/performance.md.
+MODEL_BYTES_PER_INTERACTION = 3100
+"""Approximate memory held by the pydantic models of one interaction."""
+
+INDEX_BYTES_PER_INTERACTION = 430
+"""Approximate memory the serving index adds to the models per interaction."""
+
+BODY_SIZE_BUCKETS = (
+    ("0 B", 0),
+    ("<= 1 KiB", 1 << 10),
+    ("<= 64 KiB", 1 << 16),
+    ("<= 1 MiB", 1 << 20),
+    ("<= 16 MiB", 1 << 24),
+)
+"""Upper bounds of the response body size histogram; larger bodies go last."""
+
+_LARGEST_BUCKET = "> 16 MiB"
+
+
+@dataclass(frozen=True)
+class RouteStats:
+    """Interactions recorded for one method and target.
+
+    Attributes:
+        method: The HTTP method.
+        target: The request target, path and query.
+        interactions: Number of interactions recorded for the route.
+        header_schemas: Number of distinct recorded header name lists. Each
+            is one replay candidate, so one fingerprint, per lookup.
+    """
+
+    method: str
+    target: str
+    interactions: int
+    header_schemas: int
+
+
+@dataclass(frozen=True)
+class CassetteReport:
+    """Statistics describing how a cassette will perform when served.
+
+    Attributes:
+        interactions: Number of interactions in the cassette.
+        routes: Number of distinct method and target pairs.
+        top_routes: Routes with the most interactions, most first.
+        max_header_schemas: Largest number of header schemas of one route.
+        mean_candidates: Replay candidates per lookup, averaged over the
+            recorded interactions.
+        fingerprint_collisions: Interactions whose fingerprint was already
+            recorded. Only the first is ever served.
+        body_sizes: Number of response bodies per size bucket.
+        body_bytes: Total size of the inline response bodies.
+        largest_body: Size of the largest inline response body.
+        referenced_chunks: Chunks whose payload is stored outside the
+            cassette and not included in the body sizes.
+        duplicate_bodies: Non-empty response bodies identical to an
+            earlier one.
+        duplicate_body_bytes: Total size of the duplicate bodies.
+        estimated_model_bytes: Memory of the loaded cassette models, bodies
+            excluded.
+        estimated_index_bytes: Memory of the serving index.
+    """
+
+    interactions: int
+    routes: int
+    top_routes: tuple[RouteStats, ...]
+    max_header_schemas: int
+    mean_candidates: float
+    fingerprint_collisions: int
+    body_sizes: dict[str, int]
+    body_bytes: int
+    largest_body: int
+    referenced_chunks: int
+    duplicate_bodies: int
+    duplicate_body_bytes: int
+    estimated_model_bytes: int
+    estimated_index_bytes: int
+
+
+class RawRequest(TypedDict):
+    """Request of a raw cassette interaction, as stored in JSON."""
+
+    protocol: str
+    action: str
+    target: str
+    headers: list[list[str]]
+    body: str
+
+
+class RawFingerprint(TypedDict):
+    """Fingerprint of a raw cassette interaction, as stored in JSON."""
+
+    value: str
+
+
+class RawChunk(TypedDict):
+    """Response chunk of a raw cassette interaction, as stored in JSON."""
+
+    data: str
+    sequence: int
+    metadata: list[list[str]]
+
+
+class RawInteraction(TypedDict):
+    """Interaction of a cassette as stored in JSON, without validation."""
+
+    request: RawRequest
+    fingerprint: RawFingerprint
+    response_chunks: list[RawChunk]
+
+
+class _ArrayReader:
+    """Reads the elements of one array of a JSON document incrementally.
+
+    Only the current element and one read block are held in memory, so
+    arbitrarily large documents are read at constant memory.
+    """
+
+    def __init__(self, stream: TextIO, read_size: int) -> None:
+        self._stream = stream
+        self._read_size = read_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+
+    def _fill(self) -> bool:
+        """Read more text, at least doubling the unconsumed buffer."""
+        pending = self._buffer[self._position :]
+        text = self._stream.read(max(self._read_size, len(pending)))
+        self._buffer = pending + text
+        self._position = 0
+        return bool(text)
+
+    def _peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while self._position < len(self._buffer):
+                if not self._buffer[self._position].isspace():
+                    return self._buffer[self._position]
+                self._position += 1
+            if not self._fill():
+                msg = "unexpected end of cassette JSON"
+                raise ValueError(msg)
+
+    def _expect(self, character: str) -> None:
+        """Consume character, which must come next."""
+        if self._peek() != character:
+            msg = f"expected {character!r} in cassette JSON"
+            raise ValueError(msg)
+        self._position += 1
+
+    def _value(self) -> object:
+        """Decode and consume the next JSON value."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+            else:
+                self._position = end
+                return value
+
+    def items(self, key: str) -> Iterator[object]:
+        """Yield the elements of the array under key of the top-level object."""
+        self._expect("{")
+        while True:
+            name = self._value()
+            self._expect(":")
+            if name == key:
+                break
+            self._value()
+            if self._peek() != ",":
+                return
+            self._position += 1
+        self._expect("[")
+        if self._peek() == "]":
+            return
+        while True:
+            yield self._value()
+            if self._peek() == "]":
+                return
+            self._expect(",")
+
+
+def iter_interactions(
+    stream: TextIO, read_size: int = _READ_SIZE
+) -> Iterator[RawInteraction]:
+    """Yield the raw interactions of a JSON cassette one at a time.
+
+    Args:
+        stream: Text stream of a cassette saved by JsonFileCassetteStore.
+        read_size: Characters read from the stream at a time.
+
+    Yields:
+        Each interaction as decoded JSON.
+
+    Raises:
+        ValueError: If the stream is not a JSON cassette.
+    """
+    for interaction in _ArrayReader(stream, read_size).items("interactions"):
+        if not isinstance(interaction, dict):
+            msg = "cassette interactions must be JSON objects"
+            raise ValueError(msg)  # noqa: TRY004 - malformed document
+        yield cast("RawInteraction", interaction)
+
+
+def _body_reference(metadata: list[list[str]]) -> list[str] | None:
+    """Return the body digest or sidecar file entry of chunk metadata."""
+    for entry in metadata:
+        if entry[0] in (BODY_DIGEST_KEY, BODY_FILE_KEY):
+            return entry
+    return None
+
+
+class _Accumulator:
+    """Collects per-route and per-body statistics of streamed interactions."""
+
+    def __init__(self) -> None:
+        self.interactions = 0
+        self.route_counts: dict[tuple[str, str], int] = {}
+        self.route_schemas: dict[tuple[str, str], set[tuple[str, ...]]] = {}
+        self.fingerprints: set[bytes] = set()
+        self.fingerprint_collisions = 0
+        self.body_sizes = dict.fromkeys(
+            [label for label, _ in BODY_SIZE_BUCKETS] + [_LARGEST_BUCKET], 0
+        )
+        self.body_bytes = 0
+        self.largest_body = 0
+        self.referenced_chunks = 0
+        self.bodies: set[bytes] = set()
+        self.duplicate_bodies = 0
+        self.duplicate_body_bytes = 0
+
+    def add(self, interaction: RawInteraction) -> None:
+        """Account for one raw interaction."""
+        self.interactions += 1
+        request = interaction["request"]
+        route = (request["action"], request["target"])
+        self.route_counts[route] = self.route_counts.get(route, 0) + 1
+        schema = tuple(name for name, _ in request["headers"])
+        self.route_schemas.setdefault(route, set()).add(schema)
+
+        fingerprint = bytes.fromhex(interaction["fingerprint"]["value"])
+        if fingerprint in self.fingerprints:
+            self.fingerprint_collisions += 1
+        else:
+            self.fingerprints.add(fingerprint)
+
+        body = hashlib.blake2b(digest_size=16)
+        size = 0
+        for chunk in interaction["response_chunks"]:
+            data = chunk["data"].encode()
+            size += len(data)
+            body.update(data)
+            reference = _body_reference(chunk["metadata"]) if not data else None
+            if reference is not None:
+                self.referenced_chunks += 1
+                body.update(json.dumps(reference).encode())
+        self._add_body(body.digest(), size)
+
+    def _add_body(self, digest: bytes, size: int) -> None:
+        """Account for one response body of size bytes."""
+        self.body_bytes += size
+        self.largest_body = max(self.largest_body, size)
+        label = next(
+            (label for label, bound in BODY_SIZE_BUCKETS if size <= bound),
+            _LARGEST_BUCKET,
+        )
+        self.body_sizes[label] += 1
+        if size == 0:
+            return
+        if digest in self.bodies:
+            self.duplicate_bodies += 1
+            self.duplicate_body_bytes += size
+        else:
+            self.bodies.add(digest)
+
+    def report(self, top: int) -> CassetteReport:
+        """Summarize the interactions added so far."""
+        routes = [
+            RouteStats(
+                method=method,
+                target=target,
+                interactions=count,
+                header_schemas=len(self.route_schemas[method, target]),
+            )
+            for (method, target), count in self.route_counts.items()
+        ]
+        routes.sort(key=lambda route: route.interactions, reverse=True)
+        candidates = sum(route.interactions * route.header_schemas for route in routes)
+        return CassetteReport(
+            interactions=self.interactions,
+            routes=len(routes),
+            top_routes=tuple(routes[:top]),
+            max_header_schemas=max(
+                (route.header_schemas for route in routes), default=0
+            ),
+            mean_candidates=candidates / self.interactions if self.interactions else 0,
+            fingerprint_collisions=self.fingerprint_collisions,
+            body_sizes=self.body_sizes,
+            body_bytes=self.body_bytes,
+            largest_body=self.largest_body,
+            referenced_chunks=self.referenced_chunks,
+            duplicate_bodies=self.duplicate_bodies,
+            duplicate_body_bytes=self.duplicate_body_bytes,
+            estimated_model_bytes=self.interactions * MODEL_BYTES_PER_INTERACTION,
+            estimated_index_bytes=len(self.fingerprints) * INDEX_BYTES_PER_INTERACTION,
+        )
+
+
+def analyze_cassette(path: Path, top: int = 10) -> CassetteReport:
+    """Analyze a JSON cassette file without loading it as a whole.
+
+    The file is streamed, but memory is not constant: it is
+    O(distinct routes + distinct fingerprints + distinct bodies). Each
+    route keeps its method, target and distinct header name lists, each
+    fingerprint 32 bytes and each body a 16-byte digest.
+
+    Args:
+        path: Path to a cassette saved by JsonFileCassetteStore.
+        top: Number of routes listed in top_routes.
+
+    Returns:
+        The statistics of the cassette.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file is not a JSON cassette.
+    """
+    accumulator = _Accumulator()
+    with path.open(encoding="utf-8") as stream:
+        for interaction in iter_interactions(stream):
+            try:
+                accumulator.add(interaction)
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                msg = f"invalid interaction #{accumulator.interactions}: {e!r}"
+                raise ValueError(msg) from e
+    return accumulator.report(top)
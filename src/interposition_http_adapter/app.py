@@ -1,110 +1,629 @@
 """HTTP adapter application for Interposition."""
 
-from collections.abc import Awaitable, Callable, Iterable
+import logging
+import threading
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+import anyio
+import anyio.to_thread
 from interposition import (
     Broker,
     BrokerMode,
+    CassetteLoadError,
     Interaction,
-    InteractionNotFoundError,
     InteractionRequest,
+    LiveResponderRequiredError,
     ResponseChunk,
 )
-from interposition.stores import JsonFileCassetteStore
 from starlette.applications import Starlette
 from starlette.datastructures import Headers
 from starlette.requests import Request
-from starlette.responses import Response
-from starlette.routing import Route
+from starlette.responses import (
+    FileResponse,
+    JSONResponse,
+    Response,
+    StreamingResponse,
+)
+from starlette.routing import Route, WebSocketRoute
+from starlette.types import Receive, Scope, Send
+from starlette.websockets import WebSocket
+
+from interposition_http_adapter.admission import (
+    AdmissionController,
+    AdmissionRejectedError,
+    Release,
+)
+from interposition_http_adapter.bodies import (
+    BodySource,
+    SidecarFiles,
+    chunk_body_digest,
+    chunk_body_file,
+    resolve_chunk_data,
+)
+from interposition_http_adapter.config import AdapterConfig
+from interposition_http_adapter.diagnostics import MissDiagnostics
+from interposition_http_adapter.index import (
+    HeaderSchema,
+    InteractionSource,
+    RouteKey,
+    ServedResponse,
+    ServingIndex,
+    parse_status_code,
+)
+from interposition_http_adapter.misses import MissFilter, NegativeCache, request_key
+from interposition_http_adapter.policy import DropReason, RecordingPolicy
+from interposition_http_adapter.recording import CassetteRecorder
+from interposition_http_adapter.singleflight import SingleFlight
+from interposition_http_adapter.spool import ChunkSpool
+from interposition_http_adapter.timing import paced_chunks, record_chunk_offsets
+from interposition_http_adapter.websocket import WS_PROTOCOL, replay_conversation
 
 if TYPE_CHECKING:
     from interposition import CassetteStore
 
+logger = logging.getLogger(__name__)
+
+_BODY_READ_THREADS = 40
+_STORE_LOOKUP_THREADS = 40
+
 LiveResponder = Callable[[InteractionRequest], Iterable[ResponseChunk]]
 
 
-def _create_handler(
-    broker: Broker,
-) -> Callable[[Request], Awaitable[Response]]:
-    """Create a request handler bound to the given broker."""
+class _RequestHandler:
+    """Serves HTTP requests from a broker according to the adapter config."""
 
-    async def handle_request(request: Request) -> Response:
+    def __init__(self, broker: Broker, config: AdapterConfig) -> None:
+        """Initialize the handler and index the broker's cassette.
+
+        The broker itself is not kept. In replay mode nothing is recorded,
+        so only the serving index and the compact miss structures built
+        from the cassette are retained, and its models can be freed.
+        """
+        self._mode = broker.mode
+        self._live_responder = broker.live_responder
+        self._config = config
+        # Sized like the admission limit, so admitted calls never wait for
+        # a thread to pull their chunks.
+        self._flights = SingleFlight(
+            config.record_spool_threshold, config.max_upstream_in_flight
+        )
+        store = broker.cassette_store
+        self._sidecars = (
+            SidecarFiles(config.sidecar_dir, config.sidecar_threshold)
+            if config.sidecar_dir is not None
+            else None
+        )
+        self._payloads = _Payloads(
+            store if isinstance(store, BodySource) else None, self._sidecars
+        )
+        # Other workers may record into a shared store, so a route missing
+        # from this worker's index is looked up there instead of rejected.
+        self._shared: InteractionSource | None = (
+            store if isinstance(store, InteractionSource) else None
+        )
+        self._lookups = anyio.CapacityLimiter(_STORE_LOOKUP_THREADS)
+        self._misses = MissFilter(
+            NegativeCache(
+                max_entries=config.negative_cache_size, ttl=config.negative_cache_ttl
+            ),
+            by_route=self._shared is None,
+        )
+        self._diagnostics = MissDiagnostics() if config.miss_diagnostics else None
+        self._admission = AdmissionController(
+            max_in_flight=config.max_upstream_in_flight,
+            prefix_limits=config.upstream_prefix_limits,
+            max_waiting=config.upstream_queue_size,
+            timeout=config.upstream_queue_timeout,
+        )
+        self._policy = RecordingPolicy(
+            skip_existing=config.record_skip_existing,
+            max_variants=config.record_max_variants,
+            sample_rates=(
+                ("", config.record_sample_rate),
+                *config.record_prefix_sample_rates,
+            ),
+            max_body_size=config.record_max_body_size,
+        )
+        replay = broker.mode == "replay"
+        self._recorder = CassetteRecorder(
+            broker.cassette,
+            broker.cassette_store,
+            self._policy,
+            recording=not replay,
+        )
+        if replay:
+            # Built here, in the loader thread when loading in the background,
+            # so that the first request or miss does not pay for them. The
+            # snapshot never changes in replay mode, so they are built once.
+            self._misses.refresh(self._recorder.snapshot)
+            if self._diagnostics is not None:
+                self._diagnostics.refresh(broker.cassette)
+
+    @property
+    def recording_drops(self) -> dict[DropReason, int]:
+        """Get the number of live interactions not recorded, per reason."""
+        return self._policy.dropped
+
+    async def handle_request(self, request: Request) -> Response:
+        """Serve a single HTTP request."""
         method = request.method
         target = request.url.path
         if request.url.query:
             target = f"{target}?{request.url.query}"
 
         body = await request.body()
-        chunks = _replay_matching(
-            broker=broker,
-            method=method,
+        index = self._recorder.snapshot
+        route = ("http", method, target)
+        if self._mode == "record":
+            candidates = _build_replay_candidates(
+                schemas=index.schemas(*route),
+                route=route,
+                request_headers=request.headers,
+                body=body,
+            )
+            return await self._respond_live(candidates[0])
+        if self._mode == "auto":
+            response, candidates = _replay_matching(
+                index=index,
+                route=route,
+                request_headers=request.headers,
+                body=body,
+            )
+            if response is None:
+                response = await self._find_shared(route, request.headers, body)
+            if response is None:
+                return await self._respond_live(candidates[0])
+            return await self._replay_response(response)
+
+        miss_key = request_key(method, target, request.headers.raw, body)
+        if self._misses.rejects(method, target, miss_key):
+            return self._miss_response(method, target, request.headers, body)
+
+        response, _ = _replay_matching(
+            index=index,
+            route=route,
             request_headers=request.headers,
-            target=target,
             body=body,
         )
-        if chunks is None:
-            return Response(status_code=500, content=b"Interaction Not Found")
+        if response is None:
+            response = await self._find_shared(route, request.headers, body)
+        if response is None:
+            self._misses.remember(miss_key)
+            return self._miss_response(method, target, request.headers, body)
+        return await self._replay_response(response)
+
+    async def _find_shared(
+        self, route: RouteKey, request_headers: Headers, body: bytes
+    ) -> ServedResponse | None:
+        """Look a request missing from the index up in the shared store.
+
+        An interaction found there, recorded by another worker, is added to
+        the index so that later requests are served without a lookup.
+        """
+        if self._shared is None:
+            return None
+        interaction = await anyio.to_thread.run_sync(
+            _find_interaction,
+            self._shared,
+            route,
+            request_headers,
+            body,
+            limiter=self._lookups,
+        )
+        if interaction is None:
+            return None
+        index = self._recorder.adopt(interaction)
+        self._misses.refresh(index)
+        return index.find(interaction.request)
+
+    async def handle_websocket(self, websocket: WebSocket) -> None:
+        """Replay the recorded conversation of a WebSocket connection.
+
+        Connections are matched against interactions recorded with protocol
+        ``ws`` from their handshake, in every broker mode: conversations are
+        replayed but never recorded. A connection without a recording is
+        denied like an HTTP replay miss.
+        """
+        target = websocket.url.path
+        if websocket.url.query:
+            target = f"{target}?{websocket.url.query}"
+        response, _ = _replay_matching(
+            index=self._recorder.snapshot,
+            route=(WS_PROTOCOL, "GET", target),
+            request_headers=websocket.headers,
+            body=b"",
+        )
+        if response is None:
+            await _deny_websocket(websocket, _not_found_response())
+            return
+        await replay_conversation(
+            websocket,
+            response.chunks,
+            self._config.replay_speed,
+            self._payloads,
+        )
+
+    async def _respond_live(self, candidate: InteractionRequest) -> Response:
+        """Forward a request to the broker's live responder and record it.
+
+        Concurrent identical requests are coalesced into one upstream call
+        whose chunks are streamed to all of them as they arrive. The
+        interaction is recorded when the upstream response is complete and
+        dropped if the upstream fails or every client disconnects first.
+
+        A new upstream call must first be admitted by the admission
+        controller; requests joining a call already in flight are not.
+
+        Raises:
+            LiveResponderRequiredError: If the broker has no live responder.
+        """
+        live_responder = self._live_responder
+        if live_responder is None:
+            raise LiveResponderRequiredError(self._mode)
+        key = candidate.fingerprint().value
+        release_slot = None
+        if key not in self._flights:
+            try:
+                release_slot = await self._admission.admit(candidate.target)
+            except AdmissionRejectedError as error:
+                return _busy_response(error.retry_after)
+            if key in self._flights:
+                # An identical request started the call while this one waited.
+                release_slot()
+                release_slot = None
+        flight = self._flights.join(
+            key,
+            lambda: _live_chunks(live_responder, candidate),
+            on_complete=lambda spool: self._record(candidate, spool),
+            on_finish=release_slot,
+        )
+        release = _once(flight.release)
+        chunks = flight.subscribe()
+        try:
+            first_chunk = await anext(chunks)
+        except BaseException:
+            release()
+            raise
+
+        async def stream_body() -> AsyncIterator[bytes]:
+            try:
+                yield first_chunk.data
+                async for chunk in chunks:
+                    yield chunk.data
+            finally:
+                release()
+
+        return _ReleasingStreamingResponse(
+            stream_body(), parse_status_code((first_chunk,)), release
+        )
+
+    def _record(self, request: InteractionRequest, spool: ChunkSpool) -> None:
+        """Record a complete live response, moving large payloads to sidecars.
+
+        Large payloads are copied from the spool to their sidecar files
+        block by block, so a spilled response is recorded without reading
+        it back into memory.
+        """
+        if self._policy.oversized(spool.size):
+            return
+        chunks = tuple(
+            self._recorded_chunk(spool, position) for position in range(len(spool))
+        )
+        self._recorder.record(request, chunks)
+
+    def _recorded_chunk(self, spool: ChunkSpool, position: int) -> ResponseChunk:
+        """Return the chunk at position as it is recorded."""
+        header, length = spool.header(position)
+        if self._sidecars is None or length <= self._sidecars.threshold:
+            return spool[position]
+        return self._sidecars.write(header, spool.payload(position))
+
+    async def _replay_response(self, response: ServedResponse) -> Response:
+        """Build the HTTP response for a recorded interaction."""
+        return await _replay_response(response, self._config, self._payloads)
+
+    def _miss_response(
+        self, method: str, target: str, headers: Headers, body: bytes
+    ) -> Response:
+        """Build the response for a replay miss, with diagnostics if enabled."""
+        if self._diagnostics is None:
+            return _not_found_response()
+        explanation = self._diagnostics.explain(method, target, headers, body)
+        logger.warning(
+            "Replay miss for %s %s",
+            method,
+            target,
+            extra={"replay_miss": explanation},
+        )
+        return JSONResponse(explanation, status_code=500)
+
+
+class _Loader:
+    """Loads the broker, possibly in the background, and reports readiness."""
+
+    def __init__(self, config: AdapterConfig) -> None:
+        """Initialize a loader that is not ready yet."""
+        self._config = config
+        self._handler: _RequestHandler | None = None
+        self._error: Exception | None = None
+
+    @property
+    def ready(self) -> bool:
+        """Get whether requests can be served."""
+        return self._handler is not None
+
+    @property
+    def recording_drops(self) -> dict[DropReason, int]:
+        """Get the number of live interactions not recorded, per reason."""
+        if self._handler is None:
+            return {}
+        return self._handler.recording_drops
+
+    def start(self, broker: Broker) -> None:
+        """Index the broker's cassette in the calling thread."""
+        self._handler = _RequestHandler(broker, self._config)
+
+    def start_in_background(self, create_broker: Callable[[], Broker]) -> None:
+        """Create the broker and index its cassette in a daemon thread."""
+        thread = threading.Thread(
+            target=self._load,
+            args=(create_broker,),
+            name="cassette-loader",
+            daemon=True,
+        )
+        thread.start()
+
+    def _load(self, create_broker: Callable[[], Broker]) -> None:
+        """Create the broker and the request handler, recording any failure."""
+        try:
+            self.start(create_broker())
+        except Exception as error:
+            logger.exception("Failed to load the cassette")
+            self._error = error
+
+    async def handle_request(self, request: Request) -> Response:
+        """Serve a request, or answer 503 while the cassette is loading."""
+        if self._handler is None:
+            return Response(status_code=503, content=b"Cassette Not Ready")
+        return await self._handler.handle_request(request)
 
-        status_code = 200
-        if chunks:
-            for key, value in chunks[0].metadata:
-                if key == "status_code":
-                    status_code = int(value)
+    async def handle_websocket(self, websocket: WebSocket) -> None:
+        """Replay a WebSocket conversation, or deny it while loading."""
+        if self._handler is None:
+            await _deny_websocket(
+                websocket, Response(status_code=503, content=b"Cassette Not Ready")
+            )
+            return
+        await self._handler.handle_websocket(websocket)
+
+    async def health(self, _request: Request) -> Response:
+        """Answer the liveness probe."""
+        return JSONResponse({"status": "ok"})
+
+    async def readiness(self, _request: Request) -> Response:
+        """Answer the readiness probe with the loading state."""
+        if self._handler is not None:
+            return JSONResponse({"status": "ready"})
+        if self._error is not None:
+            return JSONResponse(
+                {"status": "failed", "error": str(self._error)}, status_code=503
+            )
+        return JSONResponse({"status": "loading"}, status_code=503)
+
+
+class _ReleasingStreamingResponse(StreamingResponse):
+    """Streaming response that runs release however sending it ends.
+
+    The body iterator's own cleanup never runs if sending fails before the
+    body is started, for example when the client disconnected before the
+    response start was sent.
+    """
+
+    def __init__(
+        self, content: AsyncIterator[bytes], status_code: int, release: Release
+    ) -> None:
+        """Initialize the response with a release callback.
+
+        Args:
+            content: The response body.
+            status_code: The response status code.
+            release: Called once the response is sent or abandoned.
+        """
+        super().__init__(content, status_code=status_code)
+        self._release = release
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Send the response, releasing its resources afterwards."""
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._release()
+
+
+def _once(callback: Release) -> Release:
+    """Return a callable running callback on its first call only."""
+    called = False
+
+    def run() -> None:
+        nonlocal called
+        if not called:
+            called = True
+            callback()
+
+    return run
+
+
+def _live_chunks(
+    live_responder: LiveResponder, request: InteractionRequest
+) -> Iterator[ResponseChunk]:
+    """Call live_responder on first use, so that it runs in a worker thread."""
+    yield from live_responder(request)
+
+
+def _busy_response(retry_after: int) -> Response:
+    """Build the response for an upstream call that was not admitted."""
+    return Response(
+        status_code=503,
+        content=b"Upstream Busy",
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+async def _deny_websocket(websocket: WebSocket, response: Response) -> None:
+    """Reject a WebSocket handshake with response, or by closing it.
+
+    Servers without the denial response extension get a close with ``1008``
+    before the handshake completes, which clients see as ``403``.
+    """
+    if "websocket.http.response" in websocket.scope.get("extensions", {}):
+        await websocket.send_denial_response(response)
+    else:
+        await websocket.close(code=1008)
+
+
+def _not_found_response() -> Response:
+    """Build the response for a replay miss."""
+    return Response(status_code=500, content=b"Interaction Not Found")
+
+
+class _Payloads:
+    """Resolves the payloads of recorded chunks for replay.
+
+    Inline payloads are returned at once. Bodies kept by the cassette store
+    or in sidecar files are read in worker threads from a limiter of their
+    own, so a large first read does not block the event loop and stalled
+    upstream pulls do not delay it.
+    """
+
+    def __init__(
+        self, bodies: BodySource | None, sidecars: SidecarFiles | None
+    ) -> None:
+        """Initialize the resolver.
+
+        Args:
+            bodies: Loads bodies referenced by digest, if the store can.
+            sidecars: Reads bodies in sidecar files, if configured.
+        """
+        self._bodies = bodies
+        self._sidecars = sidecars
+        self._limiter = anyio.CapacityLimiter(_BODY_READ_THREADS)
+
+    def file(self, chunk: ResponseChunk) -> Path | None:
+        """Return the sidecar file holding the payload of chunk, if any."""
+        return self._sidecars.path(chunk) if self._sidecars is not None else None
+
+    async def __call__(self, chunk: ResponseChunk) -> bytes:
+        """Return the payload of chunk, reading stored bodies in a thread.
+
+        Raises:
+            CassetteLoadError: If chunk refers to a sidecar file and no
+                sidecar directory is configured, to a body digest and the
+                store keeps no bodies, or the body cannot be read.
+        """
+        if chunk.data or (
+            chunk_body_file(chunk) is None and chunk_body_digest(chunk) is None
+        ):
+            return chunk.data
+        return await anyio.to_thread.run_sync(self._read, chunk, limiter=self._limiter)
 
-        response_body = b"".join(chunk.data for chunk in chunks)
-        return Response(status_code=status_code, content=response_body)
+    def _read(self, chunk: ResponseChunk) -> bytes:
+        """Read the payload of a chunk stored outside the cassette."""
+        name = chunk_body_file(chunk)
+        if name is not None:
+            if self._sidecars is None:
+                raise CassetteLoadError(
+                    Path(name), ValueError("no sidecar directory is configured")
+                )
+            return self._sidecars.read(chunk)
+        return resolve_chunk_data(chunk, self._bodies)
+
+
+async def _replay_response(
+    response: ServedResponse, config: AdapterConfig, payloads: _Payloads
+) -> Response:
+    """Build the HTTP response for a recorded interaction.
+
+    A single-chunk body is sent from its buffer as is, without joining, or
+    as a file response if it is a sidecar file.
+    """
+    chunks = response.chunks
+    if config.replay_speed > 0 and response.timed:
+        return StreamingResponse(
+            paced_chunks(chunks, config.replay_speed, payloads),
+            status_code=response.status_code,
+        )
 
-    return handle_request
+    if len(chunks) == 1:
+        sidecar_path = payloads.file(chunks[0])
+        if sidecar_path is not None:
+            return FileResponse(sidecar_path, status_code=response.status_code)
+        response_body = await payloads(chunks[0])
+    else:
+        response_body = b"".join([await payloads(chunk) for chunk in chunks])
+    return Response(status_code=response.status_code, content=response_body)
 
 
 def _replay_matching(
-    broker: Broker,
-    method: str,
+    index: ServingIndex,
+    route: RouteKey,
     request_headers: Headers,
-    target: str,
     body: bytes,
-) -> tuple[ResponseChunk, ...] | None:
-    """Try replay candidates built from stored interaction header schemas."""
+) -> tuple[ServedResponse | None, tuple[InteractionRequest, ...]]:
+    """Try replay candidates built from stored interaction header schemas.
+
+    Returns:
+        The first recorded response matching a candidate, or None, together
+        with the candidates that were tried.
+    """
     candidates = _build_replay_candidates(
-        interactions=broker.cassette.interactions,
-        method=method,
+        schemas=index.schemas(*route),
+        route=route,
         request_headers=request_headers,
-        target=target,
         body=body,
     )
     for candidate in candidates:
-        try:
-            return tuple(broker.replay(candidate))
-        except InteractionNotFoundError:
-            continue
+        response = index.find(candidate)
+        if response is not None:
+            return response, candidates
+    return None, candidates
+
+
+def _find_interaction(
+    source: InteractionSource,
+    route: RouteKey,
+    request_headers: Headers,
+    body: bytes,
+) -> Interaction | None:
+    """Return the interaction of source matching a request, if any."""
+    schemas = source.header_schemas(*route)
+    if not schemas:
+        return None
+    for candidate in _build_replay_candidates(
+        schemas=schemas, route=route, request_headers=request_headers, body=body
+    ):
+        interaction = source.find_interaction(candidate.fingerprint().value)
+        if interaction is not None:
+            return interaction
     return None
 
 
 def _build_replay_candidates(
-    interactions: tuple[Interaction, ...],
-    method: str,
+    schemas: tuple[HeaderSchema, ...],
+    route: RouteKey,
     request_headers: Headers,
-    target: str,
     body: bytes,
 ) -> tuple[InteractionRequest, ...]:
-    """Create candidate requests using the stored header fields per interaction."""
+    """Create candidate requests using the header schemas recorded for a route."""
+    protocol, method, target = route
     candidates: list[InteractionRequest] = []
     seen_fingerprints: set[str] = set()
 
-    for interaction in interactions:
-        recorded_request = interaction.request
-        if recorded_request.protocol != "http":
-            continue
-        if recorded_request.action != method:
-            continue
-        if recorded_request.target != target:
-            continue
-
+    for schema in schemas:
         candidate_headers: list[tuple[str, str]] = []
         missing_header = False
-        for key, _ in recorded_request.headers:
+        for key in schema:
             value = request_headers.get(key)
             if value is None:
                 missing_header = True
@@ -115,7 +634,7 @@ def _build_replay_candidates(
             continue
 
         candidate = InteractionRequest(
-            protocol="http",
+            protocol=protocol,
             action=method,
             target=target,
             headers=tuple(candidate_headers),
@@ -130,7 +649,7 @@ def _build_replay_candidates(
     if not candidates:
         candidates.append(
             InteractionRequest(
-                protocol="http",
+                protocol=protocol,
                 action=method,
                 target=target,
                 headers=(),
@@ -144,22 +663,58 @@ def _build_replay_candidates(
 class InterpositionHttpAdapter(Starlette):
     """ASGI application that replays HTTP interactions via an Interposition Broker."""
 
-    def __init__(self, broker: Broker) -> None:
+    def __init__(
+        self,
+        broker: Broker | Callable[[], Broker],
+        config: AdapterConfig | None = None,
+    ) -> None:
         """Initialize the adapter with a Broker.
 
+        Besides the replay routes, the adapter answers ``GET /__health``
+        with ``200`` as soon as it is serving and ``GET /__ready`` with
+        ``200`` once the cassette is indexed, ``503`` before. WebSocket
+        connections on any path replay conversations recorded with
+        protocol ``ws``.
+
         Args:
-            broker: The Interposition Broker to use for replaying interactions.
+            broker: The Interposition Broker to use for replaying interactions,
+                or a callable creating it. A callable is invoked in a
+                background thread; until it returns, replay routes answer
+                ``503``.
+            config: Optional adapter settings. Defaults to AdapterConfig().
         """
-        self._broker = broker
-        handler = _create_handler(broker)
+        self._config = config if config is not None else AdapterConfig()
+        self._loader = _Loader(self._config)
         routes = [
+            Route("/__health", self._loader.health, methods=["GET"]),
+            Route("/__ready", self._loader.readiness, methods=["GET"]),
             Route(
                 "/{path:path}",
-                handler,
+                self._loader.handle_request,
                 methods=["GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS"],
             ),
+            WebSocketRoute("/{path:path}", self._loader.handle_websocket),
         ]
         super().__init__(routes=routes)
+        if isinstance(broker, Broker):
+            self._loader.start(broker)
+        else:
+            self._loader.start_in_background(broker)
+
+    @property
+    def ready(self) -> bool:
+        """Get whether the cassette is loaded and requests are served."""
+        return self._loader.ready
+
+    @property
+    def recording_drops(self) -> dict[DropReason, int]:
+        """Get the number of live interactions not recorded, per reason.
+
+        Reasons are ``existing``, ``variants``, ``sampled`` and
+        ``body_size``, following the recording settings of AdapterConfig.
+        Dropped interactions are still forwarded and answered.
+        """
+        return self._loader.recording_drops
 
     @classmethod
     def from_store(
@@ -167,21 +722,37 @@ class InterpositionHttpAdapter(Starlette):
         cassette_store: "CassetteStore",
         mode: BrokerMode = "replay",
         live_responder: "LiveResponder | None" = None,
+        config: AdapterConfig | None = None,
     ) -> "InterpositionHttpAdapter":
         """Create an adapter from a CassetteStore.
 
+        Recorded chunks are stamped with their arrival offset so that they
+        can later be replayed with their original timing.
+
+        With ``config.background_load``, the cassette is loaded and indexed
+        in a background thread and load errors are reported by
+        ``/__ready`` instead of raised.
+
         Args:
             cassette_store: A store that provides a Cassette.
             mode: The broker mode (replay, record, or auto).
             live_responder: Optional callable for upstream forwarding.
+            config: Optional adapter settings.
 
         Returns:
             A fully configured InterpositionHttpAdapter.
         """
-        broker = Broker.from_store(
-            cassette_store, mode=mode, live_responder=live_responder
-        )
-        return cls(broker=broker)
+        if live_responder is not None:
+            live_responder = record_chunk_offsets(live_responder)
+
+        def create_broker() -> Broker:
+            return Broker.from_store(
+                cassette_store, mode=mode, live_responder=live_responder
+            )
+
+        if config is not None and config.background_load:
+            return cls(broker=create_broker, config=config)
+        return cls(broker=create_broker(), config=config)
 
     @classmethod
     def from_cassette_file(
@@ -189,6 +760,7 @@ class InterpositionHttpAdapter(Starlette):
         path: str | Path,
         mode: BrokerMode = "replay",
         live_responder: "LiveResponder | None" = None,
+        config: AdapterConfig | None = None,
     ) -> "InterpositionHttpAdapter":
         """Create an adapter from a Cassette JSON file.
 
@@ -196,9 +768,14 @@ class InterpositionHttpAdapter(Starlette):
             path: Path to a JSON file containing a Cassette.
             mode: The broker mode (replay, record, or auto).
             live_responder: Optional callable for upstream forwarding.
+            config: Optional adapter settings.
 
         Returns:
             A fully configured InterpositionHttpAdapter.
         """
+        from interposition.stores import JsonFileCassetteStore  # noqa: PLC0415
+
         store = JsonFileCassetteStore(Path(path))
-        return cls.from_store(store, mode=mode, live_responder=live_responder)
+        return cls.from_store(
+            store, mode=mode, live_responder=live_responder, config=config
+        )
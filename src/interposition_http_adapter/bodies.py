@@ -0,0 +1,204 @@
+"""Response bodies stored outside of the cassette."""
+
+import hashlib
+import os
+import tempfile
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Protocol, runtime_checkable
+
+from interposition import CassetteLoadError, CassetteSaveError, ResponseChunk
+
+BODY_DIGEST_KEY = "body_sha256"
+"""Chunk metadata key referencing a body by its SHA-256 digest."""
+
+BODY_FILE_KEY = "body_file"
+"""Chunk metadata key referencing a body stored in a sidecar file."""
+
+
+@runtime_checkable
+class BodySource(Protocol):
+    """Port for resolving body references to their content.
+
+    Cassette stores that keep response bodies outside of the cassette
+    implement this protocol. The adapter detects it on the broker's cassette
+    store and resolves references lazily when a chunk is served.
+    """
+
+    def load_body(self, digest: str) -> bytes:
+        """Return the body stored under digest.
+
+        Args:
+            digest: Hex SHA-256 digest of the body.
+
+        Returns:
+            The body content. Repeated calls return the same buffer.
+        """
+        ...
+
+
+def body_digest(data: bytes) -> str:
+    """Return the hex SHA-256 digest identifying data."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def chunk_body_digest(chunk: ResponseChunk) -> str | None:
+    """Return the body digest a chunk refers to, if any."""
+    for key, value in chunk.metadata:
+        if key == BODY_DIGEST_KEY:
+            return value
+    return None
+
+
+def reference_body(chunk: ResponseChunk, digest: str) -> ResponseChunk:
+    """Return a copy of chunk whose payload is replaced by a digest reference."""
+    return ResponseChunk(
+        data=b"",
+        sequence=chunk.sequence,
+        metadata=(*chunk.metadata, (BODY_DIGEST_KEY, digest)),
+    )
+
+
+def resolve_chunk_data(chunk: ResponseChunk, source: BodySource | None) -> bytes:
+    """Return the payload of chunk, loading referenced bodies from source.
+
+    Args:
+        chunk: The chunk to resolve.
+        source: Where referenced bodies are loaded from, or None if the
+            cassette store keeps no bodies of its own.
+
+    Returns:
+        The chunk payload.
+
+    Raises:
+        CassetteLoadError: If chunk refers to a body and source is None.
+    """
+    if chunk.data:
+        return chunk.data
+    digest = chunk_body_digest(chunk)
+    if digest is None:
+        return chunk.data
+    if source is None:
+        raise CassetteLoadError(
+            Path(digest), ValueError("the cassette store cannot load bodies")
+        )
+    return source.load_body(digest)
+
+
+def chunk_body_file(chunk: ResponseChunk) -> str | None:
+    """Return the sidecar file name a chunk refers to, if any."""
+    for key, value in chunk.metadata:
+        if key == BODY_FILE_KEY:
+            return value
+    return None
+
+
+class SidecarFiles:
+    """Response bodies kept as plain files next to the cassette.
+
+    A chunk refers to its sidecar through ``body_file`` metadata holding a
+    path relative to the directory, with empty data. Sidecar files are
+    served as they are, so the server can send them with ``sendfile`` and
+    answer range requests. Files are named by the SHA-256 digest of their
+    content, so identical bodies share one file.
+
+    Attributes:
+        directory: Directory holding the sidecar files.
+        threshold: Payloads larger than this many bytes are externalized.
+    """
+
+    def __init__(self, directory: Path, threshold: int) -> None:
+        """Initialize the sidecar directory.
+
+        Args:
+            directory: Directory holding the sidecar files.
+            threshold: Payloads larger than this many bytes are externalized.
+        """
+        self.directory = directory
+        self.threshold = threshold
+
+    def path(self, chunk: ResponseChunk) -> Path | None:
+        """Return the sidecar file of chunk, or None if its data is inline.
+
+        Raises:
+            CassetteLoadError: If the reference points outside the directory.
+        """
+        name = chunk_body_file(chunk)
+        if name is None:
+            return None
+        directory = self.directory.resolve()
+        path = (directory / name).resolve()
+        if not path.is_relative_to(directory):
+            raise CassetteLoadError(path, ValueError("outside the sidecar directory"))
+        return path
+
+    def read(self, chunk: ResponseChunk) -> bytes:
+        """Return the payload of chunk, reading its sidecar file if any.
+
+        Raises:
+            CassetteLoadError: If the sidecar file cannot be read.
+        """
+        path = self.path(chunk)
+        if path is None:
+            return chunk.data
+        try:
+            return path.read_bytes()
+        except OSError as e:
+            raise CassetteLoadError(path, e) from e
+
+    def externalize(self, chunk: ResponseChunk) -> ResponseChunk:
+        """Move the payload of chunk to a sidecar file if it is large enough.
+
+        Returns:
+            The chunk referring to its sidecar, or chunk itself.
+
+        Raises:
+            CassetteSaveError: If the sidecar file cannot be written.
+        """
+        if len(chunk.data) <= self.threshold:
+            return chunk
+        return self.write(chunk, (chunk.data,))
+
+    def write(self, chunk: ResponseChunk, payload: Iterable[bytes]) -> ResponseChunk:
+        """Write a payload to a sidecar file, one block at a time.
+
+        The payload is hashed while it is written, so a body streamed from
+        disk is never held in memory as a whole.
+
+        Args:
+            chunk: The chunk the payload belongs to. Its data is ignored.
+            payload: Consecutive blocks of the payload.
+
+        Returns:
+            A copy of chunk referring to the sidecar file.
+
+        Raises:
+            CassetteSaveError: If the sidecar file cannot be written.
+        """
+        digest = hashlib.sha256()
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            descriptor, temporary = tempfile.mkstemp(dir=self.directory)
+        except OSError as e:
+            raise CassetteSaveError(self.directory, e) from e
+        try:
+            with os.fdopen(descriptor, "wb") as body_file:
+                for block in payload:
+                    digest.update(block)
+                    body_file.write(block)
+            path = self.directory / digest.hexdigest()
+            if path.exists():
+                Path(temporary).unlink()
+            else:
+                Path(temporary).replace(path)
+        except OSError as e:
+            Path(temporary).unlink(missing_ok=True)
+            raise CassetteSaveError(Path(temporary), e) from e
+        except BaseException:
+            Path(temporary).unlink(missing_ok=True)
+            raise
+        return ResponseChunk(
+            data=b"",
+            sequence=chunk.sequence,
+            metadata=(*chunk.metadata, (BODY_FILE_KEY, path.name)),
+        )
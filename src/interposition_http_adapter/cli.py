@@ -1,18 +1,341 @@
 """CLI module for interposition_http_adapter."""
 
-from argparse import ArgumentParser
+import dataclasses
+import json
+import sys
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
 
 from interposition_http_adapter._version import __version__
 
+_KIB = 1024.0
+
 
 def generate_cli_parser() -> ArgumentParser:
     """Generate the argument parser for the interposition_http_adapter CLI."""
     parser = ArgumentParser(description="HTTP adapter for Interposition.")
     parser.add_argument("--version", action="version", version=__version__)
+    subparsers = parser.add_subparsers(title="commands")
+
+    analyze = subparsers.add_parser(
+        "analyze",
+        help="report how a cassette will perform when served",
+        description=(
+            "Stream through a JSON cassette and report route fan-out, header "
+            "schemas, body sizes, duplicates, fingerprint collisions and "
+            "estimated memory and lookup cost. Memory grows with the number "
+            "of distinct routes, fingerprints and bodies in the cassette."
+        ),
+    )
+    analyze.add_argument("cassette", type=Path, help="path to a JSON cassette")
+    analyze.add_argument(
+        "--top", type=int, default=10, help="number of routes to list (default: 10)"
+    )
+    analyze.add_argument("--json", action="store_true", help="print the report as JSON")
+    analyze.set_defaults(handler=_analyze)
+
+    serve = subparsers.add_parser(
+        "serve",
+        help="replay a cassette over HTTP/1.1 or HTTP/2",
+        description=(
+            "Serve a JSON cassette in replay mode. HTTP/2 is served by "
+            "hypercorn, available with the http2 extra."
+        ),
+    )
+    serve.add_argument("cassette", type=Path, help="path to a JSON cassette")
+    serve.add_argument("--host", default="127.0.0.1", help="interface to bind")
+    serve.add_argument("--port", type=int, default=8000, help="port to bind")
+    serve.add_argument(
+        "--server",
+        choices=["uvicorn", "hypercorn"],
+        default=None,
+        help="ASGI server (default: hypercorn with --http2, uvicorn otherwise)",
+    )
+    serve.add_argument(
+        "--http2", action="store_true", help="offer HTTP/2, as h2c or over TLS"
+    )
+    serve.add_argument("--certfile", type=Path, help="PEM certificate for TLS")
+    serve.add_argument("--keyfile", type=Path, help="PEM private key for TLS")
+    serve.add_argument(
+        "--self-signed",
+        type=Path,
+        metavar="DIRECTORY",
+        help="serve TLS with a self-signed certificate written to DIRECTORY",
+    )
+    serve.set_defaults(handler=_serve)
+
+    loadgen = subparsers.add_parser(
+        "loadgen",
+        help="replay a request log against a running adapter",
+        description=(
+            "Send the requests of a JSONL request log, or of a cassette, to a "
+            "running adapter at a fixed rate and report throughput, latency "
+            "and replay misses. Requires the loadgen extra."
+        ),
+    )
+    loadgen.add_argument("url", help="base URL of the adapter")
+    loadgen.add_argument("log", type=Path, help="path to a JSONL request log")
+    loadgen.add_argument(
+        "--cassette",
+        action="store_true",
+        help="read the requests of a JSON cassette instead of a request log",
+    )
+    loadgen.add_argument(
+        "--rate", type=float, default=100.0, help="requests per second (default: 100)"
+    )
+    loadgen.add_argument(
+        "--requests",
+        type=int,
+        default=1000,
+        help="number of requests to send (default: 1000)",
+    )
+    loadgen.add_argument(
+        "--connections",
+        type=int,
+        default=64,
+        help="keep-alive connections (default: 64)",
+    )
+    loadgen.add_argument(
+        "--timeout",
+        type=float,
+        default=10.0,
+        help="seconds per request (default: 10)",
+    )
+    loadgen.add_argument("--json", action="store_true", help="print the report as JSON")
+    loadgen.set_defaults(handler=_loadgen)
+
+    shard = subparsers.add_parser(
+        "shard",
+        help="split a cassette into partitions served by separate adapters",
+        description=(
+            "Stream through a JSON cassette and write one cassette per shard, "
+            "assigning each interaction by a consistent hash of its method and "
+            "target."
+        ),
+    )
+    shard.add_argument("cassette", type=Path, help="path to a JSON cassette")
+    shard.add_argument("--shards", type=int, required=True, help="number of partitions")
+    shard.add_argument(
+        "--output",
+        type=Path,
+        required=True,
+        help="directory receiving shard-<n>.json files",
+    )
+    _add_virtual_nodes_argument(shard)
+    shard.set_defaults(handler=_shard)
+
+    route = subparsers.add_parser(
+        "route",
+        help="forward requests to the shard adapters owning their route",
+        description=(
+            "Serve a front router forwarding each request to the adapter "
+            "serving its shard over keep-alive connections. Requires the "
+            "cluster extra."
+        ),
+    )
+    route.add_argument(
+        "shard_urls",
+        nargs="+",
+        metavar="SHARD_URL",
+        help="base URL of each shard adapter, in shard order",
+    )
+    route.add_argument("--host", default="127.0.0.1", help="interface to bind")
+    route.add_argument("--port", type=int, default=8000, help="port to bind")
+    route.add_argument(
+        "--connections",
+        type=int,
+        default=100,
+        help="keep-alive connections to all shards (default: 100)",
+    )
+    _add_virtual_nodes_argument(route)
+    route.set_defaults(handler=_route)
     return parser
 
 
+def _add_virtual_nodes_argument(parser: ArgumentParser) -> None:
+    """Add the hash ring option, which must match between shard and route."""
+    parser.add_argument(
+        "--virtual-nodes",
+        type=int,
+        default=64,
+        help="hash ring points per shard; must match between shard and route",
+    )
+
+
 def main() -> None:
     """Entry point for the interposition_http_adapter command-line interface."""
     parser = generate_cli_parser()
-    _ = parser.parse_args()
+    args = parser.parse_args()
+    handler = getattr(args, "handler", None)
+    if handler is not None:
+        handler(args)
+
+
+def _analyze(args: Namespace) -> None:
+    """Run the analyze command."""
+    from interposition_http_adapter.analysis import analyze_cassette  # noqa: PLC0415
+
+    try:
+        report = analyze_cassette(args.cassette, top=args.top)
+    except (OSError, ValueError) as e:
+        sys.exit(f"error: cannot analyze {args.cassette}: {e}")
+    if args.json:
+        sys.stdout.write(json.dumps(dataclasses.asdict(report), indent=2) + "\n")
+        return
+    lines = [
+        f"interactions: {report.interactions}",
+        f"routes: {report.routes}",
+        f"header schemas per route: max {report.max_header_schemas}",
+        f"replay candidates per lookup: mean {report.mean_candidates:.2f}",
+        f"fingerprint collisions: {report.fingerprint_collisions}",
+        (
+            f"response bodies: {_format_bytes(report.body_bytes)} in total, "
+            f"largest {_format_bytes(report.largest_body)}"
+        ),
+        *(
+            f"  {label:>10}: {count}"
+            for label, count in report.body_sizes.items()
+            if count
+        ),
+        f"referenced body chunks: {report.referenced_chunks}",
+        (
+            f"duplicate bodies: {report.duplicate_bodies} "
+            f"({_format_bytes(report.duplicate_body_bytes)})"
+        ),
+        (
+            f"estimated memory: models {_format_bytes(report.estimated_model_bytes)}"
+            f" + bodies {_format_bytes(report.body_bytes)},"
+            f" index {_format_bytes(report.estimated_index_bytes)}"
+        ),
+        "top routes:",
+        *(
+            f"  {route.interactions:>8}  {route.method} {route.target}"
+            f"  ({route.header_schemas} header schemas)"
+            for route in report.top_routes
+        ),
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+def _serve(args: Namespace) -> None:
+    """Run the serve command."""
+    from interposition_http_adapter import (  # noqa: PLC0415
+        AdapterConfig,
+        InterpositionHttpAdapter,
+    )
+    from interposition_http_adapter.serving import (  # noqa: PLC0415
+        ServeOptions,
+        generate_self_signed_certificate,
+        serve,
+    )
+
+    certfile, keyfile = args.certfile, args.keyfile
+    try:
+        if args.self_signed is not None:
+            certfile, keyfile = generate_self_signed_certificate(args.self_signed)
+        options = ServeOptions(
+            host=args.host,
+            port=args.port,
+            server=args.server or ("hypercorn" if args.http2 else "uvicorn"),
+            http2=args.http2,
+            certfile=certfile,
+            keyfile=keyfile,
+        )
+        adapter = InterpositionHttpAdapter.from_cassette_file(
+            args.cassette, config=AdapterConfig(background_load=True)
+        )
+        serve(adapter, options)
+    except (RuntimeError, ValueError, OSError) as e:
+        sys.exit(f"error: {e}")
+
+
+def _loadgen(args: Namespace) -> None:
+    """Run the loadgen command."""
+    import anyio  # noqa: PLC0415
+
+    from interposition_http_adapter.loadgen import (  # noqa: PLC0415
+        LoadOptions,
+        load_requests,
+        run_load,
+    )
+
+    try:
+        options = LoadOptions(
+            rate=args.rate,
+            requests=args.requests,
+            connections=args.connections,
+            timeout=args.timeout,
+        )
+        log = load_requests(args.log, from_cassette=args.cassette)
+        report = anyio.run(run_load, args.url, log, options)
+    except (RuntimeError, ValueError, OSError) as e:
+        sys.exit(f"error: {e}")
+    if args.json:
+        document = {**dataclasses.asdict(report), "miss_rate": report.miss_rate}
+        sys.stdout.write(json.dumps(document, indent=2) + "\n")
+        return
+    lines = [
+        (
+            f"requests: {report.sent} sent, {report.completed} completed, "
+            f"{report.errors} failed"
+        ),
+        f"duration: {report.duration:.2f} s",
+        f"throughput: {report.throughput:.1f} requests/s",
+        f"misses: {report.misses} ({report.miss_rate:.2%})",
+        "status codes:",
+        *(f"  {code}: {count}" for code, count in report.status_codes.items()),
+        "latency (ms, from scheduled start):",
+        *(f"  {name:>5}: {value:.2f}" for name, value in report.latency_ms.items()),
+        "latency histogram:",
+        *(
+            f"  {label:>10}: {count}"
+            for label, count in report.latency_histogram.items()
+            if count
+        ),
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+def _shard(args: Namespace) -> None:
+    """Run the shard command."""
+    from interposition_http_adapter.sharding import (  # noqa: PLC0415
+        HashRing,
+        shard_cassette,
+    )
+
+    try:
+        ring = HashRing(args.shards, args.virtual_nodes)
+        shards = shard_cassette(args.cassette, args.output, ring)
+    except (OSError, ValueError) as e:
+        sys.exit(f"error: cannot shard {args.cassette}: {e}")
+    for shard in shards:
+        sys.stdout.write(f"{shard.path}: {shard.interactions} interactions\n")
+
+
+def _route(args: Namespace) -> None:
+    """Run the route command."""
+    from interposition_http_adapter.serving import (  # noqa: PLC0415
+        ServeOptions,
+        serve,
+    )
+    from interposition_http_adapter.sharding import ShardRouter  # noqa: PLC0415
+
+    try:
+        router = ShardRouter(
+            args.shard_urls,
+            virtual_nodes=args.virtual_nodes,
+            connections=args.connections,
+        )
+        serve(router, ServeOptions(host=args.host, port=args.port))
+    except (RuntimeError, ValueError, OSError) as e:
+        sys.exit(f"error: {e}")
+
+
+def _format_bytes(size: int) -> str:
+    """Format a byte count with a binary unit."""
+    value = float(size)
+    for unit in ("B", "KiB", "MiB"):
+        if value < _KIB:
+            return f"{size} B" if unit == "B" else f"{value:.1f} {unit}"
+        value /= _KIB
+    return f"{value:.1f} GiB"
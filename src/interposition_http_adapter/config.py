@@ -0,0 +1,133 @@
+"""Configuration for the HTTP adapter."""
+
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class AdapterConfig:
+    """Tunable behavior of an InterpositionHttpAdapter.
+
+    Bundles optional adapter settings into a single object so that the
+    constructor and factory methods keep a small, stable signature.
+
+    Attributes:
+        replay_speed: Multiplier applied to the recorded chunk timing during
+            replay. ``0`` sends chunks without delay, ``1`` reproduces the
+            recorded timing and larger values fast-forward it.
+        negative_cache_size: Maximum number of replay misses remembered so
+            that repeated identical misses skip candidate matching. ``0``
+            disables the cache.
+        negative_cache_ttl: Seconds a remembered replay miss stays valid.
+        miss_diagnostics: If True, replay misses are answered with a JSON
+            explanation of the closest recorded interactions and logged.
+        record_spool_threshold: Payload bytes of a live response buffered in
+            memory while it is streamed and recorded. Larger responses are
+            spooled to a temporary file.
+        sidecar_dir: Directory of sidecar body files. Recorded chunks larger
+            than sidecar_threshold are written there instead of into the
+            cassette, and chunks referring to a sidecar file are served
+            from it. None disables sidecar files.
+        sidecar_threshold: Payload bytes above which a recorded chunk is
+            moved to a sidecar file.
+        max_upstream_in_flight: Maximum number of concurrent upstream calls.
+            ``0`` means unlimited. Identical requests sharing one call count
+            once, and replayed requests never count.
+        upstream_prefix_limits: Pairs of target prefix and maximum number of
+            concurrent upstream calls whose target starts with that prefix.
+            The longest matching prefix applies.
+        upstream_queue_size: Maximum number of requests waiting for an
+            upstream slot. Requests beyond it are answered with ``503`` and
+            a ``Retry-After`` header at once.
+        upstream_queue_timeout: Seconds a request waits for an upstream slot
+            before it is answered with ``503``.
+        background_load: If True, from_store and from_cassette_file return
+            at once and the cassette is loaded and indexed in a background
+            thread. Until it is ready, ``/__ready`` and the replay routes
+            answer ``503``.
+        record_skip_existing: If True, live interactions whose fingerprint
+            is already recorded are not recorded again.
+        record_max_variants: Maximum number of interactions recorded per
+            method and target. ``0`` means unlimited.
+        record_sample_rate: Probability of recording a live interaction for
+            a method and target that already has one. The first interaction
+            of a route is always recorded.
+        record_prefix_sample_rates: Pairs of target prefix and the sample
+            rate used instead of record_sample_rate for targets starting
+            with that prefix. The longest matching prefix applies.
+        record_max_body_size: Live responses larger than this many bytes
+            are not recorded. ``0`` means unlimited.
+    """
+
+    replay_speed: float = 0.0
+    negative_cache_size: int = 1024
+    negative_cache_ttl: float = 60.0
+    miss_diagnostics: bool = False
+    record_spool_threshold: int = 1024 * 1024
+    sidecar_dir: Path | None = None
+    sidecar_threshold: int = 1024 * 1024
+    max_upstream_in_flight: int = 0
+    upstream_prefix_limits: tuple[tuple[str, int], ...] = ()
+    upstream_queue_size: int = 128
+    upstream_queue_timeout: float = 30.0
+    background_load: bool = False
+    record_skip_existing: bool = False
+    record_max_variants: int = 0
+    record_sample_rate: float = 1.0
+    record_prefix_sample_rates: tuple[tuple[str, float], ...] = ()
+    record_max_body_size: int = 0
+
+    def __post_init__(self) -> None:
+        """Validate the configured values.
+
+        Raises:
+            ValueError: If a value is negative or a prefix limit is not
+                positive.
+        """
+        if self.replay_speed < 0:
+            msg = "replay_speed must not be negative"
+            raise ValueError(msg)
+        if self.negative_cache_size < 0:
+            msg = "negative_cache_size must not be negative"
+            raise ValueError(msg)
+        if self.negative_cache_ttl < 0:
+            msg = "negative_cache_ttl must not be negative"
+            raise ValueError(msg)
+        if self.record_spool_threshold < 0:
+            msg = "record_spool_threshold must not be negative"
+            raise ValueError(msg)
+        if self.sidecar_threshold < 0:
+            msg = "sidecar_threshold must not be negative"
+            raise ValueError(msg)
+        if self.max_upstream_in_flight < 0:
+            msg = "max_upstream_in_flight must not be negative"
+            raise ValueError(msg)
+        if any(limit < 1 for _, limit in self.upstream_prefix_limits):
+            msg = "upstream_prefix_limits must be positive"
+            raise ValueError(msg)
+        if self.upstream_queue_size < 0:
+            msg = "upstream_queue_size must not be negative"
+            raise ValueError(msg)
+        if self.upstream_queue_timeout < 0:
+            msg = "upstream_queue_timeout must not be negative"
+            raise ValueError(msg)
+        self._validate_recording()
+
+    def _validate_recording(self) -> None:
+        """Validate the recording policy settings.
+
+        Raises:
+            ValueError: If a value is out of range.
+        """
+        if self.record_max_variants < 0:
+            msg = "record_max_variants must not be negative"
+            raise ValueError(msg)
+        if not 0 <= self.record_sample_rate <= 1:
+            msg = "record_sample_rate must be between 0 and 1"
+            raise ValueError(msg)
+        if any(not 0 <= rate <= 1 for _, rate in self.record_prefix_sample_rates):
+            msg = "record_prefix_sample_rates must be between 0 and 1"
+            raise ValueError(msg)
+        if self.record_max_body_size < 0:
+            msg = "record_max_body_size must not be negative"
+            raise ValueError(msg)
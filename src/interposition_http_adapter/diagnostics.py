@@ -0,0 +1,229 @@
+"""Near-miss diagnostics for replay misses."""
+
+import hashlib
+import sys
+from collections.abc import Iterator, Mapping
+from typing import TypedDict
+
+from interposition import Cassette
+
+_DEFAULT_MAX_EXAMINED = 64
+_DEFAULT_LIMIT = 3
+
+
+class Difference(TypedDict, total=False):
+    """A single field in which a recorded interaction differs from a request."""
+
+    field: str
+    name: str
+    expected: str
+    actual: str | None
+
+
+class NearMiss(TypedDict):
+    """A recorded interaction close to the missed request."""
+
+    method: str
+    target: str
+    differences: list[Difference]
+
+
+class MissExplanation(TypedDict):
+    """Structured explanation of a replay miss."""
+
+    error: str
+    method: str
+    target: str
+    near_misses: list[NearMiss]
+
+
+def _split_target(target: str) -> tuple[str, str]:
+    """Split a request target into its path and query string."""
+    path, _, query = target.partition("?")
+    return path, query
+
+
+def _path_prefixes(path: str) -> Iterator[str]:
+    """Yield the proper segment prefixes of path, longest first."""
+    end = path.rfind("/")
+    while end > 0:
+        yield path[:end]
+        end = path.rfind("/", 0, end)
+
+
+def _body_digest(body: bytes) -> bytes:
+    """Return the digest a request body is compared by."""
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+class _RecordedRequest:
+    """The fields of a recorded HTTP request that near misses are compared by.
+
+    The request body is kept as a digest, so recorded bodies are not
+    retained.
+    """
+
+    __slots__ = ("action", "body_digest", "headers", "target")
+
+    def __init__(
+        self,
+        action: str,
+        target: str,
+        headers: tuple[tuple[str, str], ...],
+        body_digest: bytes,
+    ) -> None:
+        """Initialize the record."""
+        self.action = action
+        self.target = target
+        self.headers = headers
+        self.body_digest = body_digest
+
+
+def _differences(
+    recorded: _RecordedRequest,
+    method: str,
+    target: str,
+    headers: Mapping[str, str],
+    body_digest: bytes,
+) -> list[Difference]:
+    """List the fields in which recorded differs from the request.
+
+    Header values and bodies are never echoed back, only named.
+    """
+    differences: list[Difference] = []
+    if recorded.action != method:
+        differences.append(
+            {"field": "method", "expected": recorded.action, "actual": method}
+        )
+    recorded_path, recorded_query = _split_target(recorded.target)
+    path, query = _split_target(target)
+    if recorded_path != path:
+        differences.append({"field": "path", "expected": recorded_path, "actual": path})
+    if recorded_query != query:
+        differences.append(
+            {"field": "query", "expected": recorded_query, "actual": query}
+        )
+    for key, value in recorded.headers:
+        actual = headers.get(key)
+        if actual is None:
+            differences.append({"field": "header", "name": key, "actual": None})
+        elif actual != value:
+            differences.append({"field": "header", "name": key})
+    if recorded.body_digest != body_digest:
+        differences.append({"field": "body"})
+    return differences
+
+
+class MissDiagnostics:
+    """Explains replay misses using precomputed cassette indexes.
+
+    Recorded HTTP interactions are indexed by exact target, by path without
+    query string and by every path segment prefix. Only the compared fields
+    of each request are kept, with the body as a digest, so the cassette
+    models need not be retained. A miss is explained by
+    examining the closest buckets first and stopping after a fixed number of
+    interactions, so the cost per miss does not grow with the cassette size.
+    """
+
+    def __init__(
+        self,
+        max_examined: int = _DEFAULT_MAX_EXAMINED,
+        limit: int = _DEFAULT_LIMIT,
+    ) -> None:
+        """Initialize the diagnostics.
+
+        Args:
+            max_examined: Maximum number of recorded interactions compared
+                against a single missed request.
+            limit: Maximum number of near misses reported.
+        """
+        self._max_examined = max_examined
+        self._limit = limit
+        self._requests: list[_RecordedRequest] = []
+        self._by_target: dict[str, list[int]] = {}
+        self._by_path: dict[str, list[int]] = {}
+        self._by_prefix: dict[str, list[int]] = {}
+
+    def refresh(self, cassette: Cassette) -> None:
+        """Rebuild the indexes from cassette."""
+        requests: list[_RecordedRequest] = []
+        by_target: dict[str, list[int]] = {}
+        by_path: dict[str, list[int]] = {}
+        by_prefix: dict[str, list[int]] = {}
+        for interaction in cassette.interactions:
+            request = interaction.request
+            if request.protocol != "http":
+                continue
+            position = len(requests)
+            target = sys.intern(request.target)
+            requests.append(
+                _RecordedRequest(
+                    sys.intern(request.action),
+                    target,
+                    request.headers,
+                    _body_digest(request.body),
+                )
+            )
+            path, _ = _split_target(target)
+            by_target.setdefault(target, []).append(position)
+            by_path.setdefault(path, []).append(position)
+            for prefix in _path_prefixes(path):
+                by_prefix.setdefault(prefix, []).append(position)
+        self._by_target = by_target
+        self._by_path = by_path
+        self._by_prefix = by_prefix
+        self._requests = requests
+
+    def _nearby_positions(self, target: str) -> Iterator[int]:
+        """Yield positions of nearby interactions, closest buckets first."""
+        path, _ = _split_target(target)
+        buckets = [self._by_target.get(target), self._by_path.get(path)]
+        buckets.extend(self._by_prefix.get(prefix) for prefix in _path_prefixes(path))
+        seen: set[int] = set()
+        for bucket in buckets:
+            for position in bucket or ():
+                if position not in seen:
+                    seen.add(position)
+                    yield position
+
+    def explain(
+        self,
+        method: str,
+        target: str,
+        headers: Mapping[str, str],
+        body: bytes,
+    ) -> MissExplanation:
+        """Describe how the closest recorded interactions differ from a request.
+
+        Args:
+            method: HTTP method of the missed request.
+            target: Request target including the query string.
+            headers: Request headers.
+            body: Request body.
+
+        Returns:
+            The explanation, listing up to ``limit`` near misses ordered by
+            the number of differing fields.
+        """
+        near_misses: list[NearMiss] = []
+        body_digest = _body_digest(body)
+        for examined, position in enumerate(self._nearby_positions(target)):
+            if examined >= self._max_examined:
+                break
+            recorded = self._requests[position]
+            near_misses.append(
+                {
+                    "method": recorded.action,
+                    "target": recorded.target,
+                    "differences": _differences(
+                        recorded, method, target, headers, body_digest
+                    ),
+                }
+            )
+        near_misses.sort(key=lambda near_miss: len(near_miss["differences"]))
+        return {
+            "error": "Interaction Not Found",
+            "method": method,
+            "target": target,
+            "near_misses": near_misses[: self._limit],
+        }
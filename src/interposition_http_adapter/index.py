@@ -0,0 +1,175 @@
+"""Compact lookup index used to serve recorded interactions."""
+
+import sys
+from collections.abc import KeysView
+from typing import Protocol, runtime_checkable
+
+from interposition import Cassette, Interaction, InteractionRequest, ResponseChunk
+
+from interposition_http_adapter.timing import has_timing
+
+_DEFAULT_STATUS_CODE = 200
+
+RouteKey = tuple[str, str, str]
+"""Identity of a route: protocol, action and target."""
+
+HeaderSchema = tuple[str, ...]
+"""Header names recorded for an interaction, in recorded order."""
+
+
+def parse_status_code(chunks: tuple[ResponseChunk, ...]) -> int:
+    """Read the HTTP status code from the first chunk's metadata."""
+    status_code = _DEFAULT_STATUS_CODE
+    if chunks:
+        for key, value in chunks[0].metadata:
+            if key == "status_code":
+                status_code = int(value)
+    return status_code
+
+
+@runtime_checkable
+class InteractionSource(Protocol):
+    """Port for looking up interactions missing from the serving index.
+
+    Cassette stores shared by several processes implement this protocol.
+    The adapter detects it on the broker's cassette store and, when a
+    request misses the serving index, looks it up in the store so that
+    interactions recorded by other processes are served too.
+    """
+
+    def header_schemas(
+        self, protocol: str, action: str, target: str
+    ) -> tuple[HeaderSchema, ...]:
+        """Return the distinct header schemas stored for a route.
+
+        Args:
+            protocol: Request protocol.
+            action: Request action, the HTTP method for HTTP requests.
+            target: Request target.
+
+        Returns:
+            The schemas in recording order; empty for unknown routes.
+        """
+        ...
+
+    def find_interaction(self, fingerprint: str) -> Interaction | None:
+        """Return the interaction stored under a hex fingerprint, if any."""
+        ...
+
+
+class ServedResponse:
+    """Pre-parsed response of a recorded interaction.
+
+    Attributes:
+        chunks: The recorded chunks, shared with the cassette.
+        status_code: HTTP status code parsed from the first chunk.
+        timed: Whether any chunk carries a recorded arrival offset.
+    """
+
+    __slots__ = ("chunks", "status_code", "timed")
+
+    def __init__(self, chunks: tuple[ResponseChunk, ...]) -> None:
+        """Parse the response attributes needed for serving.
+
+        Args:
+            chunks: The recorded response chunks.
+        """
+        self.chunks = chunks
+        self.status_code = parse_status_code(chunks)
+        self.timed = has_timing(chunks)
+
+
+class ServingIndex:
+    """Lookup structures built once per cassette.
+
+    Only what the adapter needs to answer requests is kept: the distinct
+    header schemas recorded per route, which determine the candidate
+    requests to try, and the pre-parsed responses keyed by the raw 32-byte
+    fingerprint digest. Route and header name strings are interned so that
+    equal values share one object. Response chunks and their payloads are
+    referenced, never copied; nothing else of the cassette is, so the
+    Interaction and request models can be freed once the index is built.
+
+    An index is never modified once built. extended() returns a new index
+    whose tables are copies sharing every entry with this one, so readers
+    holding a reference keep a consistent view while a new snapshot is
+    published.
+    """
+
+    __slots__ = ("_responses", "_schemas")
+
+    def __init__(self, cassette: Cassette) -> None:
+        """Build the index.
+
+        Args:
+            cassette: The cassette to index.
+        """
+        self._schemas: dict[RouteKey, tuple[HeaderSchema, ...]] = {}
+        self._responses: dict[bytes, ServedResponse] = {}
+        for interaction in cassette.interactions:
+            self._add(interaction)
+
+    def _add(self, interaction: Interaction) -> None:
+        """Index interaction. Only called while the index is being built."""
+        request = interaction.request
+        route = (
+            sys.intern(request.protocol),
+            sys.intern(request.action),
+            sys.intern(request.target),
+        )
+        schema = tuple(sys.intern(key) for key, _ in request.headers)
+        route_schemas = self._schemas.get(route, ())
+        if schema not in route_schemas:
+            self._schemas[route] = (*route_schemas, schema)
+        digest = bytes.fromhex(interaction.fingerprint.value)
+        if digest not in self._responses:
+            self._responses[digest] = ServedResponse(interaction.response_chunks)
+
+    def extended(self, interaction: Interaction) -> "ServingIndex":
+        """Return a new index which is this one plus interaction.
+
+        The lookup tables are copied and the interaction is added to the
+        copies; this index is left untouched.
+
+        Args:
+            interaction: The newly recorded interaction.
+
+        Returns:
+            The extended index.
+        """
+        index = ServingIndex.__new__(ServingIndex)
+        index._schemas = self._schemas.copy()  # noqa: SLF001
+        index._responses = self._responses.copy()  # noqa: SLF001
+        index._add(interaction)  # noqa: SLF001
+        return index
+
+    def routes(self) -> KeysView[RouteKey]:
+        """Return every recorded route."""
+        return self._schemas.keys()
+
+    def schemas(
+        self, protocol: str, action: str, target: str
+    ) -> tuple[HeaderSchema, ...]:
+        """Return the distinct header schemas recorded for a route.
+
+        Args:
+            protocol: Request protocol.
+            action: Request action, the HTTP method for HTTP requests.
+            target: Request target.
+
+        Returns:
+            The schemas in recording order; empty for unknown routes.
+        """
+        return self._schemas.get((protocol, action, target), ())
+
+    def find(self, request: InteractionRequest) -> ServedResponse | None:
+        """Return the response recorded for request, if any."""
+        return self._responses.get(bytes.fromhex(request.fingerprint().value))
+
+    def __contains__(self, fingerprint: str) -> bool:
+        """Return whether a request with the hex fingerprint is recorded."""
+        return bytes.fromhex(fingerprint) in self._responses
+
+    def __len__(self) -> int:
+        """Return the number of distinct recorded requests."""
+        return len(self._responses)
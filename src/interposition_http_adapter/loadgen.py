@@ -0,0 +1,334 @@
+"""Load generation from captured request streams."""
+
+import json
+import math
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, TextIO, TypedDict, cast
+
+import anyio
+
+from interposition_http_adapter.analysis import iter_interactions
+
+if TYPE_CHECKING:
+    import httpx
+
+_MISS_STATUS_CODE = 500
+_MILLISECONDS_PER_SECOND = 1000.0
+
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+"""Upper bounds of the latency histogram in milliseconds; slower goes last."""
+
+_SLOWEST_BUCKET = "> 5000 ms"
+
+
+@dataclass(frozen=True)
+class LoggedRequest:
+    """One request of a captured request stream.
+
+    Attributes:
+        method: The HTTP method.
+        target: The request target, path and query.
+        headers: Request headers in order.
+        body: Request body.
+    """
+
+    method: str
+    target: str
+    headers: tuple[tuple[str, str], ...] = ()
+    body: bytes = b""
+
+
+class _RawLogEntry(TypedDict, total=False):
+    """Line of a JSONL request log, as decoded."""
+
+    method: str
+    target: str
+    headers: list[list[str]]
+    body: str
+
+
+def read_request_log(stream: TextIO) -> Iterator[LoggedRequest]:
+    """Yield the requests of a JSONL request log.
+
+    Each non-blank line is an object with ``method`` and ``target`` and
+    optionally ``headers``, a list of name and value pairs, and ``body``, a
+    UTF-8 string.
+
+    Args:
+        stream: Text stream of the log.
+
+    Yields:
+        Each logged request in order.
+
+    Raises:
+        ValueError: If a line is not a valid log entry.
+    """
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            entry = cast("_RawLogEntry", json.loads(line))
+            yield LoggedRequest(
+                method=entry["method"],
+                target=entry["target"],
+                headers=tuple(
+                    (name, value) for name, value in entry.get("headers", [])
+                ),
+                body=entry.get("body", "").encode(),
+            )
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            msg = f"invalid request log line {number}: {e!r}"
+            raise ValueError(msg) from e
+
+
+def cassette_requests(stream: TextIO) -> Iterator[LoggedRequest]:
+    """Yield the HTTP requests recorded in a JSON cassette, in order.
+
+    The cassette is streamed, so logs can be derived from cassettes too
+    large to load.
+
+    Args:
+        stream: Text stream of a cassette saved by JsonFileCassetteStore.
+
+    Yields:
+        The request of each HTTP interaction.
+
+    Raises:
+        ValueError: If the stream is not a JSON cassette.
+    """
+    for interaction in iter_interactions(stream):
+        request = interaction["request"]
+        if request["protocol"] != "http":
+            continue
+        yield LoggedRequest(
+            method=request["action"],
+            target=request["target"],
+            headers=tuple((name, value) for name, value in request["headers"]),
+            body=request["body"].encode(),
+        )
+
+
+def load_requests(
+    path: Path, *, from_cassette: bool = False
+) -> tuple[LoggedRequest, ...]:
+    """Read a request log, or derive one from a cassette.
+
+    Args:
+        path: Path to a JSONL request log or a JSON cassette.
+        from_cassette: Whether path is a cassette.
+
+    Returns:
+        The logged requests in order.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file is malformed or holds no request.
+    """
+    with path.open(encoding="utf-8") as stream:
+        reader = cassette_requests if from_cassette else read_request_log
+        requests = tuple(reader(stream))
+    if not requests:
+        msg = f"no requests in {path}"
+        raise ValueError(msg)
+    return requests
+
+
+@dataclass(frozen=True)
+class LoadOptions:
+    """How to replay a request log.
+
+    Attributes:
+        rate: Requests started per second.
+        requests: Number of requests to send. The log is repeated as often
+            as needed.
+        connections: Size of the keep-alive connection pool.
+        timeout: Seconds a request may take, waiting for a pooled
+            connection included.
+    """
+
+    rate: float = 100.0
+    requests: int = 1000
+    connections: int = 64
+    timeout: float = 10.0
+
+    def __post_init__(self) -> None:
+        """Validate the options.
+
+        Raises:
+            ValueError: If a value is out of range.
+        """
+        if self.rate <= 0:
+            msg = "rate must be positive"
+            raise ValueError(msg)
+        if self.requests < 1 or self.connections < 1:
+            msg = "requests and connections must be at least 1"
+            raise ValueError(msg)
+        if self.timeout <= 0:
+            msg = "timeout must be positive"
+            raise ValueError(msg)
+
+
+@dataclass(frozen=True)
+class LoadReport:
+    """Outcome of a load run.
+
+    Latencies are measured from the time a request was scheduled to start,
+    not the time it was actually sent, so delays caused by a saturated
+    adapter or client are included rather than hidden.
+
+    Attributes:
+        sent: Number of requests scheduled.
+        completed: Requests that received a response.
+        errors: Requests that failed or timed out without a response.
+        misses: Responses with status ``500``, the replay miss status.
+        duration: Seconds from the first scheduled request to the last
+            response.
+        throughput: Completed requests per second.
+        status_codes: Number of responses per status code.
+        latency_ms: Latency percentiles ``p50``, ``p90``, ``p99``,
+            ``p999`` and ``max`` of completed requests.
+        latency_histogram: Number of completed requests per latency bucket.
+    """
+
+    sent: int
+    completed: int
+    errors: int
+    misses: int
+    duration: float
+    throughput: float
+    status_codes: dict[int, int]
+    latency_ms: dict[str, float]
+    latency_histogram: dict[str, int]
+
+    @property
+    def miss_rate(self) -> float:
+        """Get the share of completed requests that were replay misses."""
+        return self.misses / self.completed if self.completed else 0.0
+
+
+class _Results:
+    """Collects the outcome of each request of a run."""
+
+    def __init__(self) -> None:
+        self.latencies: list[float] = []
+        self.status_codes: dict[int, int] = {}
+        self.errors = 0
+
+    def add(self, status_code: int, latency: float) -> None:
+        """Account for one response."""
+        self.latencies.append(latency)
+        self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+
+    def report(self, sent: int, duration: float) -> LoadReport:
+        """Summarize the run."""
+        latencies = sorted(self.latencies)
+        completed = len(latencies)
+        histogram = dict.fromkeys(
+            [f"<= {bound} ms" for bound in LATENCY_BUCKETS_MS] + [_SLOWEST_BUCKET], 0
+        )
+        for latency in latencies:
+            milliseconds = latency * _MILLISECONDS_PER_SECOND
+            label = next(
+                (
+                    f"<= {bound} ms"
+                    for bound in LATENCY_BUCKETS_MS
+                    if milliseconds <= bound
+                ),
+                _SLOWEST_BUCKET,
+            )
+            histogram[label] += 1
+        return LoadReport(
+            sent=sent,
+            completed=completed,
+            errors=self.errors,
+            misses=self.status_codes.get(_MISS_STATUS_CODE, 0),
+            duration=duration,
+            throughput=completed / duration if duration > 0 else 0.0,
+            status_codes=dict(sorted(self.status_codes.items())),
+            latency_ms={
+                "p50": _percentile(latencies, 0.5),
+                "p90": _percentile(latencies, 0.9),
+                "p99": _percentile(latencies, 0.99),
+                "p999": _percentile(latencies, 0.999),
+                "max": latencies[-1] * _MILLISECONDS_PER_SECOND if latencies else 0.0,
+            },
+            latency_histogram=histogram,
+        )
+
+
+def _percentile(latencies: list[float], quantile: float) -> float:
+    """Return the nearest-rank percentile of sorted latencies in milliseconds."""
+    if not latencies:
+        return 0.0
+    rank = max(1, math.ceil(quantile * len(latencies)))
+    return latencies[rank - 1] * _MILLISECONDS_PER_SECOND
+
+
+async def run_load(
+    base_url: str,
+    log: Sequence[LoggedRequest],
+    options: LoadOptions,
+    transport: "httpx.AsyncBaseTransport | None" = None,
+) -> LoadReport:
+    """Replay a request log against a running adapter at a fixed rate.
+
+    Requests are scheduled open-loop: request ``i`` starts ``i / rate``
+    seconds after the first, whether or not earlier requests have
+    completed, so a slow adapter cannot throttle the load it is measured
+    with. Requests share a pool of keep-alive connections.
+
+    Args:
+        base_url: URL of the adapter, such as ``http://127.0.0.1:8000``.
+        log: The requests to replay, repeated as often as needed.
+        options: Rate, number of requests and client settings.
+        transport: Optional httpx transport, mainly for tests.
+
+    Returns:
+        The throughput, latency and miss statistics of the run.
+
+    Raises:
+        RuntimeError: If httpx is not installed.
+    """
+    try:
+        import httpx  # noqa: PLC0415
+    except ImportError as e:
+        msg = "httpx is not installed; install interposition_http_adapter[loadgen]"
+        raise RuntimeError(msg) from e
+
+    results = _Results()
+    limits = httpx.Limits(
+        max_connections=options.connections,
+        max_keepalive_connections=options.connections,
+    )
+
+    async def send(request: LoggedRequest, due: float) -> None:
+        try:
+            response = await client.request(
+                request.method,
+                request.target,
+                headers=list(request.headers),
+                content=request.body,
+            )
+        except httpx.HTTPError:
+            results.errors += 1
+        else:
+            results.add(response.status_code, anyio.current_time() - due)
+
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        limits=limits,
+        timeout=options.timeout,
+        transport=transport,
+    ) as client:
+        started = anyio.current_time()
+        async with anyio.create_task_group() as task_group:
+            for number in range(options.requests):
+                due = started + number / options.rate
+                delay = due - anyio.current_time()
+                if delay > 0:
+                    await anyio.sleep(delay)
+                task_group.start_soon(send, log[number % len(log)], due)
+        duration = anyio.current_time() - started
+    return results.report(options.requests, duration)
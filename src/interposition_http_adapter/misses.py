@@ -0,0 +1,196 @@
+"""Fast rejection of replay misses."""
+
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+
+from interposition_http_adapter.index import ServingIndex
+
+_DEFAULT_ERROR_RATE = 0.01
+
+
+def _route_key(method: str, target: str) -> bytes:
+    """Encode a (method, target) pair as a Bloom filter key."""
+    return f"{method} {target}".encode()
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over byte strings.
+
+    Membership tests may report false positives at roughly the configured
+    error rate but never false negatives.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = _DEFAULT_ERROR_RATE) -> None:
+        """Size the filter for the expected number of keys.
+
+        Args:
+            capacity: Expected number of keys to be added.
+            error_rate: Target false-positive probability at capacity.
+        """
+        capacity = max(capacity, 1)
+        size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self._size = max(size, 8)
+        self._hash_count = max(round(self._size / capacity * math.log(2)), 1)
+        self._bits = bytearray((self._size + 7) // 8)
+
+    def _positions(self, key: bytes) -> Iterator[int]:
+        """Derive the bit positions of key by double hashing."""
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for index in range(self._hash_count):
+            yield (first + index * second) % self._size
+
+    def add(self, key: bytes) -> None:
+        """Add key to the filter."""
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: object) -> bool:
+        """Return False if key was definitely never added."""
+        if not isinstance(key, bytes):
+            return False
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class NegativeCache:
+    """Bounded cache of recently evaluated misses with a time-to-live."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            max_entries: Maximum number of misses kept. The oldest entry is
+                evicted first. ``0`` disables the cache.
+            ttl: Seconds an entry stays valid.
+            clock: Monotonic time source, replaceable for testing.
+        """
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._clock = clock
+        self._expiry: OrderedDict[bytes, float] = OrderedDict()
+
+    def add(self, key: bytes) -> None:
+        """Remember key as a miss."""
+        if self._max_entries <= 0:
+            return
+        self._expiry[key] = self._clock() + self._ttl
+        self._expiry.move_to_end(key)
+        while len(self._expiry) > self._max_entries:
+            self._expiry.popitem(last=False)
+
+    def __contains__(self, key: object) -> bool:
+        """Return whether key is a remembered, unexpired miss."""
+        if not isinstance(key, bytes):
+            return False
+        expiry = self._expiry.get(key)
+        if expiry is None:
+            return False
+        if expiry <= self._clock():
+            del self._expiry[key]
+            return False
+        return True
+
+    def clear(self) -> None:
+        """Forget every remembered miss."""
+        self._expiry.clear()
+
+    def __len__(self) -> int:
+        """Return the number of remembered misses, including expired ones."""
+        return len(self._expiry)
+
+
+class MissFilter:
+    """Rejects replay misses before candidate matching.
+
+    A Bloom filter over every recorded (method, target) pair rejects requests
+    for unknown routes in constant time. Requests that pass the filter but
+    were already fully evaluated as misses are answered from a negative cache.
+    Both are rebuilt from the routes of the serving index whenever a new
+    snapshot is published, which happens each time an interaction is
+    recorded.
+
+    When interactions can also be found outside the serving index, for
+    example in a cassette store shared with other workers, unknown routes
+    are not rejected and only the negative cache applies.
+    """
+
+    def __init__(self, negative_cache: NegativeCache, *, by_route: bool = True) -> None:
+        """Initialize the filter.
+
+        Args:
+            negative_cache: Cache for fully evaluated misses.
+            by_route: Whether to reject routes missing from the index.
+        """
+        self._negative_cache = negative_cache
+        self._by_route = by_route
+        self._index: ServingIndex | None = None
+        self._routes = BloomFilter(capacity=0)
+
+    def refresh(self, index: ServingIndex) -> None:
+        """Rebuild the filter if index differs from the one it was built from."""
+        if index is self._index:
+            return
+        self._negative_cache.clear()
+        self._index = index
+        if not self._by_route:
+            return
+        recorded = index.routes()
+        routes = BloomFilter(capacity=len(recorded))
+        for protocol, action, target in recorded:
+            if protocol == "http":
+                routes.add(_route_key(action, target))
+        self._routes = routes
+
+    def rejects(self, method: str, target: str, key: bytes) -> bool:
+        """Return whether the request is known not to match.
+
+        Args:
+            method: HTTP method of the request.
+            target: Request target including the query string.
+            key: Request key produced by request_key.
+        """
+        if self._by_route and _route_key(method, target) not in self._routes:
+            return True
+        return key in self._negative_cache
+
+    def remember(self, key: bytes) -> None:
+        """Record a fully evaluated miss."""
+        self._negative_cache.add(key)
+
+
+def request_key(
+    method: str,
+    target: str,
+    headers: Iterable[tuple[bytes, bytes]],
+    body: bytes,
+) -> bytes:
+    """Digest every request field that can influence matching.
+
+    Args:
+        method: HTTP method of the request.
+        target: Request target including the query string.
+        headers: Raw request headers.
+        body: Request body.
+
+    Returns:
+        A compact key identifying the request.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{method}\0{target}\0".encode())
+    for name, value in headers:
+        digest.update(name + b"\0" + value + b"\0")
+    digest.update(b"\0")
+    digest.update(body)
+    return digest.digest()
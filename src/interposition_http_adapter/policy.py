@@ -0,0 +1,148 @@
+"""Policies deciding which live interactions are recorded."""
+
+import random
+import threading
+from collections.abc import Callable
+from typing import Literal
+
+from interposition import Cassette, InteractionRequest
+
+from interposition_http_adapter.index import RouteKey, ServingIndex
+
+DropReason = Literal["existing", "variants", "sampled", "body_size"]
+"""Why a live interaction was not recorded."""
+
+_DROP_REASONS: tuple[DropReason, ...] = ("existing", "variants", "sampled", "body_size")
+
+
+class RecordingPolicy:
+    """Bounds cassette growth by dropping some live interactions.
+
+    Every check costs O(1) in the size of the cassette per recording: a
+    fingerprint lookup in the serving index, a per-route counter, a scan of
+    the configured sampling prefixes, one random draw and the response size.
+    Dropped interactions are still served to the client; they are only left
+    out of the cassette, and counted per reason.
+
+    rejects() must be called under the recorder's write lock; oversized()
+    may be called from any thread.
+    """
+
+    def __init__(
+        self,
+        *,
+        skip_existing: bool = False,
+        max_variants: int = 0,
+        sample_rates: tuple[tuple[str, float], ...] = (),
+        max_body_size: int = 0,
+        random_source: Callable[[], float] = random.random,
+    ) -> None:
+        """Initialize the policy.
+
+        Args:
+            skip_existing: Drop interactions whose fingerprint is recorded.
+            max_variants: Maximum interactions per method and target. ``0``
+                means unlimited.
+            sample_rates: Pairs of target prefix and probability of
+                recording an interaction for a route under that prefix that
+                already has one. The longest matching prefix applies, the
+                empty prefix matches every target and unmatched targets are
+                always recorded. The first interaction of a route is always
+                recorded.
+            max_body_size: Maximum response size in bytes. ``0`` means
+                unlimited.
+            random_source: Returns uniform random numbers in [0, 1).
+        """
+        self._skip_existing = skip_existing
+        self._max_variants = max_variants
+        self._sample_rates = sorted(
+            sample_rates, key=lambda item: len(item[0]), reverse=True
+        )
+        self._max_body_size = max_body_size
+        self._variants: dict[RouteKey, int] = {}
+        self._dropped: dict[DropReason, int] = dict.fromkeys(_DROP_REASONS, 0)
+        self._dropped_lock = threading.Lock()
+        self._random = random_source
+
+    @property
+    def dropped(self) -> dict[DropReason, int]:
+        """Get the number of dropped interactions per reason."""
+        with self._dropped_lock:
+            return dict(self._dropped)
+
+    def _drop(self, reason: DropReason) -> None:
+        """Count one dropped interaction."""
+        with self._dropped_lock:
+            self._dropped[reason] += 1
+
+    def start(self, cassette: Cassette) -> None:
+        """Count the recorded variants per route of the initial cassette."""
+        if self._max_variants == 0:
+            return
+        for interaction in cassette.interactions:
+            self._count(interaction.request)
+
+    def _count(self, request: InteractionRequest) -> None:
+        """Count one more variant of the route of request."""
+        route = (request.protocol, request.action, request.target)
+        self._variants[route] = self._variants.get(route, 0) + 1
+
+    def oversized(self, size: int) -> bool:
+        """Return whether a response of size bytes is too large to record.
+
+        A drop is counted if it is.
+        """
+        if self._max_body_size == 0:
+            return False
+        if size <= self._max_body_size:
+            return False
+        self._drop("body_size")
+        return True
+
+    def rejects(
+        self, index: ServingIndex, request: InteractionRequest, fingerprint: str
+    ) -> bool:
+        """Return whether to drop an interaction, counting the drop.
+
+        An accepted interaction is counted towards its route's variants, so
+        the caller must record it.
+
+        Args:
+            index: The snapshot the interaction would be added to.
+            request: The recorded request.
+            fingerprint: Hex fingerprint of request.
+
+        Returns:
+            True if the interaction must not be recorded.
+        """
+        reason = self._reason(index, request, fingerprint)
+        if reason is not None:
+            self._drop(reason)
+            return True
+        if self._max_variants > 0:
+            self._count(request)
+        return False
+
+    def _reason(
+        self, index: ServingIndex, request: InteractionRequest, fingerprint: str
+    ) -> DropReason | None:
+        """Return why the interaction is dropped, or None to record it."""
+        if self._skip_existing and fingerprint in index:
+            return "existing"
+        route = (request.protocol, request.action, request.target)
+        if (
+            self._max_variants > 0
+            and self._variants.get(route, 0) >= self._max_variants
+        ):
+            return "variants"
+        sample_rate = self._route_sample_rate(request.target)
+        if sample_rate < 1 and index.schemas(*route) and self._random() >= sample_rate:
+            return "sampled"
+        return None
+
+    def _route_sample_rate(self, target: str) -> float:
+        """Return the sample rate of the longest prefix matching target."""
+        return next(
+            (rate for prefix, rate in self._sample_rates if target.startswith(prefix)),
+            1.0,
+        )
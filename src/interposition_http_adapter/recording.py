@@ -0,0 +1,161 @@
+"""Recording of live interactions under copy-on-write snapshots."""
+
+import threading
+from typing import TYPE_CHECKING
+
+from interposition import Cassette, Interaction, InteractionRequest, ResponseChunk
+
+from interposition_http_adapter.index import ServingIndex
+
+if TYPE_CHECKING:
+    from interposition import CassetteStore
+
+    from interposition_http_adapter.policy import RecordingPolicy
+
+
+class CassetteRecorder:
+    """Owns the adapter's view of the cassette and records into it.
+
+    Readers take the current snapshot, an immutable ServingIndex, without
+    any locking; publishing a snapshot is a single reference assignment.
+    Writers are serialized by a lock that covers building the next cassette
+    and publishing its index, so every recording lands in the next snapshot
+    and none is lost to a concurrent writer.
+
+    Persisting is a group commit under a second lock: a writer saves the
+    latest cassette unless a save that already contains its interaction
+    has completed. Writers that arrive while a save is running wait for it
+    and are then covered by a single save of everything recorded meanwhile,
+    so the store writes once per batch instead of once per interaction.
+
+    Only a recorder that records keeps the Cassette models, which each new
+    cassette is built from; a replay-only recorder keeps just the index.
+
+    An optional recording policy is consulted under the same lock, so its
+    decisions see every earlier recording.
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        cassette_store: "CassetteStore | None" = None,
+        policy: "RecordingPolicy | None" = None,
+        *,
+        recording: bool = True,
+    ) -> None:
+        """Initialize the recorder with the initial cassette.
+
+        Args:
+            cassette: The cassette to start from.
+            cassette_store: Optional store that receives every new cassette.
+            policy: Optional policy deciding which interactions are recorded.
+            recording: Whether record() may be called. If False, cassette is
+                not retained once it is indexed.
+        """
+        self._snapshot = ServingIndex(cassette)
+        self._cassette = cassette if recording else None
+        self._cassette_store = cassette_store
+        self._policy = policy
+        self._write_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._generation = 0
+        self._saved_generation = 0
+        if policy is not None:
+            policy.start(cassette)
+
+    @property
+    def snapshot(self) -> ServingIndex:
+        """Get the most recently published snapshot."""
+        return self._snapshot
+
+    @property
+    def cassette(self) -> Cassette | None:
+        """Get the most recently recorded cassette, or None if not recording."""
+        return self._cassette
+
+    def record(
+        self, request: InteractionRequest, response_chunks: tuple[ResponseChunk, ...]
+    ) -> Interaction | None:
+        """Append an interaction, publish a snapshot and persist the cassette.
+
+        The interaction is served from the published snapshot even if
+        persisting fails; it is then saved by the next successful save.
+
+        Args:
+            request: The request that was forwarded.
+            response_chunks: The complete upstream response.
+
+        Returns:
+            The recorded interaction, or None if the policy dropped it.
+
+        Raises:
+            InteractionValidationError: If the chunks are not a valid response.
+            CassetteSaveError: If the store fails to persist the cassette.
+            RuntimeError: If the recorder was created with recording=False.
+        """
+        fingerprint = request.fingerprint()
+        interaction = Interaction(
+            request=request,
+            fingerprint=fingerprint,
+            response_chunks=response_chunks,
+        )
+        with self._write_lock:
+            if self._cassette is None:
+                msg = "the recorder was created with recording=False"
+                raise RuntimeError(msg)
+            current = self._snapshot
+            if self._policy is not None and self._policy.rejects(
+                current, request, fingerprint.value
+            ):
+                return None
+            # The existing interactions are already validated; constructing
+            # the Cassette normally would re-validate every one of them.
+            cassette = Cassette.model_construct(
+                interactions=(*self._cassette.interactions, interaction)
+            )
+            cassette.build_index()  # type: ignore[operator] # pydantic validator
+            self._cassette = cassette
+            self._snapshot = current.extended(interaction)
+            self._generation += 1
+            generation = self._generation
+        self._save(generation)
+        return interaction
+
+    def _save(self, generation: int) -> None:
+        """Persist the latest cassette unless generation is already saved."""
+        if self._cassette_store is None:
+            return
+        with self._save_lock:
+            if self._saved_generation >= generation:
+                return
+            with self._write_lock:
+                cassette = self._cassette
+                latest = self._generation
+            if cassette is None:
+                return
+            self._cassette_store.save(cassette)
+            self._saved_generation = latest
+
+    def adopt(self, interaction: Interaction) -> ServingIndex:
+        """Publish an interaction that another process already persisted.
+
+        The interaction is neither checked against the policy nor saved.
+
+        Args:
+            interaction: An interaction loaded from the cassette store.
+
+        Returns:
+            The snapshot containing interaction.
+        """
+        with self._write_lock:
+            current = self._snapshot
+            if interaction.fingerprint.value in current:
+                return current
+            if self._cassette is not None:
+                cassette = Cassette.model_construct(
+                    interactions=(*self._cassette.interactions, interaction)
+                )
+                cassette.build_index()  # type: ignore[operator] # pydantic validator
+                self._cassette = cassette
+            self._snapshot = current.extended(interaction)
+            return self._snapshot
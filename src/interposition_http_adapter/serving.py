@@ -0,0 +1,167 @@
+"""Running an adapter under an ASGI server, over HTTP/1.1 or HTTP/2."""
+
+import asyncio
+import datetime as dt
+import importlib
+import ipaddress
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from starlette.types import ASGIApp
+
+ServerName = Literal["uvicorn", "hypercorn"]
+"""ASGI servers the adapter can be run with."""
+
+_HTTP2_EXTRA_HINT = "install interposition_http_adapter[http2]"
+_CERTIFICATE_DAYS = 30
+
+
+@dataclass(frozen=True)
+class ServeOptions:
+    """How to serve an adapter.
+
+    Attributes:
+        host: Interface to bind.
+        port: Port to bind.
+        server: The ASGI server. HTTP/2 requires ``hypercorn``.
+        http2: If True, HTTP/2 is offered: negotiated through ALPN over TLS
+            and accepted as h2c, by prior knowledge or upgrade, in cleartext.
+        certfile: PEM certificate chain. Serving uses TLS if set.
+        keyfile: PEM private key of certfile.
+    """
+
+    host: str = "127.0.0.1"
+    port: int = 8000
+    server: ServerName = "uvicorn"
+    http2: bool = False
+    certfile: Path | None = None
+    keyfile: Path | None = None
+
+    def __post_init__(self) -> None:
+        """Validate the option combination.
+
+        Raises:
+            ValueError: If HTTP/2 is requested from uvicorn, or only one of
+                certfile and keyfile is set.
+        """
+        if self.http2 and self.server != "hypercorn":
+            msg = "HTTP/2 requires the hypercorn server"
+            raise ValueError(msg)
+        if (self.certfile is None) != (self.keyfile is None):
+            msg = "certfile and keyfile must be given together"
+            raise ValueError(msg)
+
+
+def _import_optional(name: str) -> ModuleType:
+    """Import a module of the http2 extra with an installation hint."""
+    try:
+        return importlib.import_module(name)
+    except ImportError as e:
+        msg = f"{name} is not installed; {_HTTP2_EXTRA_HINT}"
+        raise RuntimeError(msg) from e
+
+
+def serve(app: "ASGIApp", options: ServeOptions) -> None:
+    """Serve app until the server is stopped.
+
+    The server is imported only when it is used.
+
+    Args:
+        app: The ASGI application, typically an InterpositionHttpAdapter.
+        options: Where and how to serve it.
+
+    Raises:
+        RuntimeError: If hypercorn is requested but not installed.
+    """
+    if options.server == "hypercorn":
+        _serve_hypercorn(app, options)
+        return
+    import uvicorn  # noqa: PLC0415
+
+    uvicorn.run(
+        app,
+        host=options.host,
+        port=options.port,
+        ssl_certfile=options.certfile,
+        ssl_keyfile=options.keyfile,
+    )
+
+
+def _serve_hypercorn(app: "ASGIApp", options: ServeOptions) -> None:
+    """Serve app with hypercorn, which implements HTTP/2 and flow control."""
+    hypercorn_config = _import_optional("hypercorn.config")
+    hypercorn_asyncio = _import_optional("hypercorn.asyncio")
+    config = hypercorn_config.Config()
+    config.bind = [f"{options.host}:{options.port}"]
+    config.alpn_protocols = ["h2", "http/1.1"] if options.http2 else ["http/1.1"]
+    if options.certfile is not None and options.keyfile is not None:
+        config.certfile = str(options.certfile)
+        config.keyfile = str(options.keyfile)
+    asyncio.run(hypercorn_asyncio.serve(app, config))
+
+
+def generate_self_signed_certificate(
+    directory: Path, hostname: str = "localhost"
+) -> tuple[Path, Path]:
+    """Write a self-signed certificate for local TLS testing.
+
+    The certificate is valid for hostname, ``127.0.0.1`` and ``::1`` for 30
+    days. It must not be used outside of tests.
+
+    Args:
+        directory: Directory receiving ``cert.pem`` and ``key.pem``.
+        hostname: DNS name the certificate is issued for.
+
+    Returns:
+        The certificate and private key paths.
+
+    Raises:
+        RuntimeError: If the cryptography package is not installed.
+    """
+    x509 = _import_optional("cryptography.x509")
+    hashes = _import_optional("cryptography.hazmat.primitives.hashes")
+    serialization = _import_optional("cryptography.hazmat.primitives.serialization")
+    ec = _import_optional("cryptography.hazmat.primitives.asymmetric.ec")
+    oid = _import_optional("cryptography.x509.oid")
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(oid.NameOID.COMMON_NAME, hostname)])
+    now = dt.datetime.now(dt.timezone.utc)  # noqa: UP017 - Python 3.10
+    alternative_names = x509.SubjectAlternativeName(
+        [
+            x509.DNSName(hostname),
+            x509.IPAddress(ipaddress.ip_address("127.0.0.1")),
+            x509.IPAddress(ipaddress.ip_address("::1")),
+        ]
+    )
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - dt.timedelta(minutes=5))
+        .not_valid_after(now + dt.timedelta(days=_CERTIFICATE_DAYS))
+        .add_extension(alternative_names, critical=False)
+        .sign(key, hashes.SHA256())
+    )
+    directory.mkdir(parents=True, exist_ok=True)
+    certfile = directory / "cert.pem"
+    keyfile = directory / "key.pem"
+    certfile.write_bytes(certificate.public_bytes(serialization.Encoding.PEM))
+    descriptor = os.open(keyfile, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(descriptor, "wb") as stream:
+        # The mode of os.open only applies to new files; tighten an old key.
+        keyfile.chmod(0o600)
+        stream.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+    return certfile, keyfile
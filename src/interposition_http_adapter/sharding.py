@@ -0,0 +1,281 @@
+"""Partitioning of a cassette across adapter processes."""
+
+import bisect
+import hashlib
+import json
+from collections.abc import AsyncIterator, Sequence
+from contextlib import ExitStack, asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import anyio
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from interposition_http_adapter.analysis import iter_interactions
+
+if TYPE_CHECKING:
+    import httpx
+
+_HOP_BY_HOP_HEADERS = frozenset(
+    {
+        "connection",
+        "keep-alive",
+        "proxy-authenticate",
+        "proxy-authorization",
+        "te",
+        "trailer",
+        "transfer-encoding",
+        "upgrade",
+    }
+)
+
+_CONNECT_TIMEOUT = 5.0
+
+
+def _ring_hash(key: str) -> int:
+    """Return the position of key on the ring."""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hash ring assigning routes to shards.
+
+    Each shard owns virtual_nodes points on a 64-bit ring and a route
+    belongs to the shard owning the first point at or after the hash of its
+    method and target. Adding a shard therefore moves only the routes it
+    takes over, about one in the new number of shards, and every variant
+    of a route stays on one shard, so header schemas are never split.
+
+    Attributes:
+        shards: Number of shards.
+    """
+
+    def __init__(self, shards: int, virtual_nodes: int = 64) -> None:
+        """Build the ring.
+
+        Args:
+            shards: Number of shards, numbered from 0.
+            virtual_nodes: Points per shard. More points balance the shards
+                better at the cost of a larger ring.
+
+        Raises:
+            ValueError: If shards or virtual_nodes is less than 1.
+        """
+        if shards < 1 or virtual_nodes < 1:
+            msg = "shards and virtual_nodes must be at least 1"
+            raise ValueError(msg)
+        self.shards = shards
+        points = sorted(
+            (_ring_hash(f"shard-{shard}#{replica}"), shard)
+            for shard in range(shards)
+            for replica in range(virtual_nodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [shard for _, shard in points]
+
+    def shard_for(self, method: str, target: str) -> int:
+        """Return the shard owning a route.
+
+        Args:
+            method: The HTTP method.
+            target: The request target, path and query.
+
+        Returns:
+            The shard number.
+        """
+        position = bisect.bisect_left(self._hashes, _ring_hash(f"{method} {target}"))
+        return self._owners[position % len(self._owners)]
+
+
+@dataclass(frozen=True)
+class Shard:
+    """One partition of a split cassette.
+
+    Attributes:
+        path: The JSON cassette holding the partition.
+        interactions: Number of interactions in the partition.
+    """
+
+    path: Path
+    interactions: int
+
+
+def shard_cassette(path: Path, directory: Path, ring: HashRing) -> tuple[Shard, ...]:
+    """Split a JSON cassette into one cassette per shard of ring.
+
+    The cassette is streamed and every interaction is written unchanged to
+    ``shard-<n>.json`` in directory, so cassettes too large to load can be
+    split. Body references and sidecar files are kept as they are and must
+    stay reachable by every shard.
+
+    Args:
+        path: Path to a cassette saved by JsonFileCassetteStore.
+        directory: Directory receiving the shard cassettes.
+        ring: Assigns each interaction's method and target to a shard.
+
+    Returns:
+        The shards, in shard order.
+
+    Raises:
+        OSError: If a file cannot be read or written.
+        ValueError: If path is not a JSON cassette.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = [directory / f"shard-{shard}.json" for shard in range(ring.shards)]
+    counts = [0] * ring.shards
+    with ExitStack() as stack:
+        source = stack.enter_context(path.open(encoding="utf-8"))
+        outputs = [
+            stack.enter_context(shard_path.open("w", encoding="utf-8"))
+            for shard_path in paths
+        ]
+        for output in outputs:
+            output.write('{"interactions": [')
+        for interaction in iter_interactions(source):
+            request = interaction["request"]
+            shard = ring.shard_for(request["action"], request["target"])
+            output = outputs[shard]
+            output.write(",\n" if counts[shard] else "\n")
+            json.dump(interaction, output)
+            counts[shard] += 1
+        for output in outputs:
+            output.write("\n]}\n")
+    return tuple(
+        Shard(path=shard_path, interactions=count)
+        for shard_path, count in zip(paths, counts, strict=True)
+    )
+
+
+class ShardRouter(Starlette):
+    """ASGI front router forwarding requests to the adapter owning their route.
+
+    Each shard is an adapter serving one cassette written by
+    shard_cassette(), and requests are routed with the same ring. Requests
+    are forwarded over a pool of keep-alive connections and responses are
+    streamed back as they arrive. Like the adapter, the router answers
+    ``GET /__health`` and ``GET /__ready``, which is ``200`` once every
+    shard is ready.
+    """
+
+    def __init__(
+        self,
+        shard_urls: Sequence[str],
+        virtual_nodes: int = 64,
+        connections: int = 100,
+        transport: "httpx.AsyncBaseTransport | None" = None,
+    ) -> None:
+        """Initialize the router.
+
+        Args:
+            shard_urls: Base URL of each shard's adapter, in shard order.
+            virtual_nodes: Points per shard, as used to split the cassette.
+            connections: Maximum number of connections to all shards.
+            transport: Optional httpx transport, mainly for tests.
+
+        Raises:
+            RuntimeError: If httpx is not installed.
+        """
+        try:
+            import httpx  # noqa: PLC0415
+        except ImportError as e:
+            msg = "httpx is not installed; install interposition_http_adapter[cluster]"
+            raise RuntimeError(msg) from e
+
+        self._httpx = httpx
+        self._ring = HashRing(len(shard_urls), virtual_nodes)
+        self._shard_urls = tuple(url.rstrip("/") for url in shard_urls)
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=connections, max_keepalive_connections=connections
+            ),
+            # Paced replays may stream for long; only connecting is bounded.
+            timeout=httpx.Timeout(None, connect=_CONNECT_TIMEOUT),
+            transport=transport,
+        )
+        # Shards must see the client's headers only, as they would directly.
+        self._client.headers.clear()
+
+        @asynccontextmanager
+        async def lifespan(_app: Starlette) -> AsyncIterator[None]:
+            yield
+            await self._client.aclose()
+
+        routes = [
+            Route("/__health", self._health, methods=["GET"]),
+            Route("/__ready", self._readiness, methods=["GET"]),
+            Route(
+                "/{path:path}",
+                self._forward,
+                methods=["GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS"],
+            ),
+        ]
+        super().__init__(routes=routes, lifespan=lifespan)
+
+    async def _forward(self, request: Request) -> Response:
+        """Forward a request to its shard and stream the response back."""
+        target = request.url.path
+        if request.url.query:
+            target = f"{target}?{request.url.query}"
+        shard = self._ring.shard_for(request.method, target)
+        upstream_request = self._client.build_request(
+            request.method,
+            self._shard_urls[shard] + target,
+            headers=[
+                (name, value)
+                for name, value in request.headers.items()
+                if name not in _HOP_BY_HOP_HEADERS and name != "content-length"
+            ],
+            content=await request.body(),
+        )
+        try:
+            upstream = await self._client.send(upstream_request, stream=True)
+        except self._httpx.HTTPError:
+            return Response(status_code=502, content=b"Shard Unavailable")
+        response = StreamingResponse(
+            upstream.aiter_raw(),
+            status_code=upstream.status_code,
+            background=BackgroundTask(upstream.aclose),
+        )
+        response.raw_headers.extend(
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in upstream.headers.multi_items()
+            if name not in _HOP_BY_HOP_HEADERS
+        )
+        return response
+
+    async def _health(self, _request: Request) -> Response:
+        """Answer the liveness probe."""
+        return JSONResponse({"status": "ok"})
+
+    async def _readiness(self, _request: Request) -> Response:
+        """Answer the readiness probe with the state of every shard."""
+        states = ["unavailable"] * len(self._shard_urls)
+
+        async def probe(shard: int) -> None:
+            try:
+                response = await self._client.get(
+                    f"{self._shard_urls[shard]}/__ready", timeout=_CONNECT_TIMEOUT
+                )
+            except self._httpx.HTTPError:
+                return
+            states[shard] = "ready" if response.is_success else "loading"
+
+        async with anyio.create_task_group() as task_group:
+            for shard in range(len(self._shard_urls)):
+                task_group.start_soon(probe, shard)
+        ready = all(state == "ready" for state in states)
+        return JSONResponse(
+            {
+                "status": "ready" if ready else "loading",
+                "shards": [
+                    {"url": url, "status": state}
+                    for url, state in zip(self._shard_urls, states, strict=True)
+                ],
+            },
+            status_code=200 if ready else 503,
+        )
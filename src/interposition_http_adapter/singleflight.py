@@ -0,0 +1,219 @@
+"""Coalescing of concurrent identical upstream requests."""
+
+import logging
+from collections.abc import AsyncIterator, Callable, Iterator
+
+import anyio
+import anyio.to_thread
+from interposition import ResponseChunk
+
+from interposition_http_adapter.spool import ChunkSpool
+
+_DEFAULT_SPOOL_MEMORY = 1024 * 1024
+_DEFAULT_UPSTREAM_THREADS = 40
+
+logger = logging.getLogger(__name__)
+
+OnComplete = Callable[[ChunkSpool], object]
+"""Receives the spool of the complete response once the source is exhausted."""
+
+
+class Flight:
+    """A single upstream call whose chunks are shared by every subscriber.
+
+    Chunks are pulled from the source one at a time in a worker thread,
+    borrowed from the upstream limiter, by whichever subscriber needs the
+    next chunk first; the others wait on the
+    same lock and pick the chunk up from the shared spool. Subscribers that
+    join late replay the spooled chunks before following the live stream.
+
+    Once the source is exhausted the spool of the complete response is
+    handed to on_complete, still in the worker thread, before the last
+    subscriber sees the end of the stream. A failure of on_complete is
+    logged and does not affect the subscribers. If the source fails, or
+    every subscriber releases the flight before the source is exhausted,
+    on_complete is never called and the response is dropped.
+    """
+
+    def __init__(
+        self,
+        source: Iterator[ResponseChunk],
+        spool: ChunkSpool,
+        on_finish: Callable[[], None],
+        on_complete: OnComplete | None = None,
+        limiter: anyio.CapacityLimiter | None = None,
+    ) -> None:
+        """Initialize the flight.
+
+        Args:
+            source: The upstream chunk iterator. It is advanced lazily.
+            spool: Buffer holding the chunks pulled so far.
+            on_finish: Called once when the source is exhausted, fails or is
+                abandoned.
+            on_complete: Optional callback receiving the complete response.
+            limiter: Limits the worker threads pulling upstream chunks.
+                Defaults to anyio's shared default thread limiter.
+        """
+        self._source = source
+        self._spool = spool
+        self._limiter = limiter
+        self._on_finish = on_finish
+        self._on_complete = on_complete
+        self._subscribers = 0
+        self._finished = False
+        self._error: Exception | None = None
+        self._lock = anyio.Lock()
+
+    def attach(self) -> None:
+        """Register a subscriber. Each attach must be paired with a release."""
+        self._subscribers += 1
+
+    def release(self) -> None:
+        """Unregister a subscriber that is done with the flight.
+
+        When the last subscriber leaves before the source is exhausted, for
+        example because every client disconnected, the source is closed and
+        the response is dropped. The spool is freed once nobody reads it.
+        """
+        self._subscribers -= 1
+        if self._subscribers > 0:
+            return
+        if not self._finished:
+            self._finished = True
+            self._on_finish()
+            close = getattr(self._source, "close", None)
+            if close is not None:
+                close()
+        self._spool.close()
+
+    async def subscribe(self) -> AsyncIterator[ResponseChunk]:
+        """Iterate over every chunk of the upstream response.
+
+        Yields:
+            The response chunks in upstream order.
+
+        Raises:
+            Exception: Whatever the upstream source raised.
+        """
+        position = 0
+        while True:
+            if position < len(self._spool):
+                yield self._spool[position]
+                position += 1
+            elif self._error is not None:
+                raise self._error
+            elif self._finished:
+                return
+            else:
+                await self._pull(position)
+
+    async def _pull(self, position: int) -> None:
+        """Fetch the chunk at position unless another subscriber already did."""
+        async with self._lock:
+            if position < len(self._spool) or self._finished:
+                return
+            try:
+                exhausted = await anyio.to_thread.run_sync(
+                    self._advance, limiter=self._limiter
+                )
+            except Exception as error:  # noqa: BLE001 - re-raised to subscribers
+                self._error = error
+                exhausted = True
+            if exhausted:
+                self._finished = True
+                self._on_finish()
+
+    def _advance(self) -> bool:
+        """Spool the next chunk, completing the response at the end.
+
+        Returns:
+            True if the source is exhausted.
+        """
+        chunk = next(self._source, None)
+        if chunk is None:
+            if self._on_complete is not None:
+                try:
+                    self._on_complete(self._spool)
+                except Exception:
+                    logger.exception("Failed to record a live response")
+            return True
+        self._spool.append(chunk)
+        return False
+
+
+class SingleFlight:
+    """Registry of in-flight upstream calls keyed by request fingerprint."""
+
+    def __init__(
+        self,
+        spool_memory: int = _DEFAULT_SPOOL_MEMORY,
+        max_threads: int = 0,
+    ) -> None:
+        """Initialize an empty registry.
+
+        Upstream chunks are pulled in worker threads from a limiter of
+        their own, so upstream calls stalled in a blocking read never hold
+        the threads anyio lends to file reads, such as replayed sidecar
+        files.
+
+        Args:
+            spool_memory: Payload bytes of a response held in memory before
+                its chunks are spooled to a temporary file.
+            max_threads: Maximum number of worker threads pulling upstream
+                chunks at once. ``0`` allows as many as anyio's default
+                thread limiter.
+        """
+        self._flights: dict[str, Flight] = {}
+        self._spool_memory = spool_memory
+        self._limiter = anyio.CapacityLimiter(max_threads or _DEFAULT_UPSTREAM_THREADS)
+
+    def join(
+        self,
+        key: str,
+        start: Callable[[], Iterator[ResponseChunk]],
+        on_complete: OnComplete | None = None,
+        on_finish: Callable[[], None] | None = None,
+    ) -> Flight:
+        """Attach to the in-flight call for key, starting one if there is none.
+
+        The caller must release the returned flight when it stops reading.
+
+        Args:
+            key: Identity of the request, typically its fingerprint value.
+            start: Creates the upstream chunk iterator for a new flight.
+            on_complete: Receives the complete response of a new flight.
+            on_finish: Called once when a new flight is exhausted, fails or
+                is abandoned. Not used when an existing flight is joined.
+
+        Returns:
+            The flight shared by all concurrent requests with the same key.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            started = Flight(
+                start(),
+                ChunkSpool(self._spool_memory),
+                on_finish=lambda: self._finish(key, started, on_finish),
+                on_complete=on_complete,
+                limiter=self._limiter,
+            )
+            self._flights[key] = flight = started
+        flight.attach()
+        return flight
+
+    def _finish(
+        self, key: str, flight: Flight, on_finish: Callable[[], None] | None
+    ) -> None:
+        """Forget flight so later requests for key start a new one."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if on_finish is not None:
+            on_finish()
+
+    def __contains__(self, key: str) -> bool:
+        """Return whether a call for key is in flight."""
+        return key in self._flights
+
+    def __len__(self) -> int:
+        """Return the number of calls currently in flight."""
+        return len(self._flights)
@@ -0,0 +1,155 @@
+"""Buffering of streamed response chunks in memory or on disk."""
+
+import tempfile
+import threading
+from collections.abc import Iterator
+from typing import IO
+
+from interposition import ResponseChunk
+
+_Record = tuple[int, tuple[tuple[str, str], ...], int, int]
+"""On-disk chunk: sequence, metadata, payload offset and payload length."""
+
+_BLOCK_SIZE = 64 * 1024
+
+
+class ChunkSpool:
+    """Append-only buffer of the chunks of one response.
+
+    Chunks are kept in memory until their payloads exceed max_memory bytes
+    in total. The buffer then spills: every payload is moved to an anonymous
+    temporary file and only the chunk sequence, metadata and file position
+    stay in memory, so a large response costs a bounded amount of memory
+    while it is streamed and recorded.
+
+    Chunks may be appended from one thread while others read them.
+    """
+
+    def __init__(self, max_memory: int) -> None:
+        """Initialize an empty spool.
+
+        Args:
+            max_memory: Payload bytes held in memory before spilling to disk.
+        """
+        self._max_memory = max_memory
+        self._size = 0
+        self._memory: list[ResponseChunk] = []
+        self._records: list[_Record] = []
+        self._file: IO[bytes] | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def spilled(self) -> bool:
+        """Get whether the payloads have been moved to disk."""
+        return self._file is not None
+
+    @property
+    def size(self) -> int:
+        """Get the total payload size of the buffered chunks in bytes."""
+        with self._lock:
+            return self._size
+
+    def append(self, chunk: ResponseChunk) -> None:
+        """Add the next chunk of the response.
+
+        Raises:
+            OSError: If the temporary file cannot be created or written.
+        """
+        with self._lock:
+            self._size += len(chunk.data)
+            if self._file is None and self._size > self._max_memory:
+                self._spill()
+            if self._file is None:
+                self._memory.append(chunk)
+            else:
+                self._write(self._file, chunk)
+
+    def _spill(self) -> None:
+        """Move the buffered payloads to a temporary file."""
+        spill_file = tempfile.TemporaryFile()  # noqa: SIM115 - closed by close()
+        for chunk in self._memory:
+            self._write(spill_file, chunk)
+        self._memory = []
+        self._file = spill_file
+
+    def _write(self, spill_file: IO[bytes], chunk: ResponseChunk) -> None:
+        """Append the payload of chunk to spill_file and remember its position."""
+        offset = spill_file.seek(0, 2)
+        spill_file.write(chunk.data)
+        self._records.append((chunk.sequence, chunk.metadata, offset, len(chunk.data)))
+
+    def __len__(self) -> int:
+        """Return the number of buffered chunks."""
+        with self._lock:
+            return len(self._memory) + len(self._records)
+
+    def __getitem__(self, position: int) -> ResponseChunk:
+        """Return the chunk at position, reading its payload back if spilled."""
+        with self._lock:
+            if self._file is None:
+                return self._memory[position]
+            sequence, metadata, offset, length = self._records[position]
+            self._file.seek(offset)
+            data = self._file.read(length)
+        return ResponseChunk(data=data, sequence=sequence, metadata=metadata)
+
+    def header(self, position: int) -> tuple[ResponseChunk, int]:
+        """Return the chunk at position without its payload.
+
+        Returns:
+            The chunk with empty data, and the length of its payload.
+        """
+        with self._lock:
+            if self._file is None:
+                chunk = self._memory[position]
+                return chunk.model_copy(update={"data": b""}), len(chunk.data)
+            sequence, metadata, _, length = self._records[position]
+        return ResponseChunk(data=b"", sequence=sequence, metadata=metadata), length
+
+    def payload(self, position: int) -> Iterator[bytes]:
+        """Iterate over the payload of the chunk at position in blocks.
+
+        A spilled payload is read back one block at a time, so it can be
+        copied elsewhere without holding it in memory.
+
+        Yields:
+            Consecutive slices of the payload.
+
+        Raises:
+            OSError: If the spool is closed or its file cannot be read.
+        """
+        with self._lock:
+            if self._file is None:
+                data = self._memory[position].data
+                offset = end = 0
+            else:
+                data = b""
+                _, _, offset, length = self._records[position]
+                end = offset + length
+        if data:
+            yield data
+        while offset < end:
+            with self._lock:
+                if self._file is None:
+                    msg = "the spool was closed"
+                    raise OSError(msg)
+                self._file.seek(offset)
+                block = self._file.read(min(_BLOCK_SIZE, end - offset))
+            if not block:
+                msg = "the spool file is truncated"
+                raise OSError(msg)
+            offset += len(block)
+            yield block
+
+    def chunks(self) -> tuple[ResponseChunk, ...]:
+        """Return every buffered chunk in order."""
+        return tuple(self[position] for position in range(len(self)))
+
+    def close(self) -> None:
+        """Release the buffer and delete the temporary file, if any."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._memory = []
+            self._records = []
@@ -0,0 +1,30 @@
+"""Storage adapters for cassette persistence."""
+
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from interposition_http_adapter.stores.content_addressed import (
+        ContentAddressedCassetteStore,
+    )
+    from interposition_http_adapter.stores.sqlite import SqliteCassetteStore
+
+__all__ = ["ContentAddressedCassetteStore", "SqliteCassetteStore"]
+
+# Each store is imported on first access, so that using one store does not
+# import the dependencies of the others.
+_LAZY_ATTRIBUTES = {
+    "ContentAddressedCassetteStore": (
+        "interposition_http_adapter.stores.content_addressed"
+    ),
+    "SqliteCassetteStore": "interposition_http_adapter.stores.sqlite",
+}
+
+
+def __getattr__(name: str) -> object:
+    """Import a store on first access."""
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    return getattr(importlib.import_module(module), name)
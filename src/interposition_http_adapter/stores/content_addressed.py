@@ -0,0 +1,168 @@
+"""Cassette store that keeps response bodies in a content-addressed directory."""
+
+import os
+import tempfile
+from pathlib import Path
+
+from interposition import Cassette, CassetteLoadError, CassetteSaveError, Interaction
+
+from interposition_http_adapter.bodies import (
+    body_digest,
+    chunk_body_digest,
+    reference_body,
+)
+
+
+class ContentAddressedCassetteStore:
+    """JSON cassette store with deduplicated response bodies.
+
+    Every non-empty chunk payload is written once to ``bodies_dir`` under its
+    SHA-256 digest and the cassette JSON refers to it through the
+    ``body_sha256`` chunk metadata. Loaded cassettes keep only the
+    references; bodies are read on first use and a single buffer per digest
+    is shared by every interaction that refers to it.
+
+    Attributes:
+        path: Path to the cassette JSON file.
+        bodies_dir: Directory holding the body files.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        bodies_dir: Path | None = None,
+        *,
+        create_if_missing: bool = False,
+    ) -> None:
+        """Initialize store with file paths.
+
+        Args:
+            path: Path to the cassette JSON file.
+            bodies_dir: Directory for body files. Defaults to a ``.bodies``
+                directory next to the cassette file.
+            create_if_missing: If True, load() returns an empty Cassette
+                when the file doesn't exist instead of raising CassetteLoadError.
+        """
+        self._path = path
+        self._bodies_dir = (
+            bodies_dir
+            if bodies_dir is not None
+            else path.with_name(f"{path.stem}.bodies")
+        )
+        self._create_if_missing = create_if_missing
+        self._bodies: dict[str, bytes] = {}
+
+    @property
+    def path(self) -> Path:
+        """Get the cassette file path."""
+        return self._path
+
+    @property
+    def bodies_dir(self) -> Path:
+        """Get the body directory."""
+        return self._bodies_dir
+
+    def _body_path(self, digest: str) -> Path:
+        """Return where the body with digest is stored."""
+        return self._bodies_dir / digest[:2] / digest
+
+    def load(self) -> Cassette:
+        """Load the cassette without reading any body.
+
+        Returns:
+            Cassette whose chunks reference their bodies by digest. If
+            create_if_missing is True and the file doesn't exist, returns an
+            empty Cassette.
+
+        Raises:
+            CassetteLoadError: If the file doesn't exist (and create_if_missing
+                is False), is unreadable, or contains invalid JSON.
+        """
+        try:
+            json_str = self._path.read_text(encoding="utf-8")
+        except FileNotFoundError as e:
+            if self._create_if_missing:
+                return Cassette(interactions=())
+            raise CassetteLoadError(self._path, e) from e
+        except OSError as e:
+            raise CassetteLoadError(self._path, e) from e
+        try:
+            return Cassette.model_validate_json(json_str)
+        except Exception as e:
+            raise CassetteLoadError(self._path, e) from e
+
+    def load_body(self, digest: str) -> bytes:
+        """Return the body stored under digest, reading it at most once.
+
+        Args:
+            digest: Hex SHA-256 digest of the body.
+
+        Returns:
+            The shared body buffer.
+
+        Raises:
+            CassetteLoadError: If the body file cannot be read.
+        """
+        body = self._bodies.get(digest)
+        if body is None:
+            body_path = self._body_path(digest)
+            try:
+                body = body_path.read_bytes()
+            except OSError as e:
+                raise CassetteLoadError(body_path, e) from e
+            self._bodies[digest] = body
+        return body
+
+    def save(self, cassette: Cassette) -> None:
+        """Save the cassette, moving inline bodies into the body directory.
+
+        Bodies that are already present are not written again.
+
+        Args:
+            cassette: The cassette to persist.
+
+        Raises:
+            CassetteSaveError: If a file write fails.
+        """
+        try:
+            interactions = tuple(
+                self._externalize(interaction) for interaction in cassette.interactions
+            )
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            json_str = Cassette(interactions=interactions).model_dump_json(indent=2)
+            self._path.write_text(json_str, encoding="utf-8")
+        except OSError as e:
+            raise CassetteSaveError(self._path, e) from e
+
+    def _externalize(self, interaction: Interaction) -> Interaction:
+        """Replace the inline chunk payloads of interaction by references."""
+        chunks = []
+        for chunk in interaction.response_chunks:
+            if not chunk.data or chunk_body_digest(chunk) is not None:
+                chunks.append(chunk)
+                continue
+            digest = body_digest(chunk.data)
+            self._write_body(digest, chunk.data)
+            chunks.append(reference_body(chunk, digest))
+        return Interaction(
+            request=interaction.request,
+            fingerprint=interaction.fingerprint,
+            response_chunks=tuple(chunks),
+            metadata=interaction.metadata,
+        )
+
+    def _write_body(self, digest: str, data: bytes) -> None:
+        """Atomically write data under digest unless it already exists."""
+        body_path = self._body_path(digest)
+        if digest in self._bodies or body_path.exists():
+            return
+        body_path.parent.mkdir(parents=True, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=body_path.parent)
+        try:
+            with os.fdopen(descriptor, "wb") as body_file:
+                body_file.write(data)
+            Path(temporary).replace(body_path)
+        except BaseException:
+            Path(temporary).unlink(missing_ok=True)
+            raise
+        self._bodies[digest] = data
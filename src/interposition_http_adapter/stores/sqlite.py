@@ -0,0 +1,440 @@
+"""SQLite-backed cassette store shared by multiple processes."""
+
+import json
+import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from interposition import (
+    Cassette,
+    CassetteLoadError,
+    CassetteSaveError,
+    Interaction,
+    InteractionRequest,
+    RequestFingerprint,
+    ResponseChunk,
+)
+from interposition.stores import JsonFileCassetteStore
+
+from interposition_http_adapter.bodies import (
+    BODY_DIGEST_KEY,
+    body_digest,
+    chunk_body_digest,
+    reference_body,
+)
+
+_BUSY_TIMEOUT_SECONDS = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS interactions (
+    id INTEGER PRIMARY KEY,
+    protocol TEXT NOT NULL,
+    action TEXT NOT NULL,
+    target TEXT NOT NULL,
+    fingerprint TEXT NOT NULL UNIQUE,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS interactions_route
+    ON interactions (protocol, action, target);
+CREATE TABLE IF NOT EXISTS chunks (
+    interaction_id INTEGER NOT NULL REFERENCES interactions (id),
+    sequence INTEGER NOT NULL,
+    metadata TEXT NOT NULL,
+    body_digest TEXT,
+    PRIMARY KEY (interaction_id, sequence)
+);
+CREATE TABLE IF NOT EXISTS bodies (
+    digest TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+"""
+
+_Pairs = tuple[tuple[str, str], ...]
+
+
+def _dump_pairs(pairs: _Pairs) -> str:
+    """Serialize key-value pairs as a JSON array."""
+    return json.dumps(pairs, separators=(",", ":"))
+
+
+def _load_pairs(text: str) -> _Pairs:
+    """Deserialize key-value pairs written by _dump_pairs."""
+    return tuple((str(key), str(value)) for key, value in json.loads(text))
+
+
+class SqliteCassetteStore:
+    """Cassette store backed by a SQLite database in WAL mode.
+
+    Interactions are stored with indexed protocol, action, target and
+    fingerprint columns. Response bodies are stored once per distinct
+    content as BLOBs and loaded on demand: loaded cassettes refer to them
+    through ``body_sha256`` chunk metadata and the adapter fetches them
+    through load_body when they are first served.
+
+    Any number of processes may open the database concurrently. load reads
+    every interaction's request and chunk metadata into memory, so each
+    worker holds the whole index. Interactions recorded by other workers
+    are found through header_schemas and find_interaction, which query the
+    route and fingerprint indexes; the adapter calls them when a request
+    misses its own index.
+
+    Each save writes every interaction that is not stored yet in one
+    transaction. The adapter's recorder batches concurrent recordings into
+    one save, so a burst of recordings costs one commit. An interaction
+    whose fingerprint is already stored, for example because another worker
+    recorded the same request, is skipped.
+
+    Attributes:
+        path: Path to the SQLite database file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initialize the store, creating the database schema if needed.
+
+        Args:
+            path: Path to the SQLite database file.
+
+        Raises:
+            CassetteLoadError: If the database cannot be opened or initialized.
+        """
+        self._path = path
+        self._local = threading.local()
+        self._stored: set[str] = set()
+        self._bodies: dict[str, bytes] = {}
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            connection = self._connection()
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+        except (OSError, sqlite3.Error) as e:
+            raise CassetteLoadError(path, e) from e
+
+    @property
+    def path(self) -> Path:
+        """Get the database file path."""
+        return self._path
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the calling thread's connection, opening it on first use."""
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self._path, timeout=_BUSY_TIMEOUT_SECONDS, isolation_level=None
+            )
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run the enclosed statements in one immediate write transaction."""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    @contextmanager
+    def _snapshot(self) -> Iterator[sqlite3.Connection]:
+        """Run the enclosed queries in one read transaction.
+
+        All queries see the database as of the first one, even if other
+        processes commit in between.
+        """
+        connection = self._connection()
+        connection.execute("BEGIN")
+        try:
+            yield connection
+        finally:
+            connection.execute("COMMIT")
+
+    def header_schemas(
+        self, protocol: str, action: str, target: str
+    ) -> tuple[tuple[str, ...], ...]:
+        """Return the distinct header schemas stored for a route.
+
+        Args:
+            protocol: Request protocol.
+            action: Request action, the HTTP method for HTTP requests.
+            target: Request target.
+
+        Returns:
+            The schemas in recording order; empty for unknown routes.
+
+        Raises:
+            CassetteLoadError: If the database cannot be read.
+        """
+        try:
+            rows = (
+                self._connection()
+                .execute(
+                    "SELECT headers FROM interactions "
+                    "WHERE protocol = ? AND action = ? AND target = ? ORDER BY id",
+                    (protocol, action, target),
+                )
+                .fetchall()
+            )
+        except sqlite3.Error as e:
+            raise CassetteLoadError(self._path, e) from e
+        schemas: dict[tuple[str, ...], None] = {}
+        for (headers,) in rows:
+            schemas[tuple(key for key, _ in _load_pairs(headers))] = None
+        return tuple(schemas)
+
+    def find_interaction(self, fingerprint: str) -> Interaction | None:
+        """Return the interaction stored under fingerprint, if any.
+
+        Args:
+            fingerprint: Hex fingerprint of the request.
+
+        Returns:
+            The interaction, with chunks referencing their bodies by digest.
+
+        Raises:
+            CassetteLoadError: If the database cannot be read or holds an
+                invalid interaction.
+        """
+        try:
+            with self._snapshot() as connection:
+                row = connection.execute(
+                    "SELECT id, protocol, action, target, fingerprint, headers, "
+                    "body, metadata FROM interactions WHERE fingerprint = ?",
+                    (fingerprint,),
+                ).fetchone()
+                if row is None:
+                    return None
+                chunk_rows = connection.execute(
+                    "SELECT sequence, metadata, body_digest FROM chunks "
+                    "WHERE interaction_id = ? ORDER BY sequence",
+                    (row[0],),
+                ).fetchall()
+            interaction = self._interaction(
+                row,
+                [
+                    self._chunk(sequence, metadata, digest)
+                    for sequence, metadata, digest in chunk_rows
+                ],
+            )
+        except (sqlite3.Error, ValueError) as e:
+            raise CassetteLoadError(self._path, e) from e
+        self._stored.add(fingerprint)
+        return interaction
+
+    def load(self) -> Cassette:
+        """Load every stored interaction without reading any body.
+
+        Interactions and chunks are read from one consistent snapshot.
+
+        Returns:
+            Cassette whose chunks reference their bodies by digest.
+
+        Raises:
+            CassetteLoadError: If the database cannot be read or holds
+                invalid interactions.
+        """
+        try:
+            with self._snapshot() as connection:
+                chunk_rows = connection.execute(
+                    "SELECT interaction_id, sequence, metadata, body_digest "
+                    "FROM chunks ORDER BY interaction_id, sequence"
+                ).fetchall()
+                interaction_rows = connection.execute(
+                    "SELECT id, protocol, action, target, fingerprint, headers, "
+                    "body, metadata FROM interactions ORDER BY id"
+                ).fetchall()
+            chunks: dict[int, list[ResponseChunk]] = {}
+            for interaction_id, sequence, metadata, digest in chunk_rows:
+                chunks.setdefault(interaction_id, []).append(
+                    self._chunk(sequence, metadata, digest)
+                )
+            interactions = [
+                self._interaction(row, chunks.pop(row[0], []))
+                for row in interaction_rows
+            ]
+        except (sqlite3.Error, ValueError) as e:
+            # pydantic's ValidationError is a ValueError.
+            raise CassetteLoadError(self._path, e) from e
+        self._stored.update(
+            interaction.fingerprint.value for interaction in interactions
+        )
+        return Cassette(interactions=tuple(interactions))
+
+    @staticmethod
+    def _chunk(sequence: int, metadata: str, digest: str | None) -> ResponseChunk:
+        """Build a ResponseChunk from a chunks row, referencing its body."""
+        chunk = ResponseChunk(
+            data=b"", sequence=sequence, metadata=_load_pairs(metadata)
+        )
+        if digest is not None:
+            chunk = reference_body(chunk, digest)
+        return chunk
+
+    @staticmethod
+    def _interaction(
+        row: tuple[int, str, str, str, str, str, bytes, str],
+        chunks: list[ResponseChunk],
+    ) -> Interaction:
+        """Build an Interaction from an interactions row and its chunks."""
+        _, protocol, action, target, fingerprint, headers, body, metadata = row
+        return Interaction(
+            request=InteractionRequest(
+                protocol=protocol,
+                action=action,
+                target=target,
+                headers=_load_pairs(headers),
+                body=body,
+            ),
+            fingerprint=RequestFingerprint(value=fingerprint),
+            response_chunks=tuple(chunks),
+            metadata=_load_pairs(metadata),
+        )
+
+    def load_body(self, digest: str) -> bytes:
+        """Return the body stored under digest, reading it at most once.
+
+        Args:
+            digest: Hex SHA-256 digest of the body.
+
+        Returns:
+            The shared body buffer.
+
+        Raises:
+            CassetteLoadError: If the body is missing or cannot be read.
+        """
+        body = self._bodies.get(digest)
+        if body is not None:
+            return body
+        try:
+            row = (
+                self._connection()
+                .execute("SELECT data FROM bodies WHERE digest = ?", (digest,))
+                .fetchone()
+            )
+        except sqlite3.Error as e:
+            raise CassetteLoadError(self._path, e) from e
+        if row is None:
+            raise CassetteLoadError(self._path, KeyError(digest))
+        body = bytes(row[0])
+        self._bodies[digest] = body
+        return body
+
+    def save(self, cassette: Cassette) -> None:
+        """Store the interactions of cassette that are not stored yet.
+
+        Args:
+            cassette: The cassette to persist.
+
+        Raises:
+            CassetteSaveError: If the write transaction fails.
+        """
+        pending = [
+            interaction
+            for interaction in cassette.interactions
+            if interaction.fingerprint.value not in self._stored
+        ]
+        if not pending:
+            return
+        try:
+            with self._transaction() as connection:
+                for interaction in pending:
+                    self._insert(connection, interaction)
+        except sqlite3.Error as e:
+            raise CassetteSaveError(self._path, e) from e
+        self._stored.update(interaction.fingerprint.value for interaction in pending)
+
+    @staticmethod
+    def _insert(connection: sqlite3.Connection, interaction: Interaction) -> None:
+        """Insert one interaction with its chunks and bodies."""
+        request = interaction.request
+        cursor = connection.execute(
+            "INSERT OR IGNORE INTO interactions "
+            "(protocol, action, target, fingerprint, headers, body, metadata) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                request.protocol,
+                request.action,
+                request.target,
+                interaction.fingerprint.value,
+                _dump_pairs(request.headers),
+                request.body,
+                _dump_pairs(interaction.metadata),
+            ),
+        )
+        if cursor.rowcount == 0:
+            return
+        chunk_rows = []
+        body_rows = []
+        for chunk in interaction.response_chunks:
+            digest = chunk_body_digest(chunk)
+            if digest is None and chunk.data:
+                digest = body_digest(chunk.data)
+                body_rows.append((digest, chunk.data))
+            metadata = tuple(
+                (key, value) for key, value in chunk.metadata if key != BODY_DIGEST_KEY
+            )
+            chunk_rows.append(
+                (cursor.lastrowid, chunk.sequence, _dump_pairs(metadata), digest)
+            )
+        connection.executemany(
+            "INSERT OR IGNORE INTO bodies (digest, data) VALUES (?, ?)", body_rows
+        )
+        connection.executemany(
+            "INSERT INTO chunks (interaction_id, sequence, metadata, body_digest) "
+            "VALUES (?, ?, ?, ?)",
+            chunk_rows,
+        )
+
+    def import_json(self, json_path: Path) -> None:
+        """Store every interaction of a JSON cassette file.
+
+        Args:
+            json_path: Path to a cassette saved by JsonFileCassetteStore.
+
+        Raises:
+            CassetteLoadError: If the JSON cassette cannot be loaded.
+            CassetteSaveError: If the interactions cannot be stored.
+        """
+        self.save(JsonFileCassetteStore(json_path).load())
+
+    def export_json(self, json_path: Path) -> None:
+        """Write every stored interaction, bodies included, to a JSON file.
+
+        Args:
+            json_path: Destination in the JsonFileCassetteStore format.
+
+        Raises:
+            CassetteLoadError: If the database cannot be read.
+            CassetteSaveError: If the JSON file cannot be written.
+        """
+        interactions = tuple(
+            Interaction(
+                request=interaction.request,
+                fingerprint=interaction.fingerprint,
+                response_chunks=tuple(
+                    self._inline(chunk) for chunk in interaction.response_chunks
+                ),
+                metadata=interaction.metadata,
+            )
+            for interaction in self.load().interactions
+        )
+        JsonFileCassetteStore(json_path).save(Cassette(interactions=interactions))
+
+    def _inline(self, chunk: ResponseChunk) -> ResponseChunk:
+        """Return chunk with its referenced body embedded as data."""
+        digest = chunk_body_digest(chunk)
+        if digest is None:
+            return chunk
+        return ResponseChunk(
+            data=self.load_body(digest),
+            sequence=chunk.sequence,
+            metadata=tuple(
+                (key, value) for key, value in chunk.metadata if key != BODY_DIGEST_KEY
+            ),
+        )
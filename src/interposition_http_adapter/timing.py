@@ -0,0 +1,102 @@
+"""Recording and replaying of response chunk timing."""
+
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Iterator
+from typing import TYPE_CHECKING
+
+import anyio
+from interposition import InteractionRequest, ResponseChunk
+
+if TYPE_CHECKING:
+    from interposition_http_adapter.app import LiveResponder
+
+OFFSET_METADATA_KEY = "offset_ms"
+"""Chunk metadata key holding the arrival offset from the request start."""
+
+_MILLISECONDS_PER_SECOND = 1000.0
+
+
+def record_chunk_offsets(live_responder: "LiveResponder") -> "LiveResponder":
+    """Wrap a live responder so that each chunk carries its arrival offset.
+
+    The offset is measured in milliseconds from the moment the live responder
+    is invoked and stored in the chunk metadata under ``offset_ms``. Chunks
+    that already carry an offset are passed through unchanged.
+
+    Args:
+        live_responder: The upstream responder to wrap.
+
+    Returns:
+        A live responder yielding the same chunks with timing metadata.
+    """
+
+    def responder(request: InteractionRequest) -> Iterator[ResponseChunk]:
+        started = time.monotonic()
+        for chunk in live_responder(request):
+            if chunk_offset(chunk) is not None:
+                yield chunk
+                continue
+            offset_ms = (time.monotonic() - started) * _MILLISECONDS_PER_SECOND
+            yield ResponseChunk(
+                data=chunk.data,
+                sequence=chunk.sequence,
+                metadata=(*chunk.metadata, (OFFSET_METADATA_KEY, f"{offset_ms:.3f}")),
+            )
+
+    return responder
+
+
+def chunk_offset(chunk: ResponseChunk) -> float | None:
+    """Return the recorded arrival offset of a chunk in milliseconds.
+
+    Args:
+        chunk: The chunk to inspect.
+
+    Returns:
+        The offset, or None if the chunk was recorded without timing.
+    """
+    for key, value in chunk.metadata:
+        if key == OFFSET_METADATA_KEY:
+            return float(value)
+    return None
+
+
+def has_timing(chunks: Iterable[ResponseChunk]) -> bool:
+    """Return whether any of the chunks carries a recorded arrival offset."""
+    return any(chunk_offset(chunk) is not None for chunk in chunks)
+
+
+async def _inline_data(chunk: ResponseChunk) -> bytes:
+    """Return the inline payload of a chunk."""
+    return chunk.data
+
+
+async def paced_chunks(
+    chunks: Iterable[ResponseChunk],
+    speed: float,
+    payload: Callable[[ResponseChunk], Awaitable[bytes]] = _inline_data,
+) -> AsyncIterator[bytes]:
+    """Yield chunk payloads at their recorded offsets scaled by speed.
+
+    Each chunk is scheduled relative to the start of the stream rather than
+    the previous chunk so that sleep overshoot does not accumulate. Pending
+    sleeps are parked on the event loop's timer queue, so many concurrently
+    delayed responses cost no more than one timer each.
+
+    Args:
+        chunks: The recorded response chunks.
+        speed: Playback speed multiplier. ``0`` disables pacing.
+        payload: Returns the bytes to send for a chunk.
+
+    Yields:
+        The payload of each chunk once its scheduled time has been reached.
+    """
+    started = anyio.current_time()
+    for chunk in chunks:
+        offset_ms = chunk_offset(chunk)
+        if speed > 0 and offset_ms is not None:
+            due = started + offset_ms / _MILLISECONDS_PER_SECOND / speed
+            delay = due - anyio.current_time()
+            if delay > 0:
+                await anyio.sleep(delay)
+        yield await payload(chunk)
@@ -0,0 +1,168 @@
+"""Replay of recorded WebSocket conversations."""
+
+from collections.abc import Awaitable, Callable
+from typing import Literal
+
+import anyio
+from interposition import ResponseChunk
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from interposition_http_adapter.timing import chunk_offset
+
+WS_PROTOCOL = "ws"
+"""Protocol of recorded WebSocket interactions."""
+
+FRAME_SENDER_KEY = "ws_sender"
+"""Chunk metadata key naming who sent a frame, ``server`` or ``client``."""
+
+FRAME_TYPE_KEY = "ws_type"
+"""Chunk metadata key holding the frame type, ``text`` or ``binary``."""
+
+SUBPROTOCOL_KEY = "ws_subprotocol"
+"""First chunk metadata key holding the subprotocol accepted by the server."""
+
+CLOSE_CODE_KEY = "ws_close"
+"""Chunk metadata key holding the code the server closed with after a frame."""
+
+FrameSender = Literal["server", "client"]
+"""Who sent a recorded frame."""
+
+_POLICY_VIOLATION = 1008
+_MILLISECONDS_PER_SECOND = 1000.0
+
+
+def _metadata(chunk: ResponseChunk, key: str) -> str | None:
+    """Return the value of a chunk metadata key, if present."""
+    for name, value in chunk.metadata:
+        if name == key:
+            return value
+    return None
+
+
+def frame_sender(chunk: ResponseChunk) -> FrameSender:
+    """Return who sent the frame of a chunk. Chunks default to server frames."""
+    return "client" if _metadata(chunk, FRAME_SENDER_KEY) == "client" else "server"
+
+
+def is_text_frame(chunk: ResponseChunk) -> bool:
+    """Return whether a chunk is a text frame. Chunks default to binary."""
+    return _metadata(chunk, FRAME_TYPE_KEY) == "text"
+
+
+def close_code(chunk: ResponseChunk) -> int | None:
+    """Return the code the server closed with after a chunk, if it did."""
+    value = _metadata(chunk, CLOSE_CODE_KEY)
+    return int(value) if value is not None else None
+
+
+class _Pacer:
+    """Schedules server frames at their recorded offsets scaled by speed.
+
+    Offsets are measured from the start of the recorded conversation, but a
+    replayed conversation waits for the client between server frames. Each
+    matched client frame therefore restarts the schedule: later frames are
+    due relative to the moment it arrived rather than to the start.
+    """
+
+    def __init__(self, speed: float) -> None:
+        self._speed = speed
+        self._anchor_time = anyio.current_time()
+        self._anchor_offset = 0.0
+        self._last_offset = 0.0
+
+    async def wait(self, chunk: ResponseChunk) -> None:
+        """Sleep until a server frame is due."""
+        offset = chunk_offset(chunk)
+        if offset is None:
+            return
+        self._last_offset = offset
+        if self._speed <= 0:
+            return
+        elapsed = (offset - self._anchor_offset) / _MILLISECONDS_PER_SECOND
+        delay = self._anchor_time + elapsed / self._speed - anyio.current_time()
+        if delay > 0:
+            await anyio.sleep(delay)
+
+    def restart(self, chunk: ResponseChunk) -> None:
+        """Restart the schedule at a client frame that just arrived."""
+        offset = chunk_offset(chunk)
+        if offset is not None:
+            self._last_offset = offset
+        self._anchor_time = anyio.current_time()
+        self._anchor_offset = self._last_offset
+
+
+async def replay_conversation(
+    websocket: WebSocket,
+    chunks: tuple[ResponseChunk, ...],
+    speed: float,
+    payload: Callable[[ResponseChunk], Awaitable[bytes]],
+) -> None:
+    """Accept a WebSocket and replay a recorded conversation on it.
+
+    Each chunk is one frame. Server frames are sent in order; at each client
+    frame the conversation waits for the next client message and closes
+    with ``1008`` if it differs from the recording. After the last frame the
+    socket is closed with the recorded close code or, if the server did not
+    close, kept open until the client disconnects.
+
+    Only the recorded frames are walked, once, so the cost per connection
+    does not depend on the size of the cassette.
+
+    Args:
+        websocket: The connection, not accepted yet.
+        chunks: The recorded frames.
+        speed: Playback speed multiplier. ``0`` disables pacing.
+        payload: Returns the bytes of a frame.
+    """
+    subprotocol = _metadata(chunks[0], SUBPROTOCOL_KEY) if chunks else None
+    await websocket.accept(subprotocol=subprotocol)
+    pacer = _Pacer(speed)
+    try:
+        for chunk in chunks:
+            if frame_sender(chunk) == "client":
+                if not await _receive_expected(websocket, chunk, await payload(chunk)):
+                    return
+                pacer.restart(chunk)
+            else:
+                await pacer.wait(chunk)
+                await _send(websocket, chunk, await payload(chunk))
+            code = close_code(chunk)
+            if code is not None:
+                await websocket.close(code=code)
+                return
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    except WebSocketDisconnect:
+        return
+
+
+async def _send(websocket: WebSocket, chunk: ResponseChunk, data: bytes) -> None:
+    """Send a recorded server frame."""
+    if is_text_frame(chunk):
+        await websocket.send_text(data.decode())
+    else:
+        await websocket.send_bytes(data)
+
+
+async def _receive_expected(
+    websocket: WebSocket, chunk: ResponseChunk, data: bytes
+) -> bool:
+    """Receive the next client frame, closing the socket if it is unexpected.
+
+    Returns:
+        Whether the frame matched the recorded client frame.
+
+    Raises:
+        WebSocketDisconnect: If the client disconnected.
+    """
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    if is_text_frame(chunk):
+        matches = message.get("text") == data.decode()
+    else:
+        matches = message.get("bytes") == data
+    if not matches:
+        await websocket.close(code=_POLICY_VIOLATION, reason="Unexpected client frame")
+    return matches
@@ -0,0 +1,42 @@
+"""Shared helpers for the unit tests."""
+
+from interposition import Interaction, InteractionRequest, ResponseChunk
+
+
+def make_interaction(
+    target: str,
+    *bodies: bytes,
+    headers: tuple[tuple[str, str], ...] = (),
+    request_body: bytes = b"",
+    status_code: str = "200",
+) -> Interaction:
+    """Create a recorded GET interaction.
+
+    Args:
+        target: The request target.
+        *bodies: Payload of each response chunk; one empty chunk if none.
+        headers: The request headers.
+        request_body: The request body.
+        status_code: Status code recorded on the first chunk.
+
+    Returns:
+        The interaction, fingerprinted from its request.
+    """
+    request = InteractionRequest(
+        protocol="http",
+        action="GET",
+        target=target,
+        headers=headers,
+        body=request_body,
+    )
+    chunks = tuple(
+        ResponseChunk(
+            data=data,
+            sequence=sequence,
+            metadata=(("status_code", status_code),) if sequence == 0 else (),
+        )
+        for sequence, data in enumerate(bodies or (b"",))
+    )
+    return Interaction(
+        request=request, fingerprint=request.fingerprint(), response_chunks=chunks
+    )
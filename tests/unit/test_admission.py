@@ -0,0 +1,96 @@
+"""Tests for admission control of upstream calls."""
+
+import anyio
+import pytest
+
+from interposition_http_adapter.admission import (
+    AdmissionController,
+    AdmissionRejectedError,
+)
+
+
+@pytest.mark.anyio
+async def test_unlimited_controller_admits_immediately() -> None:
+    """Without limits every call is admitted."""
+    controller = AdmissionController(
+        max_in_flight=0, prefix_limits=(), max_waiting=0, timeout=1.0
+    )
+
+    releases = [await controller.admit("/a") for _ in range(100)]
+
+    for release in releases:
+        release()
+
+
+@pytest.mark.anyio
+async def test_full_queue_rejects_with_retry_after() -> None:
+    """A call that would exceed the queue is rejected at once."""
+    controller = AdmissionController(
+        max_in_flight=1, prefix_limits=(), max_waiting=0, timeout=2.5
+    )
+    release = await controller.admit("/a")
+
+    with pytest.raises(AdmissionRejectedError) as excinfo:
+        await controller.admit("/b")
+
+    assert excinfo.value.retry_after == 3  # noqa: PLR2004
+    release()
+    (await controller.admit("/b"))()
+
+
+@pytest.mark.anyio
+async def test_waiting_call_is_admitted_when_a_slot_frees_up() -> None:
+    """Queued calls proceed as soon as a running call finishes."""
+    controller = AdmissionController(
+        max_in_flight=1, prefix_limits=(), max_waiting=1, timeout=5.0
+    )
+    release = await controller.admit("/a")
+    admitted: list[str] = []
+
+    async def wait() -> None:
+        (await controller.admit("/b"))()
+        admitted.append("/b")
+
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(wait)
+        await anyio.wait_all_tasks_blocked()
+        assert controller.waiting == 1
+        release()
+
+    assert admitted == ["/b"]
+    assert controller.waiting == 0
+
+
+@pytest.mark.anyio
+async def test_waiting_call_times_out() -> None:
+    """A queued call is rejected when no slot frees up in time."""
+    controller = AdmissionController(
+        max_in_flight=1, prefix_limits=(), max_waiting=1, timeout=0.05
+    )
+    release = await controller.admit("/a")
+
+    with pytest.raises(AdmissionRejectedError):
+        await controller.admit("/b")
+
+    assert controller.waiting == 0
+    release()
+
+
+@pytest.mark.anyio
+async def test_prefix_limit_applies_to_matching_targets_only() -> None:
+    """The longest matching prefix limits its targets, others pass."""
+    controller = AdmissionController(
+        max_in_flight=0,
+        prefix_limits=(("/api", 2), ("/api/slow", 1)),
+        max_waiting=0,
+        timeout=1.0,
+    )
+    slow = await controller.admit("/api/slow/1")
+
+    with pytest.raises(AdmissionRejectedError):
+        await controller.admit("/api/slow/2")
+    fast = await controller.admit("/api/fast")
+    other = await controller.admit("/static/app.js")
+
+    for release in (slow, fast, other):
+        release()
@@ -0,0 +1,83 @@
+"""Tests for offline cassette analysis."""
+
+import io
+from pathlib import Path
+
+import pytest
+from interposition import Cassette, Interaction, InteractionRequest, ResponseChunk
+from interposition.stores import JsonFileCassetteStore
+
+from interposition_http_adapter.analysis import analyze_cassette, iter_interactions
+from tests.unit.helpers import make_interaction
+
+
+def test_iter_interactions_streams_with_small_reads() -> None:
+    """Elements larger than the read size are decoded across reads."""
+    document = '{"interactions": [{"a": "' + "x" * 100 + '"}, {"b": []}]}'
+
+    items = list(iter_interactions(io.StringIO(document), read_size=7))
+
+    assert items == [{"a": "x" * 100}, {"b": []}]
+
+
+def test_iter_interactions_rejects_non_cassette() -> None:
+    """A document without an interactions array is reported."""
+    with pytest.raises(ValueError, match="expected"):
+        list(iter_interactions(io.StringIO("[1, 2]")))
+
+
+def test_analyze_cassette_reports_fan_out_and_bodies(tmp_path: Path) -> None:
+    """Route fan-out, schemas, duplicates and collisions are counted."""
+    path = tmp_path / "cassette.json"
+    first = make_interaction("/a", b"same")
+    interactions = (
+        first,
+        first,
+        make_interaction("/a", b"same", headers=(("accept", "text/plain"),)),
+        make_interaction("/b"),
+    )
+    JsonFileCassetteStore(path).save(Cassette(interactions=interactions))
+
+    report = analyze_cassette(path, top=1)
+
+    assert report.interactions == 4  # noqa: PLR2004
+    assert report.routes == 2  # noqa: PLR2004
+    assert len(report.top_routes) == 1
+    assert report.top_routes[0].target == "/a"
+    assert report.top_routes[0].interactions == 3  # noqa: PLR2004
+    assert report.max_header_schemas == 2  # noqa: PLR2004
+    assert report.mean_candidates == 7 / 4
+    assert report.fingerprint_collisions == 1
+    assert report.duplicate_bodies == 2  # noqa: PLR2004
+    assert report.body_bytes == 12  # noqa: PLR2004
+    assert report.body_sizes["0 B"] == 1
+    assert report.body_sizes["<= 1 KiB"] == 3  # noqa: PLR2004
+
+
+def test_analyze_cassette_counts_only_body_references(tmp_path: Path) -> None:
+    """Empty chunks count as referenced only with a digest or sidecar file."""
+    path = tmp_path / "cassette.json"
+    metadata = (
+        (("status_code", "204"),),
+        (("status_code", "200"), ("body_sha256", "ab" * 32)),
+        (("status_code", "200"), ("body_file", "cd" * 32)),
+    )
+    interactions = []
+    for number, chunk_metadata in enumerate(metadata):
+        request = InteractionRequest(
+            protocol="http", action="GET", target=f"/{number}", headers=(), body=b""
+        )
+        interactions.append(
+            Interaction(
+                request=request,
+                fingerprint=request.fingerprint(),
+                response_chunks=(
+                    ResponseChunk(data=b"", sequence=0, metadata=chunk_metadata),
+                ),
+            )
+        )
+    JsonFileCassetteStore(path).save(Cassette(interactions=tuple(interactions)))
+
+    report = analyze_cassette(path)
+
+    assert report.referenced_chunks == 2  # noqa: PLR2004
@@ -1,14 +1,22 @@
 """Tests for the HTTP adapter application."""
 
+import gc
+import threading
+import time
+import weakref
+from collections.abc import Iterator
 from dataclasses import dataclass
 from pathlib import Path
 from unittest.mock import MagicMock
 
+import anyio
+import anyio.from_thread
 import pytest
 from httpx import ASGITransport, AsyncClient, Response
 from interposition import (
     Broker,
     Cassette,
+    CassetteSaveError,
     CassetteStore,
     Interaction,
     InteractionRequest,
@@ -16,12 +24,26 @@ from interposition import (
     ResponseChunk,
 )
 from interposition.stores import JsonFileCassetteStore
-
-from interposition_http_adapter import InterpositionHttpAdapter
+from pytest_mock import MockerFixture
+from starlette.requests import ClientDisconnect
+from starlette.types import Message, Scope
+
+from interposition_http_adapter import (
+    AdapterConfig,
+    InterpositionHttpAdapter,
+    app,
+    diagnostics,
+    misses,
+    spool,
+)
+from interposition_http_adapter.bodies import body_digest
 
 HTTP_OK = 200
 HTTP_CREATED = 201
+HTTP_PARTIAL_CONTENT = 206
 HTTP_INTERNAL_SERVER_ERROR = 500
+HTTP_SERVICE_UNAVAILABLE = 503
+UPSTREAM_THREADS = 40
 
 
 @dataclass(frozen=True)
@@ -77,6 +99,28 @@ async def _send_request(
         return await client.request(method, path, content=body, headers=headers)
 
 
+def _get_scope(path: str) -> Scope:
+    """Build the ASGI scope of a GET request without query string."""
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+
+
+async def _receive_empty_body() -> Message:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
 @pytest.mark.anyio
 async def test_get_request_returns_recorded_response() -> None:
     """Adapter returns the recorded response for a matching GET request."""
@@ -361,3 +405,639 @@ def test_from_cassette_file_record_mode_without_live_responder_raises(
 
     with pytest.raises(LiveResponderRequiredError):
         InterpositionHttpAdapter.from_cassette_file(cassette_path, mode="record")
+
+
+@pytest.mark.anyio
+async def test_replay_speed_paces_chunks_with_recorded_offsets() -> None:
+    """Adapter streams chunks at their recorded offsets scaled by replay_speed."""
+    request = InteractionRequest(
+        protocol="http", action="GET", target="/stream", headers=(), body=b""
+    )
+    response_chunks = (
+        ResponseChunk(
+            data=b"first",
+            sequence=0,
+            metadata=(("status_code", "200"), ("offset_ms", "0")),
+        ),
+        ResponseChunk(data=b"second", sequence=1, metadata=(("offset_ms", "300"),)),
+    )
+    interaction = Interaction(
+        request=request,
+        fingerprint=request.fingerprint(),
+        response_chunks=response_chunks,
+    )
+    broker = Broker(cassette=Cassette(interactions=(interaction,)), mode="replay")
+    adapter = InterpositionHttpAdapter(
+        broker=broker, config=AdapterConfig(replay_speed=2.0)
+    )
+
+    started = time.monotonic()
+    response = await _send_request(adapter, "GET", "/stream")
+    elapsed = time.monotonic() - started
+
+    assert response.status_code == HTTP_OK
+    assert response.content == b"firstsecond"
+    assert elapsed >= 0.15  # noqa: PLR2004
+
+
+def test_adapter_config_rejects_negative_replay_speed() -> None:
+    """AdapterConfig refuses a negative replay speed."""
+    with pytest.raises(ValueError, match="replay_speed"):
+        AdapterConfig(replay_speed=-1.0)
+
+
+@pytest.mark.anyio
+async def test_from_store_records_chunk_offsets() -> None:
+    """Interactions recorded through from_store carry chunk arrival offsets."""
+    mock_store = MagicMock(spec=CassetteStore)
+    mock_store.load.return_value = Cassette(interactions=())
+
+    def live_responder(_request: InteractionRequest) -> list[ResponseChunk]:
+        return [
+            ResponseChunk(data=b"live", sequence=0, metadata=(("status_code", "200"),))
+        ]
+
+    adapter = InterpositionHttpAdapter.from_store(
+        mock_store, mode="auto", live_responder=live_responder
+    )
+
+    response = await _send_request(adapter, "GET", "/api/live")
+
+    assert response.content == b"live"
+    saved_cassette = mock_store.save.call_args.args[0]
+    metadata_keys = [
+        key for key, _ in saved_cassette.interactions[0].response_chunks[0].metadata
+    ]
+    assert metadata_keys == ["status_code", "offset_ms"]
+
+
+@pytest.mark.anyio
+async def test_auto_mode_coalesces_concurrent_identical_misses() -> None:
+    """Concurrent identical misses trigger one upstream call and one recording."""
+    mock_store = MagicMock(spec=CassetteStore)
+    mock_store.load.return_value = Cassette(interactions=())
+    upstream_calls: list[InteractionRequest] = []
+
+    def live_responder(request: InteractionRequest) -> list[ResponseChunk]:
+        upstream_calls.append(request)
+        time.sleep(0.1)
+        return [
+            ResponseChunk(data=b"live", sequence=0, metadata=(("status_code", "200"),))
+        ]
+
+    adapter = InterpositionHttpAdapter.from_store(
+        mock_store, mode="auto", live_responder=live_responder
+    )
+    responses: list[Response] = []
+
+    async def send() -> None:
+        responses.append(await _send_request(adapter, "GET", "/api/burst"))
+
+    async with anyio.create_task_group() as task_group:
+        for _ in range(5):
+            task_group.start_soon(send)
+
+    assert [response.content for response in responses] == [b"live"] * 5
+    assert len(upstream_calls) == 1
+    saved_cassette = mock_store.save.call_args.args[0]
+    assert len(saved_cassette.interactions) == 1
+
+
+@pytest.mark.anyio
+async def test_failed_upstream_stream_is_not_recorded() -> None:
+    """A live response that fails midway is dropped instead of recorded."""
+    mock_store = MagicMock(spec=CassetteStore)
+    mock_store.load.return_value = Cassette(interactions=())
+
+    def live_responder(_request: InteractionRequest) -> Iterator[ResponseChunk]:
+        yield ResponseChunk(data=b"par", sequence=0, metadata=(("status_code", "200"),))
+        msg = "upstream reset"
+        raise ConnectionError(msg)
+
+    adapter = InterpositionHttpAdapter.from_store(
+        mock_store, mode="record", live_responder=live_responder
+    )
+
+    with pytest.raises(ConnectionError, match="upstream reset"):
+        await _send_request(adapter, "GET", "/api/stream")
+
+    mock_store.save.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_live_response_is_streamed_while_upstream_is_in_progress() -> None:
+    """The first live chunk reaches the client before the upstream finishes."""
+    mock_store = MagicMock(spec=CassetteStore)
+    mock_store.load.return_value = Cassette(interactions=())
+    first_chunk_sent = threading.Event()
+
+    def live_responder(_request: InteractionRequest) -> Iterator[ResponseChunk]:
+        yield ResponseChunk(data=b"first", sequence=0)
+        streamed = first_chunk_sent.wait(timeout=5)
+        yield ResponseChunk(data=b"streamed" if streamed else b"buffered", sequence=1)
+
+    adapter = InterpositionHttpAdapter.from_store(
+        mock_store, mode="record", live_responder=live_responder
+    )
+    bodies: list[bytes] = []
+
+    async def send(message: Message) -> None:
+        if message["type"] == "http.response.body" and message.get("body"):
+            bodies.append(message["body"])
+            first_chunk_sent.set()
+
+    await adapter(_get_scope("/api/stream"), _receive_empty_body, send)
+
+    assert bodies == [b"first", b"streamed"]
+    saved_cassette = mock_store.save.call_args.args[0]
+    assert len(saved_cassette.interactions) == 1
+
+
+@pytest.mark.anyio
+async def test_concurrent_recordings_of_different_requests_are_all_saved() -> None:
+    """Concurrent live responses for different requests are all recorded."""
+    mock_store = MagicMock(spec=CassetteStore)
+    mock_store.load.return_value = Cassette(interactions=())
+    targets = [f"/api/items/{item}" for item in range(8)]
+
+    def live_responder(request: InteractionRequest) -> list[ResponseChunk]:
+        time.sleep(0.05)
+        return [ResponseChunk(data=request.target.encode(), sequence=0)]
+
+    adapter = InterpositionHttpAdapter.from_store(
+        mock_store, mode="record", live_responder=live_responder
+    )
+
+    async with anyio.create_task_group() as task_group:
+        for target in targets:
+            task_group.start_soon(_send_request, adapter, "GET", target)
+
+    saved_cassette = mock_store.save.call_args.args[0]
+    assert sorted(
+        interaction.request.target for interaction in saved_cassette.interactions
+    ) == sorted(targets)
+
+
+@pytest.mark.anyio
+async def test_large_recorded_body_is_served_from_sidecar_file(
+    tmp_path: Path,
+) -> None:
+    """Record mode writes large bodies to sidecars that replay serves as files."""
+    store = JsonFileCassetteStore(tmp_path / "cassette.json", create_if_missing=True)
+    config = AdapterConfig(sidecar_dir=tmp_path / "sidecars", sidecar_threshold=4)
+    body = b"0123456789"
+
+    def live_responder(_request: InteractionRequest) -> list[ResponseChunk]:
+        return [
+            ResponseChunk(data=body, sequence=0, metadata=(("status_code", "200"),))
+        ]
+
+    recorder = InterpositionHttpAdapter.from_store(
+        store, mode="record", live_responder=live_responder, config=config
+    )
+    recorded = await _send_request(recorder, "GET", "/download")
+    replayer = InterpositionHttpAdapter.from_store(store, config=config)
+    full = await _send_request(replayer, "GET", "/download")
+    partial = await _send_request(
+        replayer, "GET", "/download", headers={"Range": "bytes=2-5"}
+    )
+
+    assert recorded.content == body
+    assert store.load().interactions[0].response_chunks[0].data == b""
+    assert full.status_code == HTTP_OK
+    assert full.content == body
+    assert partial.status_code == HTTP_PARTIAL_CONTENT
+    assert partial.content == b"2345"
+
+
+@pytest.mark.anyio
+async def test_spilled_response_is_copied_to_sidecars_without_reading_it_back(
+    tmp_path: Path, mocker: MockerFixture
+) -> None:
+    """A response spooled to disk is streamed into its sidecar files."""
+    mock_store = MagicMock(spec=CassetteStore)
+    mock_store.load.return_value = Cassette(interactions=())
+    config = AdapterConfig(
+        sidecar_dir=tmp_path / "sidecars",
+        sidecar_threshold=4,
+        record_spool_threshold=4,
+    )
+    bodies = [b"0123456789", b"abcdefghij"]
+
+    def live_responder(_request: InteractionRequest) -> list[ResponseChunk]:
+        return [
+            ResponseChunk(data=body, sequence=sequence)
+            for sequence, body in enumerate(bodies)
+        ]
+
+    read_back = mocker.spy(spool.ChunkSpool, "chunks")
+    adapter = InterpositionHttpAdapter.from_store(
+        mock_store, mode="record", live_responder=live_responder, config=config
+    )
+    response = await _send_request(adapter, "GET", "/download")
+
+    chunks = mock_store.save.call_args.args[0].interactions[0].response_chunks
+    assert response.content == b"".join(bodies)
+    assert read_back.call_count == 0
+    assert [chunk.data for chunk in chunks] == [b"", b""]
+    assert [
+        (tmp_path / "sidecars" / body_digest(body)).read_bytes() for body in bodies
+    ] == bodies
+
+
+@pytest.mark.anyio
+async def test_recording_failure_does_not_fail_the_live_response() -> None:
+    """A cassette that cannot be saved still lets the response complete."""
+    mock_store = MagicMock(spec=CassetteStore)
+    mock_store.load.return_value = Cassette(interactions=())
+    mock_store.save.side_effect = CassetteSaveError(
+        Path("cassette.json"), OSError("disk full")
+    )
+
+    def live_responder(_request: InteractionRequest) -> list[ResponseChunk]:
+        return [
+            ResponseChunk(data=b"live", sequence=0, metadata=(("status_code", "200"),))
+        ]
+
+    adapter = InterpositionHttpAdapter.from_store(
+        mock_store, mode="record", live_responder=live_responder
+    )
+    response = await _send_request(adapter, "GET", "/api/data")
+
+    assert response.status_code == HTTP_OK
+    assert response.content == b"live"
+    mock_store.save.assert_called_once()
+
+
+@pytest.mark.anyio
+async def test_sidecar_reference_without_sidecar_dir_fails() -> None:
+    """A body in a sidecar file is not served as empty without sidecar_dir."""
+    request = InteractionRequest(
+        protocol="http", action="GET", target="/download", headers=(), body=b""
+    )
+    chunk = ResponseChunk(
+        data=b"",
+        sequence=0,
+        metadata=(("status_code", "200"), ("body_file", "0123abcd")),
+    )
+    interaction = Interaction(
+        request=request, fingerprint=request.fingerprint(), response_chunks=(chunk,)
+    )
+    adapter = InterpositionHttpAdapter(
+        Broker(cassette=Cassette(interactions=(interaction,)), mode="replay")
+    )
+    transport = ASGITransport(app=adapter, raise_app_exceptions=False)
+
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.get("/download")
+
+    assert response.status_code == HTTP_INTERNAL_SERVER_ERROR
+
+
+@pytest.mark.anyio
+async def test_stalled_upstream_calls_do_not_delay_sidecar_replays(
+    tmp_path: Path,
+) -> None:
+    """Upstream pulls do not take the threads file-backed replays read with."""
+    body = b"0123456789"
+    sidecar_dir = tmp_path / "sidecars"
+    sidecar_dir.mkdir()
+    (sidecar_dir / "download").write_bytes(body)
+    request = InteractionRequest(
+        protocol="http", action="GET", target="/download", headers=(), body=b""
+    )
+    chunk = ResponseChunk(
+        data=b"",
+        sequence=0,
+        metadata=(("status_code", "200"), ("body_file", "download")),
+    )
+    interaction = Interaction(
+        request=request, fingerprint=request.fingerprint(), response_chunks=(chunk,)
+    )
+    upstream_released = threading.Event()
+    upstream_saturated = anyio.Event()
+    stalled = 0
+    stalled_lock = threading.Lock()
+
+    def live_responder(_request: InteractionRequest) -> Iterator[ResponseChunk]:
+        nonlocal stalled
+        with stalled_lock:
+            stalled += 1
+            if stalled == UPSTREAM_THREADS:
+                anyio.from_thread.run_sync(upstream_saturated.set)
+        upstream_released.wait(timeout=5)
+        yield ResponseChunk(data=b"late", sequence=0)
+
+    adapter = InterpositionHttpAdapter(
+        Broker(
+            cassette=Cassette(interactions=(interaction,)),
+            mode="auto",
+            live_responder=live_responder,
+        ),
+        AdapterConfig(sidecar_dir=sidecar_dir, sidecar_threshold=1 << 20),
+    )
+
+    async with anyio.create_task_group() as task_group:
+        for number in range(UPSTREAM_THREADS + 5):
+            task_group.start_soon(_send_request, adapter, "GET", f"/slow/{number}")
+        with anyio.fail_after(5):
+            await upstream_saturated.wait()
+        started = time.monotonic()
+        hit = await _send_request(adapter, "GET", "/download")
+        elapsed = time.monotonic() - started
+        upstream_released.set()
+
+    assert hit.content == body
+    assert elapsed < 1.0
+
+
+@pytest.mark.anyio
+async def test_upstream_limit_rejects_excess_calls_but_not_replays() -> None:
+    """Calls beyond the upstream limit get 503 while replay hits are served."""
+    spec = ReplaySpec(
+        method="GET", target="/cached", status_code=HTTP_OK, response_body=b"hit"
+    )
+    broker = _create_replay_broker(spec)
+    upstream_started = threading.Event()
+    upstream_release = threading.Event()
+
+    def live_responder(_request: InteractionRequest) -> Iterator[ResponseChunk]:
+        upstream_started.set()
+        upstream_release.wait(5)
+        yield ResponseChunk(data=b"live", sequence=0)
+
+    adapter = InterpositionHttpAdapter(
+        Broker(cassette=broker.cassette, mode="auto", live_responder=live_responder),
+        AdapterConfig(max_upstream_in_flight=1, upstream_queue_size=0),
+    )
+    responses: dict[str, Response] = {}
+
+    async def send(path: str) -> None:
+        responses[path] = await _send_request(adapter, "GET", path)
+
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(send, "/slow")
+        await anyio.to_thread.run_sync(upstream_started.wait, 5)
+        await send("/other")
+        await send("/cached")
+        upstream_release.set()
+
+    assert responses["/slow"].content == b"live"
+    assert responses["/other"].status_code == HTTP_SERVICE_UNAVAILABLE
+    assert responses["/other"].headers["Retry-After"] == "30"
+    assert responses["/cached"].content == b"hit"
+
+
+@pytest.mark.anyio
+async def test_disconnect_before_response_start_frees_flight_and_slot() -> None:
+    """A failed response start releases the flight and the upstream slot."""
+    spec = ReplaySpec(
+        method="GET", target="/cached", status_code=HTTP_OK, response_body=b"hit"
+    )
+
+    def live_responder(_request: InteractionRequest) -> Iterator[ResponseChunk]:
+        yield ResponseChunk(data=b"live", sequence=0)
+        yield ResponseChunk(data=b"more", sequence=1)
+
+    adapter = InterpositionHttpAdapter(
+        Broker(
+            cassette=_create_replay_broker(spec).cassette,
+            mode="auto",
+            live_responder=live_responder,
+        ),
+        AdapterConfig(max_upstream_in_flight=1, upstream_queue_size=0),
+    )
+
+    async def send(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            msg = "client disconnected"
+            raise OSError(msg)
+
+    with pytest.raises(ClientDisconnect):
+        await adapter(_get_scope("/live"), _receive_empty_body, send)
+    handler = adapter._loader._handler  # noqa: SLF001
+    assert handler is not None
+    assert len(handler._flights) == 0  # noqa: SLF001
+    response = await _send_request(adapter, "GET", "/other")
+
+    assert response.status_code == HTTP_OK
+    assert response.content == b"livemore"
+
+
+@pytest.mark.anyio
+async def test_health_and_readiness_endpoints() -> None:
+    """A loaded adapter reports itself alive and ready outside replay routes."""
+    spec = ReplaySpec(
+        method="GET", target="/api/data", status_code=HTTP_OK, response_body=b"x"
+    )
+    adapter = InterpositionHttpAdapter(broker=_create_replay_broker(spec))
+
+    health = await _send_request(adapter, "GET", "/__health")
+    ready = await _send_request(adapter, "GET", "/__ready")
+
+    assert adapter.ready
+    assert health.json() == {"status": "ok"}
+    assert ready.status_code == HTTP_OK
+    assert ready.json() == {"status": "ready"}
+
+
+@pytest.mark.anyio
+async def test_background_load_serves_once_cassette_is_indexed() -> None:
+    """Replay routes answer 503 until the background load completes."""
+    spec = ReplaySpec(
+        method="GET", target="/api/data", status_code=HTTP_OK, response_body=b"hello"
+    )
+    loaded = threading.Event()
+    mock_store = MagicMock(spec=CassetteStore)
+
+    def load() -> Cassette:
+        loaded.wait(5)
+        return _create_replay_broker(spec).cassette
+
+    mock_store.load.side_effect = load
+    adapter = InterpositionHttpAdapter.from_store(
+        mock_store, config=AdapterConfig(background_load=True)
+    )
+
+    loading = await _send_request(adapter, "GET", "/__ready")
+    early = await _send_request(adapter, "GET", "/api/data")
+    health = await _send_request(adapter, "GET", "/__health")
+    loaded.set()
+    for _ in range(500):
+        if adapter.ready:
+            break
+        await anyio.sleep(0.01)
+    response = await _send_request(adapter, "GET", "/api/data")
+
+    assert loading.status_code == HTTP_SERVICE_UNAVAILABLE
+    assert loading.json() == {"status": "loading"}
+    assert early.status_code == HTTP_SERVICE_UNAVAILABLE
+    assert health.status_code == HTTP_OK
+    assert response.content == b"hello"
+
+
+@pytest.mark.anyio
+async def test_background_load_failure_is_reported_by_readiness(
+    tmp_path: Path,
+) -> None:
+    """A cassette that fails to load in the background keeps the adapter unready."""
+    adapter = InterpositionHttpAdapter.from_cassette_file(
+        tmp_path / "missing.json", config=AdapterConfig(background_load=True)
+    )
+
+    for _ in range(500):
+        ready = await _send_request(adapter, "GET", "/__ready")
+        if ready.json()["status"] != "loading":
+            break
+        await anyio.sleep(0.01)
+
+    assert ready.status_code == HTTP_SERVICE_UNAVAILABLE
+    assert ready.json()["status"] == "failed"
+    assert not adapter.ready
+
+
+@pytest.mark.anyio
+async def test_recording_policy_drops_are_counted() -> None:
+    """Dropped live interactions are answered but not saved, and counted."""
+    mock_store = MagicMock(spec=CassetteStore)
+    mock_store.load.return_value = Cassette(interactions=())
+
+    def live_responder(_request: InteractionRequest) -> list[ResponseChunk]:
+        return [ResponseChunk(data=b"live", sequence=0)]
+
+    adapter = InterpositionHttpAdapter.from_store(
+        mock_store,
+        mode="record",
+        live_responder=live_responder,
+        config=AdapterConfig(record_skip_existing=True),
+    )
+
+    responses = [await _send_request(adapter, "GET", "/api/poll") for _ in range(3)]
+
+    assert [response.content for response in responses] == [b"live"] * 3
+    assert mock_store.save.call_count == 1
+    assert adapter.recording_drops["existing"] == 2  # noqa: PLR2004
+
+
+@pytest.mark.anyio
+async def test_repeated_replay_miss_skips_candidate_matching(
+    mocker: MockerFixture,
+) -> None:
+    """Unknown routes and repeated misses are rejected without matching."""
+    spec = ReplaySpec(
+        method="POST",
+        target="/api/data",
+        status_code=HTTP_OK,
+        response_body=b"hello",
+        request_body=b"expected",
+    )
+    adapter = InterpositionHttpAdapter(broker=_create_replay_broker(spec))
+    build_candidates = mocker.spy(app, "_build_replay_candidates")
+
+    unknown_route = await _send_request(adapter, "GET", "/api/unknown")
+    first_miss = await _send_request(adapter, "POST", "/api/data", body=b"other")
+    second_miss = await _send_request(adapter, "POST", "/api/data", body=b"other")
+
+    assert unknown_route.status_code == HTTP_INTERNAL_SERVER_ERROR
+    assert first_miss.status_code == HTTP_INTERNAL_SERVER_ERROR
+    assert second_miss.status_code == HTTP_INTERNAL_SERVER_ERROR
+    assert build_candidates.call_count == 1
+
+
+@pytest.mark.anyio
+async def test_miss_filter_is_built_before_the_first_request(
+    mocker: MockerFixture,
+) -> None:
+    """The Bloom filter over recorded routes is built when the adapter starts."""
+    spec = ReplaySpec(
+        method="GET", target="/api/data", status_code=HTTP_OK, response_body=b"hi"
+    )
+    build_filter = mocker.spy(misses.BloomFilter, "add")
+
+    adapter = InterpositionHttpAdapter(broker=_create_replay_broker(spec))
+    built = build_filter.call_count
+    response = await _send_request(adapter, "GET", "/api/data")
+
+    assert built == 1
+    assert build_filter.call_count == built
+    assert response.status_code == HTTP_OK
+
+
+@pytest.mark.anyio
+async def test_miss_diagnostics_are_indexed_before_the_first_miss(
+    mocker: MockerFixture,
+) -> None:
+    """The near-miss indexes are built when the adapter starts."""
+    spec = ReplaySpec(
+        method="GET", target="/api/data", status_code=HTTP_OK, response_body=b"hi"
+    )
+    split_target = mocker.spy(diagnostics, "_split_target")
+
+    adapter = InterpositionHttpAdapter(
+        broker=_create_replay_broker(spec),
+        config=AdapterConfig(miss_diagnostics=True),
+    )
+    indexed = split_target.call_count
+    response = await _send_request(adapter, "GET", "/api/other")
+
+    assert indexed == 1
+    assert response.status_code == HTTP_INTERNAL_SERVER_ERROR
+    assert response.json()["near_misses"][0]["target"] == "/api/data"
+
+
+@pytest.mark.anyio
+async def test_miss_diagnostics_returns_json_explanation() -> None:
+    """With miss_diagnostics enabled, a miss explains the closest interaction."""
+    spec = ReplaySpec(
+        method="GET",
+        target="/api/data",
+        status_code=HTTP_OK,
+        response_body=b"hello",
+        headers=(("x-role", "admin"),),
+    )
+    adapter = InterpositionHttpAdapter(
+        broker=_create_replay_broker(spec),
+        config=AdapterConfig(miss_diagnostics=True),
+    )
+
+    response = await _send_request(adapter, "GET", "/api/data")
+
+    assert response.status_code == HTTP_INTERNAL_SERVER_ERROR
+    assert response.json() == {
+        "error": "Interaction Not Found",
+        "method": "GET",
+        "target": "/api/data",
+        "near_misses": [
+            {
+                "method": "GET",
+                "target": "/api/data",
+                "differences": [{"field": "header", "name": "x-role", "actual": None}],
+            }
+        ],
+    }
+
+
+@pytest.mark.anyio
+async def test_replay_adapter_does_not_retain_the_cassette_models() -> None:
+    """Replay keeps only the index and compact miss records of the cassette."""
+    spec = ReplaySpec(
+        method="POST",
+        target="/api/data",
+        status_code=HTTP_OK,
+        response_body=b"hello",
+        request_body=b"expected",
+    )
+    broker = _create_replay_broker(spec)
+    cassette = weakref.ref(broker.cassette)
+    adapter = InterpositionHttpAdapter(
+        broker=broker, config=AdapterConfig(miss_diagnostics=True)
+    )
+    del broker
+    gc.collect()
+
+    hit = await _send_request(adapter, "POST", "/api/data", body=b"expected")
+    miss = await _send_request(adapter, "POST", "/api/data", body=b"other")
+
+    assert cassette() is None
+    assert hit.content == b"hello"
+    assert miss.json()["near_misses"][0]["differences"] == [{"field": "body"}]
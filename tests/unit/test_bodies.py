@@ -0,0 +1,55 @@
+"""Tests for response bodies stored outside of the cassette."""
+
+from pathlib import Path
+
+import pytest
+from interposition import CassetteLoadError, ResponseChunk
+
+from interposition_http_adapter.bodies import BODY_FILE_KEY, SidecarFiles
+
+
+def test_large_chunk_is_moved_to_a_sidecar_file(tmp_path: Path) -> None:
+    """Payloads above the threshold are written once and referenced."""
+    sidecars = SidecarFiles(tmp_path / "sidecars", threshold=3)
+    chunk = ResponseChunk(data=b"large", sequence=0, metadata=(("k", "v"),))
+
+    first = sidecars.externalize(chunk)
+    second = sidecars.externalize(chunk)
+
+    assert first == second
+    assert first.data == b""
+    assert first.metadata[0] == ("k", "v")
+    assert len(list((tmp_path / "sidecars").iterdir())) == 1
+    assert sidecars.read(first) == b"large"
+
+
+def test_streamed_payload_is_written_under_its_digest(tmp_path: Path) -> None:
+    """write() hashes the blocks as it stores them and shares equal bodies."""
+    sidecars = SidecarFiles(tmp_path, threshold=3)
+    chunk = ResponseChunk(data=b"", sequence=2, metadata=(("k", "v"),))
+
+    streamed = sidecars.write(chunk, (b"lar", b"ge"))
+
+    assert streamed == sidecars.externalize(chunk.model_copy(update={"data": b"large"}))
+    assert len(list(tmp_path.iterdir())) == 1
+    assert sidecars.read(streamed) == b"large"
+
+
+def test_small_chunk_stays_inline(tmp_path: Path) -> None:
+    """Payloads up to the threshold are left in the chunk."""
+    sidecars = SidecarFiles(tmp_path, threshold=3)
+    chunk = ResponseChunk(data=b"abc", sequence=0)
+
+    assert sidecars.externalize(chunk) is chunk
+    assert sidecars.path(chunk) is None
+
+
+def test_reference_outside_directory_is_rejected(tmp_path: Path) -> None:
+    """A sidecar reference cannot escape the sidecar directory."""
+    sidecars = SidecarFiles(tmp_path / "sidecars", threshold=0)
+    chunk = ResponseChunk(
+        data=b"", sequence=0, metadata=((BODY_FILE_KEY, "../secret"),)
+    )
+
+    with pytest.raises(CassetteLoadError):
+        sidecars.path(chunk)
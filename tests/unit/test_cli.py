@@ -1,8 +1,12 @@
 """Test suite for interposition_http_adapter CLI."""
 
+from pathlib import Path
+
+import pytest
 from pytest_mock import MockerFixture
 
 from interposition_http_adapter import cli
+from interposition_http_adapter.loadgen import LoadReport
 
 
 def test_main(mocker: MockerFixture) -> None:
@@ -20,3 +24,113 @@ def test_parser_version(mocker: MockerFixture) -> None:
     sut = cli.generate_cli_parser()
     sut.parse_args(["--version"])
     sys_exit.assert_called_once_with(0)
+
+
+def test_analyze_prints_report(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """The analyze command prints a summary of the cassette."""
+    cassette = tmp_path / "cassette.json"
+    cassette.write_text('{"interactions": []}', encoding="utf-8")
+    monkeypatch.setattr("sys.argv", ["prog", "analyze", str(cassette)])
+
+    cli.main()
+
+    assert "interactions: 0" in capsys.readouterr().out
+
+
+def test_analyze_reports_unreadable_cassette(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A missing cassette exits with an error message."""
+    monkeypatch.setattr("sys.argv", ["prog", "analyze", str(tmp_path / "none.json")])
+
+    with pytest.raises(SystemExit, match="cannot analyze"):
+        cli.main()
+
+
+def test_serve_replays_cassette(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mocker: MockerFixture
+) -> None:
+    """The serve command runs the adapter with the requested options."""
+    cassette = tmp_path / "cassette.json"
+    cassette.write_text('{"interactions": []}', encoding="utf-8")
+    serve = mocker.patch("interposition_http_adapter.serving.serve")
+    monkeypatch.setattr("sys.argv", ["prog", "serve", str(cassette), "--port", "9000"])
+
+    cli.main()
+
+    options = serve.call_args.args[1]
+    assert options.port == 9000  # noqa: PLR2004
+    assert options.server == "uvicorn"
+
+
+def test_serve_http2_defaults_to_hypercorn(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mocker: MockerFixture
+) -> None:
+    """Requesting HTTP/2 selects the hypercorn server."""
+    cassette = tmp_path / "cassette.json"
+    cassette.write_text('{"interactions": []}', encoding="utf-8")
+    serve = mocker.patch("interposition_http_adapter.serving.serve")
+    monkeypatch.setattr("sys.argv", ["prog", "serve", str(cassette), "--http2"])
+
+    cli.main()
+
+    options = serve.call_args.args[1]
+    assert options.server == "hypercorn"
+    assert options.http2
+
+
+def test_loadgen_prints_report(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    mocker: MockerFixture,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """The loadgen command replays the log and prints throughput and misses."""
+    log = tmp_path / "requests.jsonl"
+    log.write_text('{"method": "GET", "target": "/"}\n', encoding="utf-8")
+    report = LoadReport(
+        sent=1,
+        completed=1,
+        errors=0,
+        misses=1,
+        duration=1.0,
+        throughput=1.0,
+        status_codes={500: 1},
+        latency_ms={"p50": 1.0, "max": 1.0},
+        latency_histogram={"<= 1 ms": 1},
+    )
+    run_load = mocker.patch(
+        "interposition_http_adapter.loadgen.run_load", return_value=report
+    )
+    monkeypatch.setattr(
+        "sys.argv",
+        ["prog", "loadgen", "http://127.0.0.1:8000", str(log), "--rate", "50"],
+    )
+
+    cli.main()
+
+    assert run_load.call_args.args[2].rate == 50  # noqa: PLR2004
+    assert "misses: 1 (100.00%)" in capsys.readouterr().out
+
+
+def test_shard_writes_partitions(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """The shard command writes one cassette per shard and lists them."""
+    cassette = tmp_path / "cassette.json"
+    cassette.write_text('{"interactions": []}', encoding="utf-8")
+    output = tmp_path / "shards"
+    monkeypatch.setattr(
+        "sys.argv",
+        ["prog", "shard", str(cassette), "--shards", "2", "--output", str(output)],
+    )
+
+    cli.main()
+
+    assert sorted(path.name for path in output.iterdir()) == [
+        "shard-0.json",
+        "shard-1.json",
+    ]
+    assert "shard-1.json: 0 interactions" in capsys.readouterr().out
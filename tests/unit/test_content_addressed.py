@@ -0,0 +1,128 @@
+"""Tests for the content-addressed cassette store."""
+
+import threading
+from pathlib import Path
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from interposition import Cassette, CassetteLoadError
+
+from interposition_http_adapter import InterpositionHttpAdapter
+from interposition_http_adapter.bodies import body_digest, chunk_body_digest
+from interposition_http_adapter.stores import ContentAddressedCassetteStore
+from tests.unit.helpers import make_interaction
+
+HTTP_INTERNAL_SERVER_ERROR = 500
+
+_SHARED_BODY = b"shared configuration blob " * 100
+
+
+class _ThreadRecordingStore(ContentAddressedCassetteStore):
+    """Store remembering the threads bodies are loaded in."""
+
+    def __init__(self, path: Path) -> None:
+        super().__init__(path)
+        self.threads: list[int] = []
+
+    def load_body(self, digest: str) -> bytes:
+        self.threads.append(threading.get_ident())
+        return super().load_body(digest)
+
+
+def _save_cassette(path: Path) -> ContentAddressedCassetteStore:
+    store = ContentAddressedCassetteStore(path)
+    store.save(
+        Cassette(
+            interactions=(
+                make_interaction("/a", _SHARED_BODY),
+                make_interaction("/b", _SHARED_BODY),
+                make_interaction("/c", b"unique"),
+            )
+        )
+    )
+    return store
+
+
+def test_save_stores_each_distinct_body_once(tmp_path: Path) -> None:
+    """Identical bodies are written to a single file referenced by digest."""
+    store = _save_cassette(tmp_path / "cassette.json")
+
+    body_files = sorted(path for path in store.bodies_dir.rglob("*") if path.is_file())
+
+    assert [path.name for path in body_files] == sorted(
+        [body_digest(_SHARED_BODY), body_digest(b"unique")]
+    )
+    assert b"shared configuration blob" not in store.path.read_bytes()
+
+
+def test_load_resolves_references_to_one_shared_buffer(tmp_path: Path) -> None:
+    """Loaded chunks reference bodies that are read once and shared."""
+    _save_cassette(tmp_path / "cassette.json")
+    store = ContentAddressedCassetteStore(tmp_path / "cassette.json")
+
+    cassette = store.load()
+    first, second = (
+        interaction.response_chunks[0] for interaction in cassette.interactions[:2]
+    )
+    first_digest = chunk_body_digest(first)
+    second_digest = chunk_body_digest(second)
+
+    assert first.data == b""
+    assert first_digest == second_digest
+    assert first_digest is not None
+    assert store.load_body(first_digest) == _SHARED_BODY
+    assert store.load_body(first_digest) is store.load_body(first_digest)
+
+
+def test_load_body_raises_for_missing_body(tmp_path: Path) -> None:
+    """A dangling reference surfaces as a CassetteLoadError."""
+    store = ContentAddressedCassetteStore(tmp_path / "cassette.json")
+
+    with pytest.raises(CassetteLoadError):
+        store.load_body(body_digest(b"missing"))
+
+
+@pytest.mark.anyio
+async def test_adapter_serves_referenced_bodies(tmp_path: Path) -> None:
+    """The adapter resolves body references through the store lazily."""
+    _save_cassette(tmp_path / "cassette.json")
+    adapter = InterpositionHttpAdapter.from_store(
+        ContentAddressedCassetteStore(tmp_path / "cassette.json")
+    )
+
+    transport = ASGITransport(app=adapter)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        shared = await client.get("/b")
+        unique = await client.get("/c")
+
+    assert shared.content == _SHARED_BODY
+    assert unique.content == b"unique"
+
+
+@pytest.mark.anyio
+async def test_references_without_body_store_fail(tmp_path: Path) -> None:
+    """A cassette with body references opened as plain JSON answers 500."""
+    _save_cassette(tmp_path / "cassette.json")
+    adapter = InterpositionHttpAdapter.from_cassette_file(tmp_path / "cassette.json")
+
+    transport = ASGITransport(app=adapter, raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.get("/a")
+
+    assert response.status_code == HTTP_INTERNAL_SERVER_ERROR
+
+
+@pytest.mark.anyio
+async def test_adapter_loads_bodies_off_the_event_loop(tmp_path: Path) -> None:
+    """Stored bodies are read in worker threads, not on the event loop."""
+    _save_cassette(tmp_path / "cassette.json")
+    store = _ThreadRecordingStore(tmp_path / "cassette.json")
+    adapter = InterpositionHttpAdapter.from_store(store)
+
+    transport = ASGITransport(app=adapter)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.get("/a")
+
+    assert response.content == _SHARED_BODY
+    assert store.threads
+    assert threading.get_ident() not in store.threads
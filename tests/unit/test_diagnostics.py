@@ -0,0 +1,71 @@
+"""Tests for near-miss diagnostics."""
+
+from interposition import Cassette
+
+from interposition_http_adapter.diagnostics import MissDiagnostics
+from tests.unit.helpers import make_interaction
+
+
+def test_explain_reports_differing_query_and_headers() -> None:
+    """Near misses on the same path name the fields that differ."""
+    diagnostics = MissDiagnostics()
+    diagnostics.refresh(
+        Cassette(
+            interactions=(
+                make_interaction("/api/data?kind=user", headers=(("x-role", "admin"),)),
+            )
+        )
+    )
+
+    explanation = diagnostics.explain(
+        "GET", "/api/data?kind=admin", {"x-role": "guest"}, b""
+    )
+
+    assert explanation["near_misses"] == [
+        {
+            "method": "GET",
+            "target": "/api/data?kind=user",
+            "differences": [
+                {"field": "query", "expected": "kind=user", "actual": "kind=admin"},
+                {"field": "header", "name": "x-role"},
+            ],
+        }
+    ]
+
+
+def test_explain_finds_neighbours_by_path_prefix() -> None:
+    """Unknown paths are explained by interactions under a shared prefix."""
+    diagnostics = MissDiagnostics()
+    diagnostics.refresh(
+        Cassette(
+            interactions=(
+                make_interaction("/other/1"),
+                make_interaction("/api/users/1", request_body=b"x"),
+                make_interaction("/api/users/2"),
+            )
+        )
+    )
+
+    explanation = diagnostics.explain("GET", "/api/users/3", {}, b"")
+
+    assert [near["target"] for near in explanation["near_misses"]] == [
+        "/api/users/2",
+        "/api/users/1",
+    ]
+
+
+def test_explain_examines_a_bounded_number_of_interactions() -> None:
+    """The number of compared interactions is capped per miss."""
+    diagnostics = MissDiagnostics(max_examined=5, limit=100)
+    diagnostics.refresh(
+        Cassette(
+            interactions=tuple(
+                make_interaction("/items", request_body=str(index).encode())
+                for index in range(50)
+            )
+        )
+    )
+
+    explanation = diagnostics.explain("GET", "/items", {}, b"none")
+
+    assert len(explanation["near_misses"]) == 5  # noqa: PLR2004
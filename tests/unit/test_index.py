@@ -0,0 +1,39 @@
+"""Tests for the serving index."""
+
+from interposition import Cassette
+
+from interposition_http_adapter.index import ServingIndex
+from tests.unit.helpers import make_interaction
+
+HTTP_CREATED = 201
+
+
+def test_schemas_lists_distinct_header_schemas_per_route() -> None:
+    """Each route keeps its distinct header name tuples in recording order."""
+    index = ServingIndex(
+        Cassette(
+            interactions=(
+                make_interaction("/api", b"a", headers=(("x-role", "admin"),)),
+                make_interaction("/api", b"b", headers=(("x-role", "guest"),)),
+                make_interaction("/api", b"c"),
+            )
+        )
+    )
+
+    assert index.schemas("http", "GET", "/api") == (("x-role",), ())
+    assert index.schemas("http", "GET", "/unknown") == ()
+
+
+def test_find_returns_first_recorded_response_with_parsed_status() -> None:
+    """Lookup by fingerprint keeps the first occurrence and parses its status."""
+    first = make_interaction("/api", b"first", status_code="201")
+    duplicate = make_interaction("/api", b"second")
+    index = ServingIndex(Cassette(interactions=(first, duplicate)))
+
+    response = index.find(first.request)
+
+    assert response is not None
+    assert response.status_code == HTTP_CREATED
+    assert response.chunks is first.response_chunks
+    assert not response.timed
+    assert len(index) == 1
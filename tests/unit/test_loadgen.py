@@ -0,0 +1,94 @@
+"""Unit tests for load generation from request logs."""
+
+import io
+from pathlib import Path
+
+import pytest
+from httpx import ASGITransport
+from interposition import Broker, Cassette
+
+from interposition_http_adapter import InterpositionHttpAdapter
+from interposition_http_adapter.loadgen import (
+    LoadOptions,
+    LoggedRequest,
+    cassette_requests,
+    load_requests,
+    read_request_log,
+    run_load,
+)
+from tests.unit.helpers import make_interaction
+
+
+def test_read_request_log() -> None:
+    """Each non-blank JSONL line is one request."""
+    stream = io.StringIO(
+        '{"method": "GET", "target": "/a"}\n'
+        "\n"
+        '{"method": "POST", "target": "/b", "headers": [["x-id", "1"]],'
+        ' "body": "payload"}\n'
+    )
+
+    assert list(read_request_log(stream)) == [
+        LoggedRequest(method="GET", target="/a"),
+        LoggedRequest(
+            method="POST", target="/b", headers=(("x-id", "1"),), body=b"payload"
+        ),
+    ]
+
+
+def test_read_request_log_rejects_invalid_line() -> None:
+    """A line without a target is reported with its line number."""
+    with pytest.raises(ValueError, match="line 2"):
+        list(read_request_log(io.StringIO('{"method": "GET", "target": "/"}\n{}\n')))
+
+
+def test_cassette_requests_streams_recorded_requests() -> None:
+    """Requests are derived from the interactions of a JSON cassette."""
+    cassette = Cassette(
+        interactions=(make_interaction("/a", b"ok"), make_interaction("/b", b"ok"))
+    )
+
+    requests = list(cassette_requests(io.StringIO(cassette.model_dump_json())))
+
+    assert [request.target for request in requests] == ["/a", "/b"]
+
+
+def test_load_requests_rejects_empty_log(tmp_path: Path) -> None:
+    """A log without requests cannot be replayed."""
+    log = tmp_path / "empty.jsonl"
+    log.write_text("", encoding="utf-8")
+
+    with pytest.raises(ValueError, match="no requests"):
+        load_requests(log)
+
+
+def test_load_options_reject_non_positive_rate() -> None:
+    """The request rate must be positive."""
+    with pytest.raises(ValueError, match="rate"):
+        LoadOptions(rate=0)
+
+
+@pytest.mark.anyio
+async def test_run_load_reports_throughput_and_misses() -> None:
+    """Every scheduled request is counted; unknown targets are misses."""
+    adapter = InterpositionHttpAdapter(
+        broker=Broker(
+            cassette=Cassette(interactions=(make_interaction("/hit", b"ok"),)),
+            mode="replay",
+        )
+    )
+    log = (LoggedRequest("GET", "/hit"), LoggedRequest("GET", "/miss"))
+
+    report = await run_load(
+        "http://testserver",
+        log,
+        LoadOptions(rate=1000, requests=10),
+        transport=ASGITransport(app=adapter),
+    )
+
+    assert report.sent == report.completed == 10  # noqa: PLR2004
+    assert report.errors == 0
+    assert report.status_codes == {200: 5, 500: 5}
+    assert report.miss_rate == pytest.approx(0.5)
+    assert sum(report.latency_histogram.values()) == 10  # noqa: PLR2004
+    assert report.latency_ms["p50"] <= report.latency_ms["max"]
@@ -0,0 +1,117 @@
+"""Tests for fast rejection of replay misses."""
+
+from interposition import Cassette, Interaction, InteractionRequest, ResponseChunk
+
+from interposition_http_adapter.index import ServingIndex
+from interposition_http_adapter.misses import (
+    BloomFilter,
+    MissFilter,
+    NegativeCache,
+    request_key,
+)
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _cassette(*targets: str) -> Cassette:
+    interactions = []
+    for target in targets:
+        request = InteractionRequest(
+            protocol="http", action="GET", target=target, headers=(), body=b""
+        )
+        interactions.append(
+            Interaction(
+                request=request,
+                fingerprint=request.fingerprint(),
+                response_chunks=(ResponseChunk(data=b"", sequence=0),),
+            )
+        )
+    return Cassette(interactions=tuple(interactions))
+
+
+def test_bloom_filter_has_no_false_negatives() -> None:
+    """Every added key is reported as possibly present."""
+    bloom = BloomFilter(capacity=1000)
+    keys = [f"GET /items/{index}".encode() for index in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+
+
+def test_bloom_filter_rejects_most_unknown_keys() -> None:
+    """Unknown keys are rejected close to the configured error rate."""
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for index in range(1000):
+        bloom.add(f"GET /items/{index}".encode())
+
+    false_positives = sum(
+        f"GET /other/{index}".encode() in bloom for index in range(10000)
+    )
+
+    assert false_positives < 300  # noqa: PLR2004
+
+
+def test_negative_cache_expires_entries_after_ttl() -> None:
+    """Entries are forgotten once their time-to-live has passed."""
+    clock = _FakeClock()
+    cache = NegativeCache(max_entries=10, ttl=5.0, clock=clock)
+    cache.add(b"miss")
+
+    clock.now = 4.0
+    assert b"miss" in cache
+    clock.now = 5.0
+    assert b"miss" not in cache
+
+
+def test_negative_cache_evicts_oldest_entry_when_full() -> None:
+    """The cache never holds more than max_entries misses."""
+    cache = NegativeCache(max_entries=2, ttl=60.0)
+    for key in (b"a", b"b", b"c"):
+        cache.add(key)
+
+    assert len(cache) == 2  # noqa: PLR2004
+    assert b"a" not in cache
+    assert b"c" in cache
+
+
+def test_miss_filter_rejects_unknown_routes_and_remembered_misses() -> None:
+    """Unknown routes and remembered misses are rejected; others pass."""
+    miss_filter = MissFilter(NegativeCache(max_entries=10, ttl=60.0))
+    miss_filter.refresh(ServingIndex(_cassette("/known")))
+    key = request_key("GET", "/known", [(b"x-role", b"guest")], b"")
+
+    assert miss_filter.rejects("GET", "/unknown", key)
+    assert not miss_filter.rejects("GET", "/known", key)
+    miss_filter.remember(key)
+    assert miss_filter.rejects("GET", "/known", key)
+
+
+def test_miss_filter_is_invalidated_by_a_new_index() -> None:
+    """A newly published index clears misses and indexes new routes."""
+    miss_filter = MissFilter(NegativeCache(max_entries=10, ttl=60.0))
+    miss_filter.refresh(ServingIndex(_cassette("/known")))
+    key = request_key("GET", "/known", [], b"")
+    miss_filter.remember(key)
+
+    miss_filter.refresh(ServingIndex(_cassette("/known", "/recorded")))
+
+    assert not miss_filter.rejects("GET", "/known", key)
+    assert not miss_filter.rejects("GET", "/recorded", key)
+
+
+def test_miss_filter_without_route_filtering_only_uses_the_negative_cache() -> None:
+    """Routes missing from the index pass when they may be found elsewhere."""
+    miss_filter = MissFilter(NegativeCache(max_entries=10, ttl=60.0), by_route=False)
+    miss_filter.refresh(ServingIndex(_cassette("/known")))
+    key = request_key("GET", "/unknown", [], b"")
+
+    assert not miss_filter.rejects("GET", "/unknown", key)
+    miss_filter.remember(key)
+    assert miss_filter.rejects("GET", "/unknown", key)
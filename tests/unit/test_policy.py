@@ -0,0 +1,103 @@
+"""Tests for recording policies."""
+
+from interposition import Cassette, InteractionRequest, ResponseChunk
+
+from interposition_http_adapter.policy import RecordingPolicy
+from interposition_http_adapter.recording import CassetteRecorder
+
+
+def _request(target: str, accept: str = "text/plain") -> InteractionRequest:
+    return InteractionRequest(
+        protocol="http",
+        action="GET",
+        target=target,
+        headers=(("accept", accept),),
+        body=b"",
+    )
+
+
+_CHUNKS = (ResponseChunk(data=b"body", sequence=0),)
+
+
+def test_skip_existing_drops_recorded_fingerprints() -> None:
+    """A fingerprint that is already recorded is not recorded again."""
+    policy = RecordingPolicy(skip_existing=True)
+    recorder = CassetteRecorder(Cassette(interactions=()), policy=policy)
+
+    first = recorder.record(_request("/a"), _CHUNKS)
+    second = recorder.record(_request("/a"), _CHUNKS)
+
+    assert first is not None
+    assert second is None
+    assert recorder.cassette is not None
+    assert len(recorder.cassette.interactions) == 1
+    assert policy.dropped["existing"] == 1
+
+
+def test_max_variants_counts_initial_cassette() -> None:
+    """Routes keep at most max_variants interactions, existing ones included."""
+    policy = RecordingPolicy(max_variants=2)
+    seed = CassetteRecorder(Cassette(interactions=()))
+    seed.record(_request("/a", "v0"), _CHUNKS)
+    assert seed.cassette is not None
+    recorder = CassetteRecorder(seed.cassette, policy=policy)
+
+    recorded = [recorder.record(_request("/a", f"v{i}"), _CHUNKS) for i in (1, 2)]
+    other = recorder.record(_request("/b"), _CHUNKS)
+
+    assert recorded[0] is not None
+    assert recorded[1] is None
+    assert other is not None
+    assert policy.dropped["variants"] == 1
+
+
+def test_sampling_always_keeps_the_first_interaction_of_a_route() -> None:
+    """Sampling drops only further interactions of a known route."""
+    policy = RecordingPolicy(sample_rates=(("", 0.5),), random_source=lambda: 0.9)
+    recorder = CassetteRecorder(Cassette(interactions=()), policy=policy)
+
+    first = recorder.record(_request("/a", "v0"), _CHUNKS)
+    second = recorder.record(_request("/a", "v1"), _CHUNKS)
+
+    assert first is not None
+    assert second is None
+    assert policy.dropped["sampled"] == 1
+
+
+def test_prefix_sample_rate_overrides_global_rate() -> None:
+    """The longest matching prefix decides the sample rate of a route."""
+    policy = RecordingPolicy(
+        sample_rates=(("/api", 0.5), ("/api/health", 1.0)),
+        random_source=lambda: 0.9,
+    )
+    recorder = CassetteRecorder(Cassette(interactions=()), policy=policy)
+
+    recorded = [
+        recorder.record(_request(target, accept), _CHUNKS)
+        for target in ("/api/items", "/api/health", "/other")
+        for accept in ("v0", "v1")
+    ]
+
+    assert [interaction is not None for interaction in recorded] == [
+        True,
+        False,
+        True,
+        True,
+        True,
+        True,
+    ]
+    assert policy.dropped["sampled"] == 1
+
+
+def test_oversized_response_is_counted() -> None:
+    """Responses above max_body_size are reported as oversized."""
+    policy = RecordingPolicy(max_body_size=4)
+
+    assert not policy.oversized(sum(len(chunk.data) for chunk in _CHUNKS))
+    assert policy.oversized(sum(len(chunk.data) for chunk in _CHUNKS) + 1)
+    assert policy.dropped == {
+        "existing": 0,
+        "variants": 0,
+        "sampled": 0,
+        "body_size": 1,
+    }
@@ -0,0 +1,177 @@
+"""Tests for concurrent recording under copy-on-write snapshots."""
+
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from interposition import (
+    Cassette,
+    CassetteSaveError,
+    CassetteStore,
+    Interaction,
+    InteractionRequest,
+    ResponseChunk,
+)
+
+from interposition_http_adapter.recording import CassetteRecorder
+
+_WRITERS = 8
+_RECORDINGS_PER_WRITER = 25
+_UPSTREAM_LATENCY = 0.02
+
+
+def _request(target: str) -> InteractionRequest:
+    return InteractionRequest(
+        protocol="http", action="GET", target=target, headers=(), body=b""
+    )
+
+
+def test_record_publishes_a_new_snapshot_and_keeps_the_old_one() -> None:
+    """Recording never mutates a snapshot that readers may still hold."""
+    recorder = CassetteRecorder(Cassette(interactions=()))
+    before = recorder.snapshot
+
+    recorder.record(_request("/a"), (ResponseChunk(data=b"a", sequence=0),))
+
+    assert len(before) == 0
+    assert len(recorder.snapshot) == 1
+    assert recorder.snapshot.find(_request("/a")) is not None
+    assert before.find(_request("/a")) is None
+
+
+def test_replay_only_recorder_keeps_no_cassette() -> None:
+    """Without recording the models are not retained and record() fails."""
+    recorder = CassetteRecorder(
+        Cassette(interactions=()), MagicMock(spec=CassetteStore), recording=False
+    )
+
+    assert recorder.cassette is None
+    with pytest.raises(RuntimeError, match="recording=False"):
+        recorder.record(_request("/a"), (ResponseChunk(data=b"a", sequence=0),))
+
+
+def test_concurrent_writers_lose_no_interaction() -> None:
+    """Every concurrent recording ends up in the snapshot and the store."""
+    store = MagicMock(spec=CassetteStore)
+    recorder = CassetteRecorder(Cassette(interactions=()), store)
+    torn_reads: list[int] = []
+    stop = threading.Event()
+
+    def write(writer: int) -> None:
+        for index in range(_RECORDINGS_PER_WRITER):
+            target = f"/{writer}/{index}"
+            recorder.record(
+                _request(target), (ResponseChunk(data=target.encode(), sequence=0),)
+            )
+
+    def read() -> None:
+        while not stop.is_set():
+            snapshot = recorder.snapshot
+            if len(snapshot) != len(snapshot.routes()):
+                torn_reads.append(len(snapshot))
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    writers = [threading.Thread(target=write, args=(w,)) for w in range(_WRITERS)]
+    for thread in writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    reader.join()
+
+    expected = _WRITERS * _RECORDINGS_PER_WRITER
+    assert torn_reads == []
+    assert len(recorder.snapshot) == expected
+    assert len(store.save.call_args.args[0].interactions) == expected
+
+
+def test_forwarding_throughput_scales_with_threads() -> None:
+    """Upstream calls run in parallel; only the commit is serialized."""
+    recorder = CassetteRecorder(Cassette(interactions=()))
+
+    def forward(writer: int) -> None:
+        for index in range(_RECORDINGS_PER_WRITER):
+            request = _request(f"/{writer}/{index}")
+            time.sleep(_UPSTREAM_LATENCY)
+            recorder.record(
+                request, (ResponseChunk(data=request.target.encode(), sequence=0),)
+            )
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=forward, args=(w,)) for w in range(_WRITERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    serial_time = _WRITERS * _RECORDINGS_PER_WRITER * _UPSTREAM_LATENCY
+    assert elapsed < serial_time / 3
+    assert len(recorder.snapshot) == _WRITERS * _RECORDINGS_PER_WRITER
+
+
+def test_concurrent_recordings_are_saved_in_batches() -> None:
+    """Writers waiting for a running save are covered by one later save."""
+    saved: list[int] = []
+
+    def save(cassette: Cassette) -> None:
+        time.sleep(_UPSTREAM_LATENCY)
+        saved.append(len(cassette.interactions))
+
+    store = MagicMock(spec=CassetteStore)
+    store.save.side_effect = save
+    recorder = CassetteRecorder(Cassette(interactions=()), store)
+    start = threading.Barrier(_WRITERS)
+
+    def write(writer: int) -> None:
+        start.wait()
+        recorder.record(_request(f"/{writer}"), (ResponseChunk(data=b"x", sequence=0),))
+
+    writers = [threading.Thread(target=write, args=(w,)) for w in range(_WRITERS)]
+    for thread in writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+
+    assert len(saved) < _WRITERS
+    assert saved[-1] == _WRITERS
+
+
+def test_failed_save_is_retried_by_the_next_recording() -> None:
+    """An interaction whose save failed is still served and saved later."""
+    store = MagicMock(spec=CassetteStore)
+    store.save.side_effect = [
+        CassetteSaveError(Path("cassette.json"), OSError("disk full")),
+        None,
+    ]
+    recorder = CassetteRecorder(Cassette(interactions=()), store)
+    chunks = (ResponseChunk(data=b"x", sequence=0),)
+
+    with pytest.raises(CassetteSaveError):
+        recorder.record(_request("/a"), chunks)
+    recorder.record(_request("/b"), chunks)
+
+    assert recorder.snapshot.find(_request("/a")) is not None
+    assert len(store.save.call_args.args[0].interactions) == 2  # noqa: PLR2004
+
+
+def test_adopted_interaction_is_published_without_saving() -> None:
+    """An interaction persisted elsewhere is served but not saved again."""
+    store = MagicMock(spec=CassetteStore)
+    recorder = CassetteRecorder(Cassette(interactions=()), store, recording=False)
+    request = _request("/a")
+    interaction = Interaction(
+        request=request,
+        fingerprint=request.fingerprint(),
+        response_chunks=(ResponseChunk(data=b"a", sequence=0),),
+    )
+
+    snapshot = recorder.adopt(interaction)
+
+    assert snapshot is recorder.snapshot
+    assert snapshot.find(request) is not None
+    assert recorder.adopt(interaction) is snapshot
+    store.save.assert_not_called()
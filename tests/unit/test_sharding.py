@@ -0,0 +1,143 @@
+"""Unit tests for partitioning a cassette across adapters."""
+
+from pathlib import Path
+
+import httpx
+import pytest
+from interposition import Cassette
+from interposition.stores import JsonFileCassetteStore
+
+from interposition_http_adapter import InterpositionHttpAdapter
+from interposition_http_adapter.sharding import HashRing, ShardRouter, shard_cassette
+from tests.unit.helpers import make_interaction
+
+HTTP_OK = 200
+HTTP_BAD_GATEWAY = 502
+HTTP_SERVICE_UNAVAILABLE = 503
+SHARDS = 3
+
+
+class _ShardTransport(httpx.AsyncBaseTransport):
+    """Sends each request to the in-process app listening on its URL port."""
+
+    def __init__(self, apps: dict[int, InterpositionHttpAdapter]) -> None:
+        self._transports = {
+            port: httpx.ASGITransport(app=app) for port, app in apps.items()
+        }
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        port = request.url.port
+        if port is None or port not in self._transports:
+            msg = "connection refused"
+            raise httpx.ConnectError(msg, request=request)
+        return await self._transports[port].handle_async_request(request)
+
+
+def test_hash_ring_uses_every_shard() -> None:
+    """Routes are spread over all shards, the same way on every call."""
+    ring = HashRing(SHARDS)
+    owners = [ring.shard_for("GET", f"/items/{item}") for item in range(300)]
+
+    assert set(owners) == set(range(SHARDS))
+    assert owners == [ring.shard_for("GET", f"/items/{item}") for item in range(300)]
+
+
+def test_adding_a_shard_only_moves_routes_to_it() -> None:
+    """Growing the ring moves routes to the new shard and nowhere else."""
+    before = HashRing(SHARDS)
+    after = HashRing(SHARDS + 1)
+    targets = [f"/items/{item}" for item in range(1000)]
+
+    moved = [
+        after.shard_for("GET", target)
+        for target in targets
+        if before.shard_for("GET", target) != after.shard_for("GET", target)
+    ]
+
+    assert set(moved) == {SHARDS}
+    assert len(moved) < len(targets) / 2
+
+
+def test_hash_ring_rejects_empty_ring() -> None:
+    """A ring needs at least one shard."""
+    with pytest.raises(ValueError, match="at least 1"):
+        HashRing(0)
+
+
+def test_shard_cassette_partitions_interactions(tmp_path: Path) -> None:
+    """Every interaction is written to the loadable cassette of its shard."""
+    targets = [f"/items/{item}" for item in range(30)]
+    source = tmp_path / "cassette.json"
+    JsonFileCassetteStore(source).save(
+        Cassette(
+            interactions=tuple(
+                make_interaction(target, target.encode()) for target in targets
+            )
+        )
+    )
+    ring = HashRing(SHARDS)
+
+    shards = shard_cassette(source, tmp_path / "shards", ring)
+
+    assert [shard.path.name for shard in shards] == [
+        "shard-0.json",
+        "shard-1.json",
+        "shard-2.json",
+    ]
+    assert sum(shard.interactions for shard in shards) == len(targets)
+    for number, shard in enumerate(shards):
+        cassette = JsonFileCassetteStore(shard.path).load()
+        assert len(cassette.interactions) == shard.interactions
+        for interaction in cassette.interactions:
+            assert ring.shard_for("GET", interaction.request.target) == number
+
+
+@pytest.mark.anyio
+async def test_router_forwards_to_owning_shard(tmp_path: Path) -> None:
+    """Each request is answered by the adapter holding its route."""
+    targets = [f"/items/{item}" for item in range(10)]
+    source = tmp_path / "cassette.json"
+    JsonFileCassetteStore(source).save(
+        Cassette(
+            interactions=tuple(
+                make_interaction(target, target.encode()) for target in targets
+            )
+        )
+    )
+    shards = shard_cassette(source, tmp_path / "shards", HashRing(SHARDS))
+    apps = {
+        8001 + number: InterpositionHttpAdapter.from_cassette_file(shard.path)
+        for number, shard in enumerate(shards)
+    }
+    router = ShardRouter(
+        [f"http://127.0.0.1:{port}" for port in apps],
+        transport=_ShardTransport(apps),
+    )
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=router), base_url="http://router"
+    ) as client:
+        responses = [await client.get(target) for target in targets]
+        ready = await client.get("/__ready")
+
+    assert [response.status_code for response in responses] == [HTTP_OK] * 10
+    assert [response.text for response in responses] == targets
+    assert ready.status_code == HTTP_OK
+
+
+@pytest.mark.anyio
+async def test_router_reports_unavailable_shard() -> None:
+    """An unreachable shard answers 502 and keeps the router from being ready."""
+    router = ShardRouter(["http://127.0.0.1:8001"], transport=_ShardTransport({}))
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=router), base_url="http://router"
+    ) as client:
+        response = await client.get("/items/1")
+        ready = await client.get("/__ready")
+
+    assert response.status_code == HTTP_BAD_GATEWAY
+    assert ready.status_code == HTTP_SERVICE_UNAVAILABLE
+    assert ready.json()["shards"] == [
+        {"url": "http://127.0.0.1:8001", "status": "unavailable"}
+    ]
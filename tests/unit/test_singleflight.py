@@ -0,0 +1,172 @@
+"""Tests for coalescing of concurrent upstream requests."""
+
+import threading
+import time
+from collections.abc import Iterator
+
+import anyio
+import pytest
+from interposition import ResponseChunk
+
+from interposition_http_adapter.singleflight import SingleFlight
+from interposition_http_adapter.spool import ChunkSpool
+
+_SUBSCRIBERS = 5
+
+
+class _CountingSource:
+    """Upstream stand-in that counts how often it is started."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self) -> Iterator[ResponseChunk]:
+        with self._lock:
+            self.calls += 1
+        return self._chunks()
+
+    def _chunks(self) -> Iterator[ResponseChunk]:
+        time.sleep(0.05)
+        yield ResponseChunk(data=b"a", sequence=0)
+        time.sleep(0.05)
+        yield ResponseChunk(data=b"b", sequence=1)
+
+
+@pytest.mark.anyio
+async def test_concurrent_joins_share_one_upstream_call() -> None:
+    """All concurrent subscribers receive the chunks of a single call."""
+    flights = SingleFlight()
+    source = _CountingSource()
+    results: list[list[bytes]] = []
+
+    async def consume() -> None:
+        flight = flights.join("key", source)
+        results.append([chunk.data async for chunk in flight.subscribe()])
+
+    async with anyio.create_task_group() as task_group:
+        for _ in range(_SUBSCRIBERS):
+            task_group.start_soon(consume)
+
+    assert source.calls == 1
+    assert results == [[b"a", b"b"]] * _SUBSCRIBERS
+    assert len(flights) == 0
+
+
+@pytest.mark.anyio
+async def test_finished_flight_is_not_reused() -> None:
+    """A request arriving after the call finished starts a new call."""
+    flights = SingleFlight()
+    source = _CountingSource()
+
+    for _ in range(2):
+        flight = flights.join("key", source)
+        _ = [chunk async for chunk in flight.subscribe()]
+
+    assert source.calls == 2  # noqa: PLR2004
+
+
+@pytest.mark.anyio
+async def test_upstream_error_reaches_every_subscriber() -> None:
+    """A failing upstream call raises in all subscribers and is forgotten."""
+    flights = SingleFlight()
+
+    def failing() -> Iterator[ResponseChunk]:
+        yield from ()
+        msg = "upstream down"
+        raise ConnectionError(msg)
+
+    errors: list[str] = []
+
+    async def consume() -> None:
+        flight = flights.join("key", failing)
+        try:
+            _ = [chunk async for chunk in flight.subscribe()]
+        except ConnectionError as error:
+            errors.append(str(error))
+
+    async with anyio.create_task_group() as task_group:
+        for _ in range(_SUBSCRIBERS):
+            task_group.start_soon(consume)
+
+    assert errors == ["upstream down"] * _SUBSCRIBERS
+    assert len(flights) == 0
+
+
+@pytest.mark.anyio
+async def test_complete_response_is_handed_to_on_complete() -> None:
+    """on_complete receives every chunk once the source is exhausted."""
+    flights = SingleFlight()
+    completed: list[tuple[ResponseChunk, ...]] = []
+
+    flight = flights.join(
+        "key",
+        _CountingSource(),
+        on_complete=lambda spool: completed.append(spool.chunks()),
+    )
+    received = [chunk.data async for chunk in flight.subscribe()]
+    flight.release()
+
+    assert received == [b"a", b"b"]
+    assert [[chunk.data for chunk in chunks] for chunks in completed] == [[b"a", b"b"]]
+
+
+@pytest.mark.anyio
+async def test_failing_on_complete_does_not_fail_subscribers() -> None:
+    """A recording failure is logged and the response still completes."""
+    flights = SingleFlight()
+
+    def fail(_spool: ChunkSpool) -> None:
+        msg = "disk full"
+        raise OSError(msg)
+
+    flight = flights.join("key", _CountingSource(), on_complete=fail)
+    received = [chunk.data async for chunk in flight.subscribe()]
+    flight.release()
+
+    assert received == [b"a", b"b"]
+    assert len(flights) == 0
+
+
+@pytest.mark.anyio
+async def test_abandoned_flight_closes_source_and_drops_response() -> None:
+    """When every subscriber leaves early the source is closed unrecorded."""
+    flights = SingleFlight()
+    completed: list[tuple[ResponseChunk, ...]] = []
+    closed = threading.Event()
+
+    def endless() -> Iterator[ResponseChunk]:
+        sequence = 0
+        try:
+            while True:
+                yield ResponseChunk(data=b"x", sequence=sequence)
+                sequence += 1
+        finally:
+            closed.set()
+
+    subscriptions = [
+        flights.join(
+            "key", endless, on_complete=lambda spool: completed.append(spool.chunks())
+        )
+        for _ in range(2)
+    ]
+    for flight in subscriptions:
+        chunks = flight.subscribe()
+        _ = await anext(chunks)
+        flight.release()
+
+    assert closed.is_set()
+    assert completed == []
+    assert len(flights) == 0
+
+
+@pytest.mark.anyio
+async def test_large_response_is_spooled_to_disk() -> None:
+    """Chunks beyond the memory threshold are still delivered intact."""
+    flights = SingleFlight(spool_memory=1)
+
+    flight = flights.join("key", _CountingSource())
+    received = [chunk.data async for chunk in flight.subscribe()]
+    flight.release()
+
+    assert received == [b"a", b"b"]
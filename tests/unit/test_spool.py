@@ -0,0 +1,61 @@
+"""Tests for buffering of streamed response chunks."""
+
+from interposition import ResponseChunk
+
+from interposition_http_adapter.spool import ChunkSpool
+
+
+def _chunk(data: bytes, sequence: int) -> ResponseChunk:
+    return ResponseChunk(data=data, sequence=sequence, metadata=(("k", str(sequence)),))
+
+
+def test_small_response_stays_in_memory() -> None:
+    """Chunks under the threshold are returned as the same objects."""
+    spool = ChunkSpool(max_memory=10)
+    chunk = _chunk(b"abc", 0)
+
+    spool.append(chunk)
+
+    assert not spool.spilled
+    assert spool[0] is chunk
+
+
+def test_spool_spills_to_disk_past_threshold() -> None:
+    """Exceeding the threshold moves every payload to disk without loss."""
+    spool = ChunkSpool(max_memory=4)
+    chunks = [_chunk(b"abc", 0), _chunk(b"defg", 1), _chunk(b"", 2)]
+
+    for chunk in chunks:
+        spool.append(chunk)
+
+    assert spool.spilled
+    assert spool.chunks() == tuple(chunks)
+    spool.close()
+    assert len(spool) == 0
+
+
+def test_spilled_payload_is_read_back_in_blocks() -> None:
+    """payload() streams a spilled chunk without its header or neighbours."""
+    spool = ChunkSpool(max_memory=4)
+    large = b"x" * (200 * 1024)
+    spool.append(_chunk(b"abc", 0))
+    spool.append(_chunk(large, 1))
+
+    blocks = list(spool.payload(1))
+    header, length = spool.header(1)
+
+    assert spool.size == len(large) + 3
+    assert len(blocks) > 1
+    assert b"".join(blocks) == large
+    assert header == _chunk(b"", 1)
+    assert length == len(large)
+    assert list(spool.payload(0)) == [b"abc"]
+
+
+def test_in_memory_payload_is_one_block() -> None:
+    """payload() yields an in-memory payload as it is."""
+    spool = ChunkSpool(max_memory=10)
+    spool.append(_chunk(b"abc", 0))
+
+    assert list(spool.payload(0)) == [b"abc"]
+    assert spool.header(0) == (_chunk(b"", 0), 3)
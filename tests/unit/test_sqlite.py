@@ -0,0 +1,222 @@
+"""Tests for the SQLite cassette store."""
+
+import sqlite3
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from interposition import (
+    Cassette,
+    CassetteLoadError,
+    Interaction,
+    InteractionRequest,
+    ResponseChunk,
+)
+from interposition.stores import JsonFileCassetteStore
+
+from interposition_http_adapter import InterpositionHttpAdapter
+from interposition_http_adapter.bodies import chunk_body_digest
+from interposition_http_adapter.stores import SqliteCassetteStore
+from tests.unit.helpers import make_interaction
+
+_WORKERS = 4
+_INTERACTIONS_PER_WORKER = 25
+
+
+def test_load_returns_saved_interactions_with_body_references(
+    tmp_path: Path,
+) -> None:
+    """Saved interactions load back with bodies fetched on demand."""
+    store = SqliteCassetteStore(tmp_path / "cassette.db")
+    store.save(Cassette(interactions=(make_interaction("/a", b"\x00\xffbinary", b""),)))
+
+    loaded = SqliteCassetteStore(tmp_path / "cassette.db").load()
+    interaction = loaded.interactions[0]
+    digest = chunk_body_digest(interaction.response_chunks[0])
+
+    assert interaction.request == make_interaction("/a").request
+    assert interaction.response_chunks[0].data == b""
+    assert interaction.response_chunks[1].metadata == ()
+    assert digest is not None
+    assert store.load_body(digest) == b"\x00\xffbinary"
+
+
+class _CommitAfterChunks:
+    """Connection proxy letting another store commit after the chunks query."""
+
+    def __init__(
+        self, connection: sqlite3.Connection, writer: Callable[[], None]
+    ) -> None:
+        self._connection = connection
+        self._writer = writer
+
+    def execute(self, sql: str) -> sqlite3.Cursor:
+        cursor = self._connection.execute(sql)
+        if sql.startswith("SELECT interaction_id"):
+            self._writer()
+        return cursor
+
+
+def test_load_reads_one_snapshot_while_another_store_commits(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """An interaction committed during a load is not seen half-written."""
+    path = tmp_path / "cassette.db"
+    reader = SqliteCassetteStore(path)
+    reader.save(Cassette(interactions=(make_interaction("/a", b"payload"),)))
+    writer = SqliteCassetteStore(path)
+    connection = reader._connection()  # noqa: SLF001
+    proxy = _CommitAfterChunks(
+        connection,
+        lambda: writer.save(
+            Cassette(interactions=(make_interaction("/b", b"payload"),))
+        ),
+    )
+    monkeypatch.setattr(reader, "_connection", lambda: proxy)
+
+    loaded = reader.load()
+
+    assert [i.request.target for i in loaded.interactions] == ["/a"]
+
+
+def test_load_wraps_invalid_rows_in_cassette_load_error(tmp_path: Path) -> None:
+    """An interaction without chunks is reported as a load error."""
+    path = tmp_path / "cassette.db"
+    store = SqliteCassetteStore(path)
+    store.save(Cassette(interactions=(make_interaction("/a", b"payload"),)))
+    with sqlite3.connect(path) as connection:
+        connection.execute("DELETE FROM chunks")
+
+    with pytest.raises(CassetteLoadError):
+        SqliteCassetteStore(path).load()
+
+
+def test_concurrent_writers_do_not_lose_or_duplicate_interactions(
+    tmp_path: Path,
+) -> None:
+    """Writers with their own connections all land, duplicates are skipped."""
+    path = tmp_path / "cassette.db"
+    SqliteCassetteStore(path)
+
+    def record(worker: int) -> None:
+        store = SqliteCassetteStore(path)
+        interactions: tuple[Interaction, ...] = (
+            make_interaction("/shared", b"payload"),
+        )
+        for index in range(_INTERACTIONS_PER_WORKER):
+            interactions = (
+                *interactions,
+                make_interaction(f"/w{worker}/{index}", b"payload"),
+            )
+            store.save(Cassette(interactions=interactions))
+
+    threads = [threading.Thread(target=record, args=(w,)) for w in range(_WORKERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    targets = [
+        interaction.request.target
+        for interaction in SqliteCassetteStore(path).load().interactions
+    ]
+    assert len(targets) == _WORKERS * _INTERACTIONS_PER_WORKER + 1
+    assert targets.count("/shared") == 1
+
+
+def test_import_and_export_round_trip_json(tmp_path: Path) -> None:
+    """JSON cassettes are imported and exported with inline bodies."""
+    cassette = Cassette(
+        interactions=(make_interaction("/a", b"payload"), make_interaction("/b", b"b"))
+    )
+    JsonFileCassetteStore(tmp_path / "in.json").save(cassette)
+
+    store = SqliteCassetteStore(tmp_path / "cassette.db")
+    store.import_json(tmp_path / "in.json")
+    store.export_json(tmp_path / "out.json")
+
+    assert JsonFileCassetteStore(tmp_path / "out.json").load() == cassette
+
+
+@pytest.mark.anyio
+async def test_adapter_replays_from_sqlite_store(tmp_path: Path) -> None:
+    """from_store serves interactions stored in SQLite."""
+    store = SqliteCassetteStore(tmp_path / "cassette.db")
+    store.save(
+        Cassette(
+            interactions=(
+                make_interaction("/a", b"from sqlite", headers=(("x-role", "admin"),)),
+            )
+        )
+    )
+    adapter = InterpositionHttpAdapter.from_store(
+        SqliteCassetteStore(tmp_path / "cassette.db")
+    )
+
+    transport = ASGITransport(app=adapter)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.get("/a", headers={"x-role": "admin"})
+
+    assert response.content == b"from sqlite"
+
+
+def test_interactions_saved_by_another_store_are_found_by_fingerprint(
+    tmp_path: Path,
+) -> None:
+    """header_schemas and find_interaction see rows committed elsewhere."""
+    path = tmp_path / "cassette.db"
+    reader = SqliteCassetteStore(path)
+    reader.load()
+    recorded = make_interaction("/a", b"payload", headers=(("x-role", "admin"),))
+    SqliteCassetteStore(path).save(Cassette(interactions=(recorded,)))
+
+    found = reader.find_interaction(recorded.fingerprint.value)
+
+    assert reader.header_schemas("http", "GET", "/a") == (("x-role",),)
+    assert reader.header_schemas("http", "GET", "/b") == ()
+    assert reader.find_interaction(make_interaction("/b").fingerprint.value) is None
+    assert found is not None
+    assert found.request == recorded.request
+    digest = chunk_body_digest(found.response_chunks[0])
+    assert digest is not None
+    assert reader.load_body(digest) == b"payload"
+
+
+@pytest.mark.anyio
+async def test_workers_serve_interactions_recorded_by_each_other(
+    tmp_path: Path,
+) -> None:
+    """A worker replays what another worker recorded after it started."""
+    path = tmp_path / "cassette.db"
+    SqliteCassetteStore(path)
+    upstream_calls: list[str] = []
+
+    def live_responder(request: InteractionRequest) -> list[ResponseChunk]:
+        upstream_calls.append(request.target)
+        return [ResponseChunk(data=b"live", sequence=0)]
+
+    recorder = InterpositionHttpAdapter.from_store(
+        SqliteCassetteStore(path), mode="auto", live_responder=live_responder
+    )
+    replayer = InterpositionHttpAdapter.from_store(SqliteCassetteStore(path))
+    other_recorder = InterpositionHttpAdapter.from_store(
+        SqliteCassetteStore(path), mode="auto", live_responder=live_responder
+    )
+
+    async def get(adapter: InterpositionHttpAdapter) -> bytes:
+        transport = ASGITransport(app=adapter)
+        async with AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+            return (await client.get("/api/data")).content
+
+    recorded = await get(recorder)
+    replayed = [await get(replayer) for _ in range(2)]
+    shared = await get(other_recorder)
+
+    assert recorded == b"live"
+    assert replayed == [b"live", b"live"]
+    assert shared == b"live"
+    assert upstream_calls == ["/api/data"]
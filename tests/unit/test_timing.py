@@ -0,0 +1,78 @@
+"""Tests for response chunk timing."""
+
+import time
+from collections.abc import Iterator
+
+import pytest
+from interposition import InteractionRequest, ResponseChunk
+
+from interposition_http_adapter.timing import (
+    OFFSET_METADATA_KEY,
+    chunk_offset,
+    has_timing,
+    paced_chunks,
+    record_chunk_offsets,
+)
+
+_REQUEST = InteractionRequest(
+    protocol="http", action="GET", target="/stream", headers=(), body=b""
+)
+
+
+def _slow_responder(_request: InteractionRequest) -> Iterator[ResponseChunk]:
+    yield ResponseChunk(data=b"a", sequence=0, metadata=(("status_code", "200"),))
+    time.sleep(0.05)
+    yield ResponseChunk(data=b"b", sequence=1)
+
+
+def _timed_chunk(data: bytes, sequence: int, offset_ms: str) -> ResponseChunk:
+    return ResponseChunk(
+        data=data, sequence=sequence, metadata=((OFFSET_METADATA_KEY, offset_ms),)
+    )
+
+
+def test_record_chunk_offsets_stamps_arrival_offsets() -> None:
+    """Wrapped responder adds increasing offsets and keeps existing metadata."""
+    chunks = list(record_chunk_offsets(_slow_responder)(_REQUEST))
+
+    first_offset = chunk_offset(chunks[0])
+    second_offset = chunk_offset(chunks[1])
+    assert first_offset is not None
+    assert second_offset is not None
+    assert second_offset - first_offset >= 40  # noqa: PLR2004
+    assert chunks[0].metadata[0] == ("status_code", "200")
+    assert [chunk.data for chunk in chunks] == [b"a", b"b"]
+
+
+def test_record_chunk_offsets_keeps_existing_offsets() -> None:
+    """Chunks that already carry an offset are not stamped twice."""
+    recorded = _timed_chunk(b"x", 0, "12.5")
+
+    chunks = list(record_chunk_offsets(lambda _request: [recorded])(_REQUEST))
+
+    assert chunks == [recorded]
+
+
+def test_has_timing_detects_offsets() -> None:
+    """has_timing is true only when a chunk carries an offset."""
+    assert has_timing([ResponseChunk(data=b"", sequence=0), _timed_chunk(b"", 1, "1")])
+    assert not has_timing([ResponseChunk(data=b"", sequence=0)])
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    ("speed", "min_elapsed", "max_elapsed"),
+    [(1.0, 0.2, 1.0), (10.0, 0.02, 0.15), (0.0, 0.0, 0.05)],
+)
+async def test_paced_chunks_scales_recorded_offsets(
+    speed: float, min_elapsed: float, max_elapsed: float
+) -> None:
+    """Chunks are released at their offsets divided by the speed factor."""
+    chunks = (_timed_chunk(b"a", 0, "0"), _timed_chunk(b"b", 1, "200"))
+
+    started = time.monotonic()
+    payloads = [payload async for payload in paced_chunks(chunks, speed)]
+    elapsed = time.monotonic() - started
+
+    assert payloads == [b"a", b"b"]
+    assert min_elapsed <= elapsed < max_elapsed
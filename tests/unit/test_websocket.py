@@ -0,0 +1,136 @@
+"""Tests for WebSocket conversation replay."""
+
+import time
+from typing import cast
+
+import pytest
+from interposition import (
+    Broker,
+    Cassette,
+    Interaction,
+    InteractionRequest,
+    ResponseChunk,
+)
+from starlette.testclient import TestClient, WebSocketDenialResponse
+from starlette.websockets import WebSocketDisconnect
+
+from interposition_http_adapter import AdapterConfig, InterpositionHttpAdapter
+
+HTTP_INTERNAL_SERVER_ERROR = 500
+NORMAL_CLOSURE = 1000
+POLICY_VIOLATION = 1008
+
+
+def _frame(
+    data: bytes, *metadata: tuple[str, str], sender: str = "server"
+) -> tuple[bytes, tuple[tuple[str, str], ...]]:
+    """Describe a recorded text frame."""
+    return data, (("ws_sender", sender), ("ws_type", "text"), *metadata)
+
+
+def _adapter(
+    target: str,
+    frames: list[tuple[bytes, tuple[tuple[str, str], ...]]],
+    config: AdapterConfig | None = None,
+) -> InterpositionHttpAdapter:
+    """Create an adapter replaying one recorded WebSocket conversation."""
+    request = InteractionRequest(
+        protocol="ws", action="GET", target=target, headers=(), body=b""
+    )
+    chunks = tuple(
+        ResponseChunk(data=data, sequence=sequence, metadata=metadata)
+        for sequence, (data, metadata) in enumerate(frames)
+    )
+    interaction = Interaction(
+        request=request, fingerprint=request.fingerprint(), response_chunks=chunks
+    )
+    broker = Broker(cassette=Cassette(interactions=(interaction,)), mode="replay")
+    return InterpositionHttpAdapter(broker=broker, config=config)
+
+
+def test_replays_server_frames_and_matches_client_frames() -> None:
+    """Server frames are sent in order around the expected client frames."""
+    adapter = _adapter(
+        "/ws/feed?room=1",
+        [
+            _frame(b"hello"),
+            _frame(b"subscribe", sender="client"),
+            _frame(b"tick 1"),
+            _frame(b"tick 2", ("ws_close", str(NORMAL_CLOSURE))),
+        ],
+    )
+
+    with (
+        TestClient(adapter) as client,
+        client.websocket_connect("/ws/feed?room=1") as websocket,
+    ):
+        assert websocket.receive_text() == "hello"
+        websocket.send_text("subscribe")
+        assert websocket.receive_text() == "tick 1"
+        assert websocket.receive_text() == "tick 2"
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_text()
+
+    assert closed.value.code == NORMAL_CLOSURE
+
+
+def test_unexpected_client_frame_closes_with_policy_violation() -> None:
+    """A client frame differing from the recording ends the conversation."""
+    adapter = _adapter("/ws", [_frame(b"subscribe", sender="client"), _frame(b"tick")])
+
+    with TestClient(adapter) as client, client.websocket_connect("/ws") as websocket:
+        websocket.send_text("unsubscribe")
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_text()
+
+    assert closed.value.code == POLICY_VIOLATION
+
+
+def test_recorded_subprotocol_is_accepted() -> None:
+    """The subprotocol recorded on the first frame is accepted."""
+    adapter = _adapter("/ws", [_frame(b"ready", ("ws_subprotocol", "graphql-ws"))])
+
+    with (
+        TestClient(adapter) as client,
+        client.websocket_connect("/ws", subprotocols=["graphql-ws"]) as websocket,
+    ):
+        # The test session declares accepted_subprotocol as always None.
+        subprotocol = cast("str | None", websocket.accepted_subprotocol)
+        first_frame = websocket.receive_text()
+
+    assert subprotocol == "graphql-ws"
+    assert first_frame == "ready"
+
+
+def test_unknown_connection_is_denied() -> None:
+    """A handshake without a recorded conversation is denied with 500."""
+    adapter = _adapter("/ws", [_frame(b"hello")])
+
+    with (
+        TestClient(adapter) as client,
+        pytest.raises(WebSocketDenialResponse) as denied,
+        client.websocket_connect("/other"),
+    ):
+        pass
+
+    assert denied.value.status_code == HTTP_INTERNAL_SERVER_ERROR
+
+
+def test_frames_follow_recorded_timing_after_client_frames() -> None:
+    """Server frames are paced relative to the preceding client frame."""
+    adapter = _adapter(
+        "/ws",
+        [
+            _frame(b"subscribe", ("offset_ms", "1000"), sender="client"),
+            _frame(b"tick", ("offset_ms", "1200")),
+        ],
+        config=AdapterConfig(replay_speed=2.0),
+    )
+
+    with TestClient(adapter) as client, client.websocket_connect("/ws") as websocket:
+        started = time.monotonic()
+        websocket.send_text("subscribe")
+        assert websocket.receive_text() == "tick"
+        elapsed = time.monotonic() - started
+
+    assert 0.09 <= elapsed < 0.5  # noqa: PLR2004